@@ -13,6 +13,8 @@ from .t1_forms import router as t1_forms_router, tax_router as t1_tax_router, us
 from .filings import router as filings_router
 from .notifications import router as notifications_router
 from .invite import router as invite_router
+from .events import router as events_router
+from .search import router as search_router
 
 api_router = APIRouter()
 
@@ -29,5 +31,7 @@ api_router.include_router(t1_users_router,    prefix="/users",       tags=["User
 api_router.include_router(filings_router,     prefix="/filings",     tags=["Filings"])
 api_router.include_router(notifications_router, prefix="/notifications", tags=["Notifications"])
 api_router.include_router(invite_router,      prefix="/invite",      tags=["Invite Client"])
+api_router.include_router(events_router,      prefix="/events",      tags=["Events"])
+api_router.include_router(search_router,      prefix="/search",      tags=["Search"])
 
 
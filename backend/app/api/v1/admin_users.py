@@ -5,19 +5,20 @@ from typing import Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_admin, get_current_superadmin
-from app.core.auth import get_password_hash
+from app.core.auth import hash_password, invalidate_admin_principal
 from app.core.utils import create_audit_log
 from app.models.admin_user import AdminUser
-from app.models.client import Client
 from app.schemas.admin_user import (
-    AdminUserCreate, AdminUserUpdate, AdminUserResponse, AdminUserWithWorkload
+    AdminUserCreate, AdminUserUpdate, AdminUserResponse, AdminUserWithWorkload,
+    AdminWorkloadResponse
 )
 from app.core.permissions import ALL_PERMISSIONS
+from app.services.workload import count_assigned, get_admin_workload, invalidate_workload
 
 router = APIRouter()
 
@@ -34,6 +35,15 @@ async def get_admin_users(
     return [AdminUserResponse.model_validate(admin) for admin in admins]
 
 
+@router.get("/workload", response_model=list[AdminWorkloadResponse])
+async def get_workload(
+    db: AsyncSession = Depends(get_db),
+    current_admin = Depends(get_current_superadmin)
+):
+    """Get open / in-review / awaiting-payment filing counts per active admin"""
+    return [AdminWorkloadResponse(**entry) for entry in await get_admin_workload(db)]
+
+
 @router.get("/{admin_id}", response_model=AdminUserWithWorkload)
 async def get_admin_user(
     admin_id: UUID,
@@ -48,10 +58,8 @@ async def get_admin_user(
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
     
-    # Count assigned clients
-    count_query = select(func.count()).select_from(Client).where(Client.assigned_admin_id == admin_id)
-    count_result = await db.execute(count_query)
-    client_count = count_result.scalar() or 0
+    # Count assigned filings
+    client_count = await count_assigned(db, admin_id)
     
     admin_dict = AdminUserResponse.model_validate(admin).model_dump()
     admin_dict["client_count"] = client_count
@@ -74,7 +82,7 @@ async def create_admin_user(
     admin = AdminUser(
         email=admin_data.email,
         name=admin_data.name,
-        password_hash=get_password_hash(admin_data.password),
+        password_hash=await hash_password(admin_data.password),
         role=admin_data.role,
         permissions=admin_data.permissions if admin_data.role != "superadmin" else ALL_PERMISSIONS,
         is_active=True
@@ -82,6 +90,7 @@ async def create_admin_user(
     db.add(admin)
     await db.commit()
     await db.refresh(admin)
+    await invalidate_workload()
     
     # Create audit log
     await create_audit_log(
@@ -124,6 +133,9 @@ async def update_admin_user(
     await db.commit()
     await db.refresh(admin)
     
+    await invalidate_admin_principal(admin.id)
+    await invalidate_workload()
+
     # Create audit log
     await create_audit_log(
         db, "Admin Updated", "admin", str(admin.id), current_admin.id,
@@ -154,6 +166,8 @@ async def delete_admin_user(
     admin_name = admin.name
     await db.delete(admin)
     await db.commit()
+    await invalidate_admin_principal(admin_id)
+    await invalidate_workload()
     
     # Create audit log
     await create_audit_log(
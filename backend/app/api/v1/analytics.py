@@ -1,113 +1,200 @@
 """
 Analytics routes
 """
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends
+from datetime import date, timedelta
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import text
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.dependencies import get_current_admin
-from app.models.client import Client
-from app.models.document import Document
-from app.models.payment import Payment
-from app.models.admin_user import AdminUser
-from app.schemas.analytics import AnalyticsResponse, MonthlyRevenue, ClientStatusCount, AdminWorkload
+from app.core.redis_cache import cache_result
+from app.schemas.analytics import AnalyticsResponse, TimeSeriesPoint, TimeSeriesResponse
 
 router = APIRouter()
 
 
+# All dashboard figures in one statement — one round trip, one snapshot.
+# Revenue, filing and document figures come from the daily rollups maintained
+# by scripts/analytics_rollups.py; per-filing payment sums come from
+# client_overview instead of a correlated subquery per filing.
+_DASHBOARD_SQL = text("""
+    SELECT
+        (SELECT COUNT(*) FROM users)                                        AS total_clients,
+        (SELECT COUNT(*) FROM admin_users WHERE is_active)                  AS total_admins,
+        (SELECT COALESCE(SUM(document_count), 0) FROM analytics_daily_documents
+          WHERE status IN ('pending', 'missing', 'received'))               AS pending_documents,
+        (SELECT COUNT(*) FROM client_overview
+          WHERE filing_id IS NOT NULL AND paid_amount = 0)                  AS pending_payments,
+        (SELECT COALESCE(SUM(filing_count), 0) FROM analytics_daily_filings
+          WHERE status IN ('completed', 'filed', 'assessed'))               AS completed_filings,
+        (SELECT COALESCE(SUM(amount), 0) FROM analytics_daily_revenue)      AS total_revenue,
+        (SELECT COALESCE(json_agg(json_build_object('month', TO_CHAR(m.bucket, 'Mon YYYY'),
+                                                    'revenue', m.revenue)
+                                  ORDER BY m.bucket), '[]'::json)
+           FROM (
+               SELECT DATE_TRUNC('month', day) AS bucket, SUM(amount) AS revenue
+               FROM analytics_daily_revenue
+               WHERE day >= DATE_TRUNC('month', NOW() AT TIME ZONE 'UTC') - INTERVAL '5 months'
+               GROUP BY 1
+           ) m)                                                             AS monthly_revenue,
+        (SELECT COALESCE(json_agg(json_build_object('status', s.status, 'count', s.count)), '[]'::json)
+           FROM (
+               SELECT status, SUM(filing_count) AS count
+               FROM analytics_daily_filings
+               GROUP BY status
+               HAVING SUM(filing_count) > 0
+           ) s)                                                             AS clients_by_status,
+        (SELECT COALESCE(json_agg(json_build_object('name', a.name, 'clients', COALESCE(w.open, 0))
+                                  ORDER BY a.name), '[]'::json)
+           FROM admin_users a
+           LEFT JOIN (
+               SELECT assigned_admin_id, COUNT(*) AS open
+               FROM client_overview
+               WHERE assigned_admin_id IS NOT NULL
+                 AND status NOT IN ('completed', 'filed', 'assessed')
+               GROUP BY assigned_admin_id
+           ) w ON w.assigned_admin_id = a.id
+          WHERE a.is_active)                                                AS admin_workload
+""")
+
+# metric -> (rollup table, value expression, count expression, breakdown column, allowed filters)
+_TIMESERIES_METRICS = {
+    "revenue": ("analytics_daily_revenue", "SUM(amount)", "SUM(payment_count)", "method", {"method"}),
+    "filings": ("analytics_daily_filings", "SUM(filing_count)", "SUM(filing_count)", "status", {"status", "year"}),
+    "documents": ("analytics_daily_documents", "SUM(document_count)", "SUM(document_count)", "status", {"status"}),
+}
+
+_MAX_TIMESERIES_BUCKETS = 4000
+
+
+def _bucket_label(bucket: date, granularity: str) -> str:
+    if granularity == "month":
+        return bucket.strftime("%b %Y")
+    return bucket.isoformat()
+
+
+@cache_result(
+    "analytics:dashboard", ttl=settings.ANALYTICS_CACHE_TTL, local_ttl=settings.LOCAL_CACHE_TTL,
+    namespace="analytics",
+)
+async def _compute_analytics(db: AsyncSession) -> dict:
+    """Compute dashboard analytics (cached briefly across workers)"""
+    row = (await db.execute(_DASHBOARD_SQL)).one()
+    return AnalyticsResponse(
+        total_clients=row.total_clients or 0,
+        total_admins=row.total_admins or 0,
+        pending_documents=row.pending_documents or 0,
+        pending_payments=row.pending_payments or 0,
+        completed_filings=row.completed_filings or 0,
+        total_revenue=float(row.total_revenue or 0),
+        monthly_revenue=row.monthly_revenue,
+        clients_by_status=row.clients_by_status,
+        admin_workload=row.admin_workload,
+    ).model_dump()
+
+
 @router.get("", response_model=AnalyticsResponse)
 async def get_analytics(
     db: AsyncSession = Depends(get_db),
     current_admin = Depends(get_current_admin)
 ):
     """Get dashboard analytics"""
-    from sqlalchemy import text
-
-    # Total clients = users who have at least one filing (real production data)
-    total_clients_result = await db.execute(
-        text("SELECT COUNT(DISTINCT u.id) FROM users u LEFT JOIN filings f ON f.user_id = u.id")
-    )
-    total_clients = total_clients_result.scalar() or 0
-
-    # Total admins
-    admins_query = select(func.count()).select_from(AdminUser).where(AdminUser.is_active == True)
-    total_admins_result = await db.execute(admins_query)
-    total_admins = total_admins_result.scalar() or 0
-
-    # Pending documents (from real documents table)
-    pending_docs_result = await db.execute(
-        text("SELECT COUNT(*) FROM documents WHERE status IN ('pending', 'missing', 'received')")
-    )
-    pending_documents = pending_docs_result.scalar() or 0
-
-    # Pending payments — filings where no payment has been made yet
-    pending_payments_result = await db.execute(
-        text("""
-            SELECT COUNT(*) FROM filings f
-            WHERE COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.filing_id = f.id), 0) = 0
-        """)
-    )
-    pending_payments = pending_payments_result.scalar() or 0
-
-    # Completed filings
-    completed_result = await db.execute(
-        text("SELECT COUNT(*) FROM filings WHERE status IN ('completed', 'filed', 'assessed')")
-    )
-    completed_filings = completed_result.scalar() or 0
-
-    # Total revenue
-    revenue_result = await db.execute(text("SELECT COALESCE(SUM(amount), 0) FROM payments"))
-    total_revenue = float(revenue_result.scalar() or 0)
-
-    # Monthly revenue (last 6 months)
-    monthly_result = await db.execute(text("""
-        SELECT TO_CHAR(DATE_TRUNC('month', created_at), 'Mon') AS month,
-               SUM(amount) AS revenue
-        FROM payments
-        WHERE created_at >= NOW() - INTERVAL '6 months'
-        GROUP BY DATE_TRUNC('month', created_at)
-        ORDER BY DATE_TRUNC('month', created_at)
-    """))
-    monthly_revenue = [
-        MonthlyRevenue(month=row.month, revenue=float(row.revenue or 0))
-        for row in monthly_result.fetchall()
-    ]
-
-    # Clients by status (from real filings)
-    status_result = await db.execute(text("""
-        SELECT COALESCE(status, 'documents_pending') AS status, COUNT(*) AS count
-        FROM filings
-        GROUP BY status
-    """))
-    clients_by_status = [
-        ClientStatusCount(status=row.status, count=row.count)
-        for row in status_result.fetchall()
-    ]
-
-    # Admin workload
-    workload_query = select(
-        AdminUser.id,
-        AdminUser.name,
-    ).where(AdminUser.is_active == True)
-    workload_result = await db.execute(workload_query)
-    workload_data = workload_result.all()
-    admin_workload = [AdminWorkload(name=row.name, clients=0) for row in workload_data]
-    
-    return AnalyticsResponse(
-        total_clients=total_clients,
-        total_admins=total_admins,
-        pending_documents=pending_documents,
-        pending_payments=pending_payments,
-        completed_filings=completed_filings,
-        total_revenue=total_revenue,
-        monthly_revenue=monthly_revenue,
-        clients_by_status=clients_by_status,
-        admin_workload=admin_workload
+    return AnalyticsResponse(**await _compute_analytics(db))
+
+
+@router.get("/timeseries", response_model=TimeSeriesResponse)
+async def get_timeseries(
+    metric: Literal["revenue", "filings", "documents"] = Query(...),
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    granularity: Literal["day", "week", "month"] = Query("month"),
+    method: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    year: Optional[int] = None,
+    breakdown: bool = Query(False, description="One series per payment method / status"),
+    db: AsyncSession = Depends(get_db),
+    current_admin = Depends(get_current_admin)
+):
+    """Get a metric bucketed by day, week or month (served from the daily rollups)"""
+    table, value_expr, count_expr, dimension, allowed = _TIMESERIES_METRICS[metric]
+    to_date = to_date or date.today()
+    from_date = from_date or to_date - timedelta(days=365)
+    if from_date > to_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'from' must not be after 'to'")
+    if granularity == "day" and (to_date - from_date).days >= _MAX_TIMESERIES_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too large for daily granularity (max {_MAX_TIMESERIES_BUCKETS} days)",
+        )
+
+    filters = {"method": method, "status": status_filter, "year": year}
+    unsupported = [name for name, value in filters.items() if value is not None and name not in allowed]
+    if unsupported:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Filter(s) {', '.join(unsupported)} not supported for metric '{metric}'",
+        )
+
+    where = ["day BETWEEN :from_date AND :to_date"]
+    params = {"from_date": from_date, "to_date": to_date, "granularity": granularity}
+    if method is not None:
+        where.append("method = :method")
+        params["method"] = method
+    if status_filter is not None:
+        where.append("status = :status")
+        params["status"] = status_filter
+    if year is not None:
+        where.append("filing_year = :year")
+        params["year"] = year
+    where_sql = " AND ".join(where)
+
+    if breakdown:
+        # One row per non-empty bucket and dimension value; no gap filling
+        sql = f"""
+            SELECT DATE_TRUNC(:granularity, day)::date AS bucket, {dimension} AS series,
+                   {value_expr} AS value, {count_expr} AS count
+            FROM {table}
+            WHERE {where_sql}
+            GROUP BY 1, 2
+            HAVING {count_expr} <> 0 OR {value_expr} <> 0
+            ORDER BY 1, 2
+        """
+    else:
+        sql = f"""
+            WITH buckets AS (
+                SELECT generate_series(DATE_TRUNC(:granularity, CAST(:from_date AS date)),
+                                       DATE_TRUNC(:granularity, CAST(:to_date AS date)),
+                                       CAST('1 ' || :granularity AS interval))::date AS bucket
+            ), agg AS (
+                SELECT DATE_TRUNC(:granularity, day)::date AS bucket,
+                       {value_expr} AS value, {count_expr} AS count
+                FROM {table}
+                WHERE {where_sql}
+                GROUP BY 1
+            )
+            SELECT b.bucket, 'total' AS series, COALESCE(a.value, 0) AS value, COALESCE(a.count, 0) AS count
+            FROM buckets b LEFT JOIN agg a USING (bucket)
+            ORDER BY b.bucket
+        """
+
+    rows = (await db.execute(text(sql), params)).fetchall()
+    return TimeSeriesResponse(
+        metric=metric,
+        granularity=granularity,
+        from_date=from_date,
+        to_date=to_date,
+        points=[
+            TimeSeriesPoint(
+                bucket=row.bucket,
+                label=_bucket_label(row.bucket, granularity),
+                series=row.series,
+                value=float(row.value or 0),
+                count=int(row.count or 0),
+            )
+            for row in rows
+        ],
     )
-
-
-
-
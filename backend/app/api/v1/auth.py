@@ -2,14 +2,16 @@
 Authentication routes
 """
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.auth import authenticate_admin, create_access_token, create_refresh_token, get_password_hash
+from app.core.auth import (
+    AdminPrincipal, authenticate_admin, create_access_token, create_refresh_token, get_admin_user
+)
 from app.core.config import settings
 from app.core.dependencies import get_current_admin
-from app.models.admin_user import AdminUser
+from app.core.rate_limit import enforce_login_rate_limit, record_failed_login
 from app.schemas.auth import AdminLogin, AdminToken, AdminLoginResponse, AdminUserResponse
 from sqlalchemy import select
 from datetime import datetime
@@ -20,13 +22,17 @@ router = APIRouter()
 @router.post("/login", response_model=AdminLoginResponse)
 async def login(
     login_data: AdminLogin,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Admin login endpoint
     """
+    # Throttled before bcrypt, so rejected attempts cost no hashing
+    await enforce_login_rate_limit(request, login_data.email)
     admin = await authenticate_admin(db, login_data.email, login_data.password)
     if not admin:
+        await record_failed_login(login_data.email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -59,11 +65,16 @@ async def login(
 
 @router.get("/me", response_model=AdminUserResponse)
 async def get_current_user(
-    current_admin: AdminUser = Depends(get_current_admin)
+    current_admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get current authenticated admin user
     """
-    return AdminUserResponse.model_validate(current_admin)
+    # The principal carries only what authorization needs; the profile is read in full
+    admin = await get_admin_user(db, current_admin.id)
+    if admin is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Admin not found")
+    return AdminUserResponse.model_validate(admin)
 
 
@@ -1,17 +1,25 @@
 """
-Client routes — reads from production users + filings tables.
+Client routes — reads from the client_overview table (maintained from the
+production users + filings tables), writes to filings.
 """
-from typing import Optional
+import hashlib
+import json
+from datetime import datetime
+from typing import Literal, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, text, and_, or_, update
 from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.dependencies import get_current_admin, require_permission
-from app.core.utils import create_audit_log, calculate_pagination
+from app.core.redis_cache import cache, invalidate_cache
+from app.core.utils import create_audit_log, calculate_pagination, encode_cursor, decode_cursor, text_search
 from app.core.permissions import PERMISSIONS
+from app.services.client_resolver import resolve_client
+from app.services.workload import assign_filing, invalidate_workload
 from app.models.client import Client
 from app.models.admin_user import AdminUser
 from app.schemas.client import (
@@ -42,8 +50,8 @@ def _row_to_client(row) -> dict:
         "filing_year": row.filing_year,
         "status": row.status or "documents_pending",
         "payment_status": pay_status,
-        "assigned_admin_id": None,
-        "assigned_admin_name": None,
+        "assigned_admin_id": row.assigned_admin_id,
+        "assigned_admin_name": row.assigned_admin_name,
         "total_amount": total,
         "paid_amount": paid,
         "created_at": row.created_at,
@@ -52,27 +60,54 @@ def _row_to_client(row) -> dict:
 
 
 # ---------------------------------------------------------------------------
-# Base SQL — joins users LEFT JOIN filings so every user appears
+# Base SQL — one row per filing, plus one per user without a filing, read from
+# the trigger-maintained client_overview table (see scripts/client_overview.py)
 # ---------------------------------------------------------------------------
 _BASE_SQL = """
     SELECT
-        COALESCE(f.id,  u.id)                        AS id,
-        u.first_name || ' ' || u.last_name           AS name,
-        u.email,
-        u.phone,
-        COALESCE(f.filing_year, EXTRACT(YEAR FROM NOW())::int) AS filing_year,
-        COALESCE(f.status, 'documents_pending')      AS status,
-        COALESCE(f.total_fee, 0)                     AS total_amount,
-        COALESCE((
-            SELECT SUM(p.amount) FROM payments p WHERE p.filing_id = f.id
-        ), 0)                                        AS paid_amount,
-        COALESCE(f.created_at, u.created_at)         AS created_at,
-        COALESCE(f.updated_at, u.updated_at)         AS updated_at
-    FROM users u
-    LEFT JOIN filings f ON f.user_id = u.id
+        co.client_id                                 AS id,
+        co.name,
+        co.email,
+        co.phone,
+        COALESCE(co.filing_year, EXTRACT(YEAR FROM NOW())::int) AS filing_year,
+        co.status,
+        co.total_fee                                 AS total_amount,
+        co.paid_amount,
+        co.assigned_admin_id,
+        aa.name                                      AS assigned_admin_name,
+        co.created_at,
+        co.updated_at
+    FROM client_overview co
+    LEFT JOIN admin_users aa ON aa.id = co.assigned_admin_id
 """
 
 
+async def _count_clients(db: AsyncSession, where_sql: str, params: dict, mode: str) -> Optional[int]:
+    """Count rows matching the client-list filters according to ``mode``."""
+    if mode == "none":
+        return None
+
+    from_sql = f"FROM client_overview co {where_sql}"
+
+    if mode == "estimate":
+        # Planner row estimate — constant time regardless of table size
+        plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_sql}"), params)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    # Exact count, shared across pages and workers for a short TTL
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    cache_key = await cache.versioned_key("clients", f"count:{digest}")
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return int(cached)
+
+    total = (await db.execute(text(f"SELECT COUNT(*) {from_sql}"), params)).scalar() or 0
+    await cache.set(cache_key, total, settings.CLIENT_COUNT_CACHE_TTL)
+    return total
+
+
 @router.get("", response_model=ClientListResponse)
 async def get_clients(
     page: int = Query(1, ge=1),
@@ -81,52 +116,102 @@ async def get_clients(
     year_filter: Optional[int] = Query(None, alias="year"),
     search: Optional[str] = None,
     email: Optional[str] = Query(None),
+    assigned_admin_id: Optional[UUID] = Query(None),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    count: Literal["exact", "estimate", "none"] = Query("exact"),
     db: AsyncSession = Depends(get_db),
     current_admin = Depends(get_current_admin)
 ):
-    """Get all clients — reads from production users + filings tables."""
+    """
+    Get all clients — reads from the client_overview table.
+
+    Rows are ordered by (created_at, id) descending. Passing ``cursor`` continues
+    after the last row of the previous page (keyset pagination) instead of using
+    OFFSET, so deep pages cost the same as the first one. ``count`` selects how
+    ``total`` is produced: ``exact`` (cached briefly), ``estimate`` (planner
+    estimate) or ``none`` (skipped).
+
+    With ``search``, rows are ordered by relevance instead and paged with
+    ``page`` only; ``next_cursor`` is not returned.
+    """
+    # Search results are ordered by rank, which a keyset cursor cannot follow
+    searching = bool(search) and not email
+    if searching and cursor:
+        raise HTTPException(status_code=400, detail="cursor cannot be combined with search")
+    rank_sql = None
     where_clauses = []
     params: dict = {}
 
     if status_filter:
-        where_clauses.append("COALESCE(f.status, 'documents_pending') = :status_filter")
+        where_clauses.append("co.status = :status_filter")
         params["status_filter"] = status_filter
     if year_filter:
-        where_clauses.append("COALESCE(f.filing_year, EXTRACT(YEAR FROM NOW())::int) = :year_filter")
+        where_clauses.append("COALESCE(co.filing_year, EXTRACT(YEAR FROM NOW())::int) = :year_filter")
         params["year_filter"] = year_filter
+    if assigned_admin_id:
+        where_clauses.append("co.assigned_admin_id = :assigned_admin_id")
+        params["assigned_admin_id"] = assigned_admin_id
     if email:
-        where_clauses.append("u.email = :email")
+        where_clauses.append("co.email = :email")
         params["email"] = email
     elif search:
-        where_clauses.append(
-            "(u.first_name || ' ' || u.last_name ILIKE :search OR u.email ILIKE :search)"
-        )
-        params["search"] = f"%{search}%"
+        search_sql, rank_sql, search_params = text_search(["co.name", "co.email"], search)
+        where_clauses.append(search_sql)
+        params.update(search_params)
 
     where_sql = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
-
-    # Total count
-    count_sql = f"SELECT COUNT(*) FROM users u LEFT JOIN filings f ON f.user_id = u.id {where_sql}"
-    count_result = await db.execute(text(count_sql), params)
-    total = count_result.scalar() or 0
+    total = await _count_clients(db, where_sql, params, count)
 
     # Paginated rows
-    offset = (page - 1) * page_size
+    page_params = dict(params)
+    if cursor:
+        try:
+            cursor_created_at, cursor_id = decode_cursor(cursor, 2)
+            page_params["cursor_created_at"] = datetime.fromisoformat(cursor_created_at)
+            page_params["cursor_id"] = UUID(cursor_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        where_clauses.append(
+            "(co.created_at, co.client_id) < (:cursor_created_at, :cursor_id)"
+        )
+        page_sql = "LIMIT :limit"
+    else:
+        page_sql = "LIMIT :limit OFFSET :offset"
+        page_params["offset"] = (page - 1) * page_size
+
+    where_sql = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
+    order_sql = "co.created_at DESC, co.client_id DESC"
+    if rank_sql:
+        order_sql = f"{rank_sql} DESC, {order_sql}"
     data_sql = f"""
         {_BASE_SQL}
         {where_sql}
-        ORDER BY created_at DESC
-        LIMIT :limit OFFSET :offset
+        ORDER BY {order_sql}
+        {page_sql}
     """
-    params["limit"] = page_size
-    params["offset"] = offset
-    result = await db.execute(text(data_sql), params)
+    # Fetch one extra row to learn whether another page follows
+    page_params["limit"] = page_size + 1
+    result = await db.execute(text(data_sql), page_params)
     rows = result.fetchall()
 
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        if not searching:
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
     clients = [ClientResponse(**_row_to_client(r)) for r in rows]
-    pagination = calculate_pagination(page, page_size, total)
+    if total is not None:
+        pagination = calculate_pagination(page, page_size, total)
+    else:
+        pagination = {"page": page, "page_size": page_size, "total": None, "total_pages": None}
 
-    return ClientListResponse(clients=clients, **pagination)
+    return ClientListResponse(
+        clients=clients,
+        next_cursor=next_cursor,
+        total_is_estimate=count == "estimate",
+        **pagination
+    )
 
 
 @router.get("/{client_id}", response_model=ClientResponse)
@@ -135,13 +220,15 @@ async def get_client(
     db: AsyncSession = Depends(get_db),
     current_admin = Depends(get_current_admin)
 ):
-    """Get a specific client by filing ID or user ID."""
+    """Get a specific client by filing ID or user ID (a user's latest filing)."""
+    client = await resolve_client(db, client_id)
+    if client is None:
+        raise HTTPException(status_code=404, detail="Client not found")
     sql = f"""
         {_BASE_SQL}
-        WHERE f.id = :id OR u.id = :id
-        LIMIT 1
+        WHERE co.client_id = :id
     """
-    result = await db.execute(text(sql), {"id": str(client_id)})
+    result = await db.execute(text(sql), {"id": client.overview_id})
     row = result.fetchone()
 
     if not row:
@@ -170,6 +257,7 @@ async def create_client(
     db.add(client)
     await db.commit()
     await db.refresh(client)
+    await invalidate_cache("clients", "analytics")
     
     # Create audit log
     await create_audit_log(
@@ -199,6 +287,19 @@ async def update_client(
     if "total_amount" in updates:
         filing_updates["total_fee"] = updates["total_amount"]
 
+    if "assigned_admin_id" in updates:
+        client = await resolve_client(db, client_id, use_cache=False)
+        if client is None or client.filing_id is None:
+            raise HTTPException(status_code=400, detail="Only filings can be assigned to an admin")
+        admin_id = updates["assigned_admin_id"]
+        if admin_id is not None:
+            admin_active = (await db.execute(
+                select(AdminUser.is_active).where(AdminUser.id == admin_id)
+            )).scalar()
+            if not admin_active:
+                raise HTTPException(status_code=400, detail="Assigned admin not found or inactive")
+        await assign_filing(db, client_id, admin_id)
+
     if filing_updates:
         set_clause = ", ".join(f"{k} = :{k}" for k in filing_updates)
         filing_updates["fid"] = str(client_id)
@@ -206,7 +307,11 @@ async def update_client(
             text(f"UPDATE filings SET {set_clause}, updated_at = NOW() WHERE id = :fid"),
             filing_updates
         )
+
+    if filing_updates or "assigned_admin_id" in updates:
         await db.commit()
+        await invalidate_workload()
+        await invalidate_cache("clients", "analytics")
 
     # Audit log
     await create_audit_log(
@@ -234,6 +339,7 @@ async def delete_client(
     client_name = client.name
     await db.delete(client)
     await db.commit()
+    await invalidate_cache("clients", "analytics")
     
     # Create audit log
     await create_audit_log(
@@ -1,7 +1,7 @@
 """
 Document routes — reads from production documents table (keyed by filing_id).
 The frontend passes client_id which may be a filing.id or user.id;
-we resolve to all matching documents.
+it is resolved to the matching filings (app.services.client_resolver).
 """
 from typing import Optional
 from uuid import UUID
@@ -11,6 +11,9 @@ from sqlalchemy import text
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_admin
+from app.core.redis_cache import invalidate_cache
+from app.core.utils import text_search
+from app.services.client_resolver import resolve_client
 
 router = APIRouter()
 
@@ -29,27 +32,33 @@ async def get_documents(
     
     The production schema uses filing_id (not client_id).
     client_id param is treated as user_id OR filing_id for backwards compat.
+    ``search`` matches name or filename and orders by relevance.
     """
     where_clauses = []
     params: dict = {}
+    order_sql = "d.created_at DESC"
 
     if filing_id:
         where_clauses.append("d.filing_id = :filing_id")
         params["filing_id"] = filing_id
     elif client_id:
-        # client_id might be a user_id or a filing_id — resolve both
-        where_clauses.append(
-            "(d.filing_id = :cid::uuid OR d.filing_id IN (SELECT id FROM filings WHERE user_id = :cid::uuid))"
-        )
-        params["cid"] = client_id
+        # client_id might be a user_id or a filing_id
+        client = await resolve_client(db, client_id)
+        if client is None or not client.scope:
+            return {"documents": [], "total": 0}
+        where_clauses.append("d.filing_id = ANY(CAST(:filing_ids AS uuid[]))")
+        params["filing_ids"] = list(client.scope)
 
     if status_filter:
         where_clauses.append("d.status = :status_filter")
         params["status_filter"] = status_filter
 
     if search:
-        where_clauses.append("(d.name ILIKE :search OR d.original_filename ILIKE :search)")
-        params["search"] = f"%{search}%"
+        search_sql, rank_sql, search_params = text_search(["d.name", "d.original_filename"], search)
+        where_clauses.append(search_sql)
+        params.update(search_params)
+        if rank_sql:
+            order_sql = f"{rank_sql} DESC, {order_sql}"
 
     where_sql = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
 
@@ -65,7 +74,7 @@ async def get_documents(
         JOIN filings f ON f.id = d.filing_id
         JOIN users u ON u.id = f.user_id
         {where_sql}
-        ORDER BY d.created_at DESC
+        ORDER BY {order_sql}
     """)
 
     result = await db.execute(sql, params)
@@ -113,6 +122,7 @@ async def update_document_status(
         updates
     )
     await db.commit()
+    await invalidate_cache("analytics")
     return {"message": "Document updated", "id": str(document_id)}
 
 
@@ -132,3 +142,4 @@ async def delete_document(
 
     await db.execute(text("DELETE FROM documents WHERE id = :id"), {"id": str(document_id)})
     await db.commit()
+    await invalidate_cache("analytics")
@@ -0,0 +1,92 @@
+"""
+Live dashboard updates (server-sent events)
+
+GET /events streams small change events instead of the dashboard polling
+/analytics, /clients and /notifications:
+
+  data: {"type": "payments", "op": "insert", "count": 1, "filing_ids": ["..."]}
+
+``type`` is the table written (filings, payments, documents, notifications)
+and the ids are the filings, or users for notifications, that changed; null
+means too many to list. ``ready`` opens the stream and ``resync`` means events
+may have been missed: refetch everything. A ``: ping`` comment is sent every
+EVENTS_HEARTBEAT_SECONDS.
+
+EventSource cannot send an Authorization header, and an access token in the
+URL would end up in proxy and server logs. The client first calls
+POST /events/ticket with its bearer token and opens the stream with the
+single-use ticket it gets back (valid EVENTS_TICKET_TTL seconds). A stream
+ends when the access token expires, or after EVENTS_STREAM_MAX_SECONDS, and
+the client reconnects with a new ticket.
+"""
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.auth import decode_token, issue_stream_ticket, redeem_stream_ticket
+from app.core.config import settings
+from app.core.dependencies import active_admin, get_current_admin, security
+from app.services.events import event_hub
+
+router = APIRouter()
+
+_READY = 'retry: 5000\nevent: ready\ndata: {"type": "ready"}\n\n'
+
+
+@router.post("/ticket")
+async def create_stream_ticket(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_admin=Depends(get_current_admin),
+):
+    """Issue a single-use ticket for opening GET /events."""
+    expires_at = (decode_token(credentials.credentials) or {}).get("exp") or time.time()
+    ticket = await issue_stream_ticket(current_admin.id, expires_at)
+    return {"ticket": ticket, "expires_in": settings.EVENTS_TICKET_TTL}
+
+
+@router.get("")
+async def stream_events(
+    ticket: str = Query(..., description="From POST /events/ticket; single use"),
+):
+    """Stream dashboard change events."""
+    redeemed = await redeem_stream_ticket(ticket)
+    if redeemed is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired stream ticket",
+        )
+    admin_id, expires_at = redeemed
+    await active_admin(admin_id)
+    if event_hub.full:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many open event streams")
+    expires_at = min(expires_at, time.time() + settings.EVENTS_STREAM_MAX_SECONDS)
+
+    async def stream():
+        # Subscribed only once the body streams: a client gone before then
+        # never runs this generator, so nothing would unsubscribe it
+        queue = event_hub.subscribe()
+        try:
+            yield _READY
+            while True:
+                remaining = expires_at - time.time()
+                if remaining <= 0:
+                    return
+                try:
+                    payload = await asyncio.wait_for(
+                        queue.get(), min(settings.EVENTS_HEARTBEAT_SECONDS, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"data: {payload}\n\n"
+        finally:
+            event_hub.unsubscribe(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,5 +1,6 @@
 """
-Filings admin routes — reads from production filings + users tables.
+Filings admin routes — reads from the client_overview table (one row per filing,
+maintained from the production filings + users tables).
 """
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
@@ -11,25 +12,19 @@ from app.core.dependencies import get_current_admin
 
 router = APIRouter()
 
-_BASE = text("""
+_BASE_SQL = """
     SELECT
-        f.id, f.filing_year, f.status, f.total_fee,
-        f.created_at, f.updated_at,
-        u.id          AS user_id,
-        u.first_name  AS first_name,
-        u.last_name   AS last_name,
-        u.email,
-        u.phone,
-        u.first_name || ' ' || u.last_name AS client_name,
-        COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.filing_id = f.id), 0) AS paid_amount,
-        (SELECT COUNT(*) FROM documents d WHERE d.filing_id = f.id)  AS document_count,
-        tf.id   AS t1_form_id,
-        tf.status AS t1_status,
-        tf.completion_percentage
-    FROM filings f
-    JOIN users u ON u.id = f.user_id
-    LEFT JOIN t1_forms tf ON tf.filing_id = f.id
-""")
+        co.filing_id  AS id,
+        co.filing_year, co.status, co.total_fee,
+        co.created_at, co.updated_at,
+        co.user_id, co.first_name, co.last_name,
+        co.email, co.phone,
+        co.name       AS client_name,
+        co.paid_amount,
+        co.document_count,
+        co.t1_form_id, co.t1_status, co.completion_percentage
+    FROM client_overview co
+"""
 
 
 def _row_to_dict(r) -> dict:
@@ -57,17 +52,10 @@ async def list_filings(
     db: AsyncSession = Depends(get_db),
     current_admin = Depends(get_current_admin)
 ):
-    sql = text("""
-        SELECT f.id, f.filing_year, f.status, f.total_fee, f.created_at, f.updated_at,
-               u.id AS user_id, u.first_name, u.last_name, u.email, u.phone,
-               u.first_name || ' ' || u.last_name AS client_name,
-               COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.filing_id = f.id), 0) AS paid_amount,
-               (SELECT COUNT(*) FROM documents d WHERE d.filing_id = f.id) AS document_count,
-               tf.id AS t1_form_id, tf.status AS t1_status, tf.completion_percentage
-        FROM filings f
-        JOIN users u ON u.id = f.user_id
-        LEFT JOIN t1_forms tf ON tf.filing_id = f.id
-        ORDER BY f.created_at DESC
+    sql = text(f"""
+        {_BASE_SQL}
+        WHERE co.filing_id IS NOT NULL
+        ORDER BY co.created_at DESC
     """)
     result = await db.execute(sql)
     rows = result.fetchall()
@@ -83,17 +71,9 @@ async def get_filing(
     db: AsyncSession = Depends(get_db),
     current_admin = Depends(get_current_admin)
 ):
-    sql = text("""
-        SELECT f.id, f.filing_year, f.status, f.total_fee, f.created_at, f.updated_at,
-               u.id AS user_id, u.first_name, u.last_name, u.email, u.phone,
-               u.first_name || ' ' || u.last_name AS client_name,
-               COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.filing_id = f.id), 0) AS paid_amount,
-               (SELECT COUNT(*) FROM documents d WHERE d.filing_id = f.id) AS document_count,
-               tf.id AS t1_form_id, tf.status AS t1_status, tf.completion_percentage
-        FROM filings f
-        JOIN users u ON u.id = f.user_id
-        LEFT JOIN t1_forms tf ON tf.filing_id = f.id
-        WHERE f.id = :id
+    sql = text(f"""
+        {_BASE_SQL}
+        WHERE co.filing_id = :id
     """)
     result = await db.execute(sql, {"id": str(filing_id)})
     row = result.fetchone()
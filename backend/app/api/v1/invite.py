@@ -7,8 +7,6 @@ from __future__ import annotations
 import logging
 import uuid as uuidlib
 from datetime import datetime
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -19,6 +17,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.dependencies import get_current_admin
 from app.core.config import settings
+from app.core.mailer import EmailMessage, mailer
 
 logger = logging.getLogger(__name__)
 
@@ -176,41 +175,17 @@ If you have any questions, just reply to this email.
     return subject, html, plain
 
 
-def _send_ses_email(*, to_email: str, subject: str, html_body: str, plain_body: str) -> dict:
-    """Send email via SES. Returns {"sent": True/False, ...}."""
-    if not getattr(settings, "ENABLE_EMAIL_NOTIFICATIONS", True):
+async def _send_invite_email(*, to_email: str, subject: str, html_body: str, plain_body: str) -> dict:
+    """Send through the shared mailer. Returns {"sent": True/False, ...}."""
+    if not settings.ENABLE_EMAIL_NOTIFICATIONS:
         return {"sent": False, "reason": "disabled"}
     if not to_email:
         return {"sent": False, "reason": "no-recipient"}
 
     try:
-        import boto3
-        from botocore.exceptions import BotoCoreError, ClientError
-
-        client = boto3.client(
-            "ses",
-            region_name=settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        )
-
-        sender_email = settings.SES_FROM_EMAIL
-        sender_name = settings.SENDER_NAME
-
-        mime = MIMEMultipart("alternative")
-        mime["Subject"] = subject
-        mime["From"] = f"{sender_name} <{sender_email}>"
-        mime["To"] = to_email
-        mime.attach(MIMEText(plain_body, "plain", "utf-8"))
-        mime.attach(MIMEText(html_body, "html", "utf-8"))
-
-        resp = client.send_raw_email(
-            Source=sender_email,
-            Destinations=[to_email],
-            RawMessage={"Data": mime.as_string()},
-        )
-        logger.info(f"invite.email.sent to={to_email} ses_id={resp.get('MessageId')}")
-        return {"sent": True, "ses_message_id": resp.get("MessageId")}
+        message_id = await mailer.send(EmailMessage(to=to_email, subject=subject, html=html_body, plain=plain_body))
+        logger.info(f"invite.email.sent to={to_email} message_id={message_id}")
+        return {"sent": True, "message_id": message_id}
     except Exception as exc:
         logger.error(f"invite.email.failed to={to_email} error={exc}")
         return {"sent": False, "error": str(exc)}
@@ -231,7 +206,7 @@ async def invite_client(
         personal_message=req.personal_message or "",
     )
 
-    result = _send_ses_email(
+    result = await _send_invite_email(
         to_email=req.email,
         subject=subject,
         html_body=html,
@@ -1,7 +1,7 @@
 """
 Payment routes — reads from production payments table (keyed by filing_id).
 The frontend passes client_id which may be a filing.id or user.id;
-we resolve to all matching payments.
+it is resolved to the matching filings (app.services.client_resolver).
 """
 from typing import Optional
 from uuid import UUID, uuid4
@@ -12,7 +12,9 @@ from sqlalchemy import text
 from app.core.database import get_db
 from app.core.dependencies import get_current_admin, require_permission
 from app.core.permissions import PERMISSIONS
+from app.core.redis_cache import invalidate_cache
 from app.core.utils import create_audit_log
+from app.services.client_resolver import resolve_client
 
 router = APIRouter()
 
@@ -37,10 +39,11 @@ async def get_payments(
         where_clauses.append("p.filing_id = :filing_id")
         params["filing_id"] = filing_id
     elif client_id:
-        where_clauses.append(
-            "(p.filing_id = :cid::uuid OR p.filing_id IN (SELECT id FROM filings WHERE user_id = :cid::uuid))"
-        )
-        params["cid"] = client_id
+        client = await resolve_client(db, client_id)
+        if client is None or not client.scope:
+            return {"payments": [], "total": 0, "total_revenue": 0.0, "avg_payment": 0}
+        where_clauses.append("p.filing_id = ANY(CAST(:filing_ids AS uuid[]))")
+        params["filing_ids"] = list(client.scope)
 
     where_sql = ("WHERE " + " AND ".join(where_clauses)) if where_clauses else ""
 
@@ -101,21 +104,12 @@ async def create_payment(
     if not filing_id or not amount:
         raise HTTPException(status_code=400, detail="filing_id and amount are required")
 
-    # Verify filing exists
-    check = await db.execute(
-        text("SELECT id FROM filings WHERE id = :fid"),
-        {"fid": filing_id}
-    )
-    if not check.fetchone():
-        # Maybe client_id is user_id — find their latest filing
-        filing_result = await db.execute(
-            text("SELECT id FROM filings WHERE user_id = :uid ORDER BY created_at DESC LIMIT 1"),
-            {"uid": filing_id}
-        )
-        row = filing_result.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Filing not found")
-        filing_id = str(row.id)
+    # A filing id, or a user id standing for the user's latest filing (read
+    # fresh: a cached list may miss a new filing or hold a deleted one)
+    client = await resolve_client(db, filing_id, use_cache=False)
+    filing_id = client and (client.filing_id or client.latest_filing_id)
+    if not filing_id:
+        raise HTTPException(status_code=404, detail="Filing not found")
 
     payment_id = str(uuid4())
     await db.execute(
@@ -133,6 +127,7 @@ async def create_payment(
         }
     )
     await db.commit()
+    await invalidate_cache("analytics")
 
     await create_audit_log(
         db, "Payment Added", "payment", payment_id, current_admin.id,
@@ -164,4 +159,5 @@ async def delete_payment(
 
     await db.execute(text("DELETE FROM payments WHERE id = :id"), {"id": str(payment_id)})
     await db.commit()
+    await invalidate_cache("analytics")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
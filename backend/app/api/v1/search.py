@@ -0,0 +1,139 @@
+"""
+Global search across clients, filings, documents and notifications.
+
+Reads the trigger-maintained ``search_index`` table (scripts/search_schema.py)
+instead of scanning each source table. Every word of the query must match an
+indexed word, the last one as a prefix since it may still be being typed, so
+"smith 202" finds Smith's 2024 filing. Results are grouped by entity type,
+best match first within each group, with a highlighted snippet. Words matched
+exactly rank above prefix matches.
+"""
+import html
+import re
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.dependencies import get_current_admin
+
+router = APIRouter()
+
+EntityType = Literal["client", "filing", "document", "notification"]
+ENTITY_TYPES: tuple[str, ...] = ("client", "filing", "document", "notification")
+
+# Words are split exactly as the index splits them (search_terms in SQL)
+_WORD_RE = re.compile(r"[^\W_]+")
+_MAX_WORDS = 8
+
+# ts_headline markers; the snippet is HTML-escaped before they become <mark>
+_MARK_START, _MARK_END = "\x02", "\x03"
+_HEADLINE_OPTIONS = f"StartSel={_MARK_START}, StopSel={_MARK_END}, HighlightAll=true"
+
+
+def _queries(term: str) -> tuple[str, str]:
+    """(tsquery requiring every word, the last as a prefix; tsquery matching any word exactly)"""
+    words = _WORD_RE.findall(term.lower())[:_MAX_WORDS]
+    if not words:
+        return "", ""
+    # A prefix match reads every row of every matching word; whole words let
+    # GIN skip through the common ones
+    return " & ".join(words[:-1] + [f"{words[-1]}:*"]), " | ".join(words)
+
+
+def _group_sql(entity: str) -> str:
+    # Ranking is over at most SEARCH_CANDIDATE_LIMIT matches, so a very broad
+    # query stays cheap at the cost of an approximate order
+    return f"""
+        (SELECT '{entity}' AS entity_type, r.*
+         FROM (
+             SELECT c.entity_id, c.user_id, c.filing_id, c.title, c.subtitle, c.body, c.created_at,
+                    ts_rank_cd(c.document, to_tsquery('simple', :match))
+                        + ts_rank_cd(c.document, to_tsquery('simple', :exact)) AS rank
+             FROM (
+                 SELECT * FROM search_index
+                 WHERE entity_type = '{entity}' AND document @@ to_tsquery('simple', :match)
+                 LIMIT :candidates
+             ) c
+             ORDER BY rank DESC, c.created_at DESC NULLS LAST
+             LIMIT :limit
+         ) r)
+    """
+
+
+def _snippet(headline: Optional[str]) -> Optional[str]:
+    if not headline:
+        return None
+    return html.escape(headline).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=2, max_length=100),
+    types: Optional[List[EntityType]] = Query(None, description="Entity types to search; all by default"),
+    limit: int = Query(5, ge=1, le=20, description="Results per type"),
+    db: AsyncSession = Depends(get_db),
+    current_admin=Depends(get_current_admin),
+):
+    """
+    Search every entity type at once. Returns one group per type, in a fixed
+    order, each with up to ``limit`` results and ``has_more`` when more
+    matched. ``snippet`` is HTML with the matched words in ``<mark>``.
+    """
+    entities = [e for e in ENTITY_TYPES if not types or e in types]
+    match, exact = _queries(q)
+    if not match:
+        return {"query": q, "groups": [{"type": e, "results": [], "has_more": False} for e in entities], "total": 0}
+
+    # A word in most rows ("t4") would otherwise make the GIN scan return
+    # every match before LIMIT applies; past this many it returns a sample
+    await db.execute(
+        text("SELECT set_config('gin_fuzzy_search_limit', :n, true)"),
+        {"n": str(settings.SEARCH_FUZZY_LIMIT)},
+    )
+    sql = f"""
+        SELECT r.*,
+               ts_headline('simple', r.body, to_tsquery('simple', :match), :headline) AS snippet,
+               NULLIF(btrim(concat_ws(' ', u.first_name, u.last_name)), '') AS client_name
+        FROM ({" UNION ALL ".join(_group_sql(e) for e in entities)}) r
+        LEFT JOIN users u ON u.id = r.user_id
+    """
+    rows = (await db.execute(text(sql), {
+        "match": match,
+        "exact": exact,
+        "candidates": settings.SEARCH_CANDIDATE_LIMIT,
+        # One extra row per type to learn whether more matched
+        "limit": limit + 1,
+        "headline": _HEADLINE_OPTIONS,
+    })).fetchall()
+
+    grouped: dict[str, list] = {e: [] for e in entities}
+    for r in rows:
+        grouped[r.entity_type].append(r)
+    groups = []
+    for entity, matches in grouped.items():
+        # The join does not keep each group's order
+        matches.sort(key=lambda r: (r.rank, r.created_at.timestamp() if r.created_at else 0), reverse=True)
+        groups.append({
+            "type": entity,
+            "results": [
+                {
+                    "type": entity,
+                    "id": str(r.entity_id),
+                    "client_id": str(r.user_id) if r.user_id else None,
+                    "filing_id": str(r.filing_id) if r.filing_id else None,
+                    "title": r.title,
+                    "subtitle": r.subtitle,
+                    "client_name": r.client_name,
+                    "snippet": _snippet(r.snippet),
+                    "rank": round(float(r.rank), 4),
+                    "created_at": r.created_at.isoformat() if r.created_at else None,
+                }
+                for r in matches[:limit]
+            ],
+            "has_more": len(matches) > limit,
+        })
+    return {"query": q, "groups": groups, "total": sum(len(g["results"]) for g in groups)}
@@ -10,6 +10,7 @@ from sqlalchemy import text
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_admin
+from app.core.utils import text_search, user_name_sql
 
 router = APIRouter()
 tax_router = APIRouter()   # mounted at /tax/t1-personal
@@ -382,18 +383,22 @@ async def search_users(
     db: AsyncSession = Depends(get_db),
     current_admin = Depends(get_current_admin)
 ):
-    """Search users by email or name (for admin lookup)."""
+    """Search users by email or name (for admin lookup), best matches first."""
     where = ""
+    order = "u.created_at DESC"
     params: dict = {"limit": page_size}
     if search:
-        where = "WHERE u.email ILIKE :search OR (u.first_name || ' ' || u.last_name) ILIKE :search"
-        params["search"] = f"%{search}%"
+        search_sql, rank_sql, search_params = text_search([user_name_sql("u"), "u.email"], search)
+        where = f"WHERE {search_sql}"
+        if rank_sql:
+            order = f"{rank_sql} DESC, {order}"
+        params.update(search_params)
 
     sql = text(f"""
         SELECT u.id, u.email, u.first_name, u.last_name, u.phone, u.created_at
         FROM users u
         {where}
-        ORDER BY u.created_at DESC
+        ORDER BY {order}
         LIMIT :limit
     """)
     result = await db.execute(sql, params)
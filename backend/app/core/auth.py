@@ -1,8 +1,18 @@
 """
 Authentication and authorization utilities
+
+bcrypt costs a few hundred milliseconds of CPU per hash. The async helpers
+(``hash_password``, ``verify_and_update_password``) run it in a bounded thread
+pool, so a login does not stall other requests on the worker. bcrypt releases
+the GIL while hashing. The sync ``verify_password``/``get_password_hash`` are
+kept for CLI scripts.
 """
+import asyncio
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,10 +20,16 @@ from sqlalchemy import select
 from uuid import UUID
 
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis_cache import cache
 from app.models.admin_user import AdminUser
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# Password hashing context; hashes with a different cost are upgraded on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+_password_pool: Optional[ThreadPoolExecutor] = None
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -26,6 +42,41 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_in_password_pool(func: Callable[..., T], *args) -> T:
+    """Run a bcrypt call off the event loop (inline when BCRYPT_MAX_THREADS is 0)"""
+    global _password_pool
+    if settings.BCRYPT_MAX_THREADS <= 0:
+        return func(*args)
+    if _password_pool is None:
+        _password_pool = ThreadPoolExecutor(
+            max_workers=settings.BCRYPT_MAX_THREADS, thread_name_prefix="bcrypt"
+        )
+    return await asyncio.get_running_loop().run_in_executor(_password_pool, func, *args)
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run_in_password_pool(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password without blocking the event loop
+
+    Returns ``(valid, new_hash)``. ``new_hash`` is set when the stored hash used
+    another cost factor or scheme and should be replaced.
+    """
+    return await _run_in_password_pool(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+def shutdown_password_pool() -> None:
+    """Stop the bcrypt threads (application shutdown)"""
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=False, cancel_futures=True)
+        _password_pool = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -63,6 +114,103 @@ async def get_admin_user(db: AsyncSession, user_id: UUID) -> Optional[AdminUser]
     return result.scalar_one_or_none()
 
 
+@dataclass(frozen=True)
+class AdminPrincipal:
+    """The authenticated admin as authorization sees it (cached, detached from any session)"""
+    id: UUID
+    email: str
+    name: str
+    role: str
+    permissions: tuple[str, ...]
+    is_active: bool
+
+    @classmethod
+    def from_admin(cls, admin: AdminUser) -> "AdminPrincipal":
+        return cls(
+            id=admin.id,
+            email=admin.email,
+            name=admin.name,
+            role=admin.role,
+            permissions=tuple(admin.permissions or ()),
+            is_active=admin.is_active,
+        )
+
+
+def _principal_key(admin_id: UUID) -> str:
+    return f"auth:principal:{admin_id}"
+
+
+async def get_admin_principal(admin_id: UUID) -> Optional[AdminPrincipal]:
+    """
+    Resolve a token subject to its principal
+
+    Served from the cache (worker-local tier first); the database is read only
+    on a miss, with a session of its own.
+    """
+    key = _principal_key(admin_id)
+    cached = await cache.get(key, local_ttl=settings.LOCAL_CACHE_TTL)
+    if cached:
+        return AdminPrincipal(
+            id=UUID(cached["id"]),
+            email=cached["email"],
+            name=cached["name"],
+            role=cached["role"],
+            permissions=tuple(cached["permissions"]),
+            is_active=cached["is_active"],
+        )
+
+    async with AsyncSessionLocal() as db:
+        admin = await get_admin_user(db, admin_id)
+    if admin is None:
+        return None
+    principal = AdminPrincipal.from_admin(admin)
+    await cache.set(
+        key,
+        {**asdict(principal), "id": str(principal.id), "permissions": list(principal.permissions)},
+        settings.PRINCIPAL_CACHE_TTL,
+        local_ttl=settings.LOCAL_CACHE_TTL,
+    )
+    return principal
+
+
+async def invalidate_admin_principal(admin_id: UUID) -> None:
+    """Drop a cached principal on every worker (after role, permission or status changes)"""
+    await cache.delete(_principal_key(admin_id))
+
+
+def _stream_ticket_key(ticket: str) -> str:
+    return f"auth:stream_ticket:{ticket}"
+
+
+async def issue_stream_ticket(admin_id: UUID, expires_at: float) -> str:
+    """
+    A single-use ticket that opens one event stream for ``admin_id``
+
+    EventSource cannot send an Authorization header; the ticket goes in the
+    URL instead of the access token, and is worthless once used or after
+    EVENTS_TICKET_TTL seconds. ``expires_at`` (the access token's expiry) is
+    when the stream must end. Without Redis the ticket is only redeemable on
+    the worker that issued it.
+    """
+    ticket = secrets.token_urlsafe(32)
+    ttl = settings.EVENTS_TICKET_TTL
+    await cache.set(
+        _stream_ticket_key(ticket),
+        {"admin_id": str(admin_id), "expires_at": expires_at},
+        ttl,
+        local_ttl=None if cache.connected else ttl,
+    )
+    return ticket
+
+
+async def redeem_stream_ticket(ticket: str) -> Optional[tuple[UUID, float]]:
+    """Consume a stream ticket: (admin id, stream expiry), or None if unknown, used or expired"""
+    data = await cache.pop(_stream_ticket_key(ticket))
+    if not isinstance(data, dict):
+        return None
+    return UUID(data["admin_id"]), float(data["expires_at"])
+
+
 async def get_admin_user_by_email(db: AsyncSession, email: str) -> Optional[AdminUser]:
     """Get admin user by email"""
     result = await db.execute(select(AdminUser).where(AdminUser.email == email))
@@ -70,14 +218,22 @@ async def get_admin_user_by_email(db: AsyncSession, email: str) -> Optional[Admi
 
 
 async def authenticate_admin(db: AsyncSession, email: str, password: str) -> Optional[AdminUser]:
-    """Authenticate admin user"""
+    """
+    Authenticate admin user
+
+    An outdated hash is replaced on the returned admin; the caller's commit
+    persists it.
+    """
     admin = await get_admin_user_by_email(db, email)
     if not admin:
         return None
     if not admin.is_active:
         return None
-    if not verify_password(password, admin.password_hash):
+    valid, new_hash = await verify_and_update_password(password, admin.password_hash)
+    if not valid:
         return None
+    if new_hash:
+        admin.password_hash = new_hash
     return admin
 
 
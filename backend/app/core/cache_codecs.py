@@ -0,0 +1,199 @@
+"""
+Cache value codecs
+
+Every value written to Redis starts with one tag byte: the high nibble names
+the codec, the low nibble the compression. Readers dispatch on the tag, so
+the codec or compression can change between deploys without flushing Redis.
+An unknown or missing tag, for example a value written by the old JSON/pickle
+code, is treated as a cache miss. Nothing is ever unpickled.
+
+Codecs:
+  orjson  — JSON; datetime/UUID are encoded natively, and come back as
+            strings like the old serializer did (default)
+  msgpack — binary; datetime, date, UUID and Decimal round-trip as themselves,
+            at the cost of a Python callback per value
+  json    — stdlib JSON, same semantics as orjson (fallback)
+
+Compression (zstd or lz4) is applied only above CACHE_COMPRESS_MIN_BYTES.
+"""
+import json
+import logging
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - listed in requirements.txt
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - listed in requirements.txt
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+class CodecError(ValueError):
+    """Value cannot be decoded (unknown tag or corrupt payload)"""
+
+
+# Tag layout: 0x80 | codec << 4 | compression. Values >= 0x90 never start
+# valid JSON text, and are distinct from a pickle header (0x80).
+CODEC_JSON = 1
+CODEC_ORJSON = 2
+CODEC_MSGPACK = 3
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZSTD = 1
+COMPRESSION_LZ4 = 2
+
+_CODEC_IDS = {"json": CODEC_JSON, "orjson": CODEC_ORJSON, "msgpack": CODEC_MSGPACK}
+_COMPRESSION_IDS = {"none": COMPRESSION_NONE, "zstd": COMPRESSION_ZSTD, "lz4": COMPRESSION_LZ4}
+
+# msgpack extension type codes
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_UUID = 3
+_EXT_DECIMAL = 4
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, value.bytes)
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def _codec_functions(codec: int) -> tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise CodecError("msgpack is not installed")
+        return (
+            lambda value: msgpack.packb(value, default=_msgpack_default, use_bin_type=True),
+            lambda data: msgpack.unpackb(data, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False),
+        )
+    if codec == CODEC_ORJSON:
+        if orjson is None:
+            raise CodecError("orjson is not installed")
+        return (
+            lambda value: orjson.dumps(value, default=_json_default, option=orjson.OPT_NON_STR_KEYS),
+            orjson.loads,
+        )
+    if codec == CODEC_JSON:
+        return (
+            lambda value: json.dumps(value, default=_json_default, separators=(",", ":")).encode("utf-8"),
+            lambda data: json.loads(data.decode("utf-8")),
+        )
+    raise CodecError(f"Unknown codec {codec}")
+
+
+def _compress(compression: int, data: bytes) -> bytes:
+    if compression == COMPRESSION_ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if compression == COMPRESSION_LZ4:
+        return lz4_frame.compress(data)
+    return data
+
+
+def _decompress(compression: int, data: bytes) -> bytes:
+    if compression == COMPRESSION_NONE:
+        return data
+    if compression == COMPRESSION_ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(data)
+    if compression == COMPRESSION_LZ4 and lz4_frame is not None:
+        return lz4_frame.decompress(data)
+    raise CodecError(f"Compression {compression} not available")
+
+
+class CacheCodec:
+    """Encode/decode cache values with a leading tag byte"""
+
+    def __init__(self, codec: str = "orjson", compression: str = "zstd", compress_min_bytes: int = 1024):
+        if codec not in _CODEC_IDS:
+            raise ValueError(f"Unknown cache codec {codec!r}; choose one of {', '.join(_CODEC_IDS)}")
+        if compression not in _COMPRESSION_IDS:
+            raise ValueError(
+                f"Unknown cache compression {compression!r}; choose one of {', '.join(_COMPRESSION_IDS)}"
+            )
+        self.codec = _CODEC_IDS[codec]
+        self.compression = _COMPRESSION_IDS[compression]
+        if self.compression == COMPRESSION_ZSTD and zstandard is None:
+            logger.warning("zstandard not installed; cache values are stored uncompressed")
+            self.compression = COMPRESSION_NONE
+        if self.compression == COMPRESSION_LZ4 and lz4_frame is None:
+            logger.warning("lz4 not installed; cache values are stored uncompressed")
+            self.compression = COMPRESSION_NONE
+        self.compress_min_bytes = compress_min_bytes
+        self._encode, _ = _codec_functions(self.codec)
+
+    def encode(self, value: Any) -> bytes:
+        payload = self._encode(value)
+        compression = COMPRESSION_NONE
+        if self.compression != COMPRESSION_NONE and len(payload) >= self.compress_min_bytes:
+            compressed = _compress(self.compression, payload)
+            if len(compressed) < len(payload):
+                payload, compression = compressed, self.compression
+        return bytes((0x80 | self.codec << 4 | compression,)) + payload
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        """Decode any tagged value, whichever codec wrote it; raises CodecError"""
+        if not data or data[0] < 0x90:
+            raise CodecError("Untagged cache value")
+        tag = data[0]
+        try:
+            _, decode = _codec_functions((tag >> 4) & 0x07)
+            return decode(_decompress(tag & 0x0F, data[1:]))
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(f"Corrupt cache value: {e}") from e
+
+
+def build_codec(codec: Optional[str] = None, compression: Optional[str] = None) -> CacheCodec:
+    """Codec configured from settings (arguments override)"""
+    return CacheCodec(
+        codec or settings.CACHE_CODEC,
+        compression or settings.CACHE_COMPRESSION,
+        settings.CACHE_COMPRESS_MIN_BYTES,
+    )
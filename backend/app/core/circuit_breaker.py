@@ -0,0 +1,157 @@
+"""
+Circuit breaker for calls to a shared dependency (Redis)
+
+  closed    — calls go through; outcomes are counted in a sliding window of
+              one-second buckets
+  open      — the error rate or the slow-call rate crossed its threshold;
+              calls are refused without touching the network
+  half_open — after ``open_seconds`` a few probe calls are let through. Enough
+              successes close the circuit, any failure reopens it
+
+A dependency that is slow rather than down trips the breaker on latency
+alone, so callers stop paying its timeouts.
+"""
+import time
+from collections import deque
+from typing import Callable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Call refused because the circuit is open"""
+
+
+class CircuitBreaker:
+    """Error-rate and latency circuit breaker (one per worker, not thread-safe)"""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: int = 10,
+        min_calls: int = 20,
+        error_rate: float = 0.5,
+        slow_call_seconds: float = 0.1,
+        slow_rate: float = 0.8,
+        open_seconds: float = 5.0,
+        half_open_probes: int = 3,
+        on_close: Optional[Callable[[], None]] = None,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.on_close = on_close
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        # [second, calls, failures, slow calls], oldest first
+        self._buckets: deque[list[int]] = deque()
+        self._calls = 0
+        self._failures = 0
+        self._slow = 0
+
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (while half open, it becomes a probe)"""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.rejected += 1
+                return False
+            self._probes_in_flight += 1
+        return True
+
+    def record_success(self, elapsed: float) -> None:
+        slow = elapsed >= self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            if slow:
+                self._trip()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._close()
+            return
+        self._record(failed=False, slow=slow)
+
+    def record_failure(self) -> None:
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            self._trip()
+            return
+        self._record(failed=True, slow=False)
+
+    def record_cancelled(self) -> None:
+        """The caller gave up before an outcome; frees its probe slot"""
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        now = int(time.monotonic())
+        self._expire(now)
+        if not self._buckets or self._buckets[-1][0] != now:
+            self._buckets.append([now, 0, 0, 0])
+        bucket = self._buckets[-1]
+        bucket[1] += 1
+        bucket[2] += failed
+        bucket[3] += slow
+        self._calls += 1
+        self._failures += failed
+        self._slow += slow
+
+        if self.state == CLOSED and self._calls >= self.min_calls and (
+            self._failures >= self.error_rate * self._calls
+            or self._slow >= self.slow_rate * self._calls
+        ):
+            self._trip()
+
+    def _expire(self, now: int) -> None:
+        while self._buckets and self._buckets[0][0] <= now - self.window_seconds:
+            _, calls, failures, slow = self._buckets.popleft()
+            self._calls -= calls
+            self._failures -= failures
+            self._slow -= slow
+
+    def _reset_window(self) -> None:
+        self._buckets.clear()
+        self._calls = self._failures = self._slow = 0
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+        self._reset_window()
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._reset_window()
+        if self.on_close:
+            self.on_close()
+
+    def stats(self) -> dict:
+        self._expire(int(time.monotonic()))
+        return {
+            "state": self.state,
+            "window_calls": self._calls,
+            "window_failures": self._failures,
+            "window_slow_calls": self._slow,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
@@ -47,6 +47,27 @@ class Settings(BaseSettings):
     REDIS_PASSWORD: Optional[str] = Field(default=None, env="REDIS_PASSWORD")
     REDIS_DB: int = Field(default=0, env="REDIS_DB")
     REDIS_CACHE_TTL: int = Field(default=3600, env="REDIS_CACHE_TTL")  # 1 hour default
+    ANALYTICS_CACHE_TTL: int = Field(default=30, env="ANALYTICS_CACHE_TTL")  # dashboard figures, seconds
+    WORKLOAD_CACHE_TTL: int = Field(default=30, env="WORKLOAD_CACHE_TTL")  # per-admin workload, seconds
+    PRINCIPAL_CACHE_TTL: int = Field(default=30, env="PRINCIPAL_CACHE_TTL")  # resolved admin per token subject, seconds
+    CLIENT_RESOLVER_TTL: int = Field(default=60, env="CLIENT_RESOLVER_TTL")  # user/filing id -> user and filings, seconds
+    LOCAL_CACHE_MAX_ENTRIES: int = Field(default=1024, env="LOCAL_CACHE_MAX_ENTRIES")  # per-worker LRU size
+    LOCAL_CACHE_TTL: int = Field(default=5, env="LOCAL_CACHE_TTL")  # seconds a hot key is served from memory
+    CACHE_INVALIDATION_CHANNEL: str = Field(default="cache:invalidate", env="CACHE_INVALIDATION_CHANNEL")
+    CACHE_LOCK_TIMEOUT: int = Field(default=10, env="CACHE_LOCK_TIMEOUT")  # recompute lock, seconds
+    CACHE_XFETCH_BETA: float = Field(default=1.0, env="CACHE_XFETCH_BETA")  # >1 refreshes earlier
+    CACHE_CODEC: str = Field(default="orjson", env="CACHE_CODEC")  # orjson | msgpack | json
+    CACHE_COMPRESSION: str = Field(default="zstd", env="CACHE_COMPRESSION")  # zstd | lz4 | none
+    CACHE_COMPRESS_MIN_BYTES: int = Field(default=1024, env="CACHE_COMPRESS_MIN_BYTES")
+    REDIS_COMMAND_TIMEOUT: float = Field(default=0.25, env="REDIS_COMMAND_TIMEOUT")  # per-call deadline, seconds
+    CACHE_BREAKER_WINDOW_SECONDS: int = Field(default=10, env="CACHE_BREAKER_WINDOW_SECONDS")
+    CACHE_BREAKER_MIN_CALLS: int = Field(default=20, env="CACHE_BREAKER_MIN_CALLS")  # calls in window before tripping
+    CACHE_BREAKER_ERROR_RATE: float = Field(default=0.5, env="CACHE_BREAKER_ERROR_RATE")  # share of failed calls
+    CACHE_BREAKER_SLOW_CALL_SECONDS: float = Field(default=0.1, env="CACHE_BREAKER_SLOW_CALL_SECONDS")
+    CACHE_BREAKER_SLOW_RATE: float = Field(default=0.8, env="CACHE_BREAKER_SLOW_RATE")  # share of slow calls
+    CACHE_BREAKER_OPEN_SECONDS: float = Field(default=5, env="CACHE_BREAKER_OPEN_SECONDS")  # before probing
+    CACHE_BREAKER_HALF_OPEN_PROBES: int = Field(default=3, env="CACHE_BREAKER_HALF_OPEN_PROBES")
+    CACHE_DEGRADED_LOCAL_TTL: int = Field(default=30, env="CACHE_DEGRADED_LOCAL_TTL")  # local fallback while open
     
     # Security
     SECRET_KEY: str = Field(
@@ -56,6 +77,15 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=1440, env="ACCESS_TOKEN_EXPIRE_MINUTES")  # 24 hours
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=30, env="REFRESH_TOKEN_EXPIRE_DAYS")
+    BCRYPT_ROUNDS: int = Field(default=12, env="BCRYPT_ROUNDS")  # cost factor; older hashes are upgraded on login
+    LOGIN_RATE_LIMIT_IP: int = Field(default=30, env="LOGIN_RATE_LIMIT_IP")  # attempts per client address
+    LOGIN_RATE_LIMIT_IP_WINDOW: int = Field(default=60, env="LOGIN_RATE_LIMIT_IP_WINDOW")  # seconds
+    LOGIN_RATE_LIMIT_EMAIL: int = Field(default=10, env="LOGIN_RATE_LIMIT_EMAIL")  # failed attempts per account
+    LOGIN_RATE_LIMIT_EMAIL_WINDOW: int = Field(default=900, env="LOGIN_RATE_LIMIT_EMAIL_WINDOW")  # seconds
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = Field(default=10000, env="RATE_LIMIT_LOCAL_MAX_KEYS")  # fallback windows per worker
+    FORWARDED_PROXY_COUNT: int = Field(default=0, env="FORWARDED_PROXY_COUNT")  # trusted proxies setting X-Forwarded-For
+    # Concurrent hashes per worker (0 runs inline); leaves a core free for the event loop
+    BCRYPT_MAX_THREADS: int = Field(default_factory=lambda: max(1, (os.cpu_count() or 2) - 1), env="BCRYPT_MAX_THREADS")
     
     # CORS - Local dev + production admin frontend (Vercel)
     CORS_ORIGINS: Union[str, list[str]] = Field(
@@ -91,6 +121,7 @@ class Settings(BaseSettings):
     # Pagination
     DEFAULT_PAGE_SIZE: int = Field(default=20, env="DEFAULT_PAGE_SIZE")
     MAX_PAGE_SIZE: int = Field(default=100, env="MAX_PAGE_SIZE")
+    CLIENT_COUNT_CACHE_TTL: int = Field(default=30, env="CLIENT_COUNT_CACHE_TTL")  # seconds
 
     # Email (AWS SES)
     ENABLE_EMAIL_NOTIFICATIONS: bool = Field(default=True, env="ENABLE_EMAIL_NOTIFICATIONS")
@@ -99,6 +130,48 @@ class Settings(BaseSettings):
     AWS_REGION: str = Field(default="ca-central-1", env="AWS_REGION")
     AWS_ACCESS_KEY_ID: Optional[str] = Field(default=None, env="AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY: Optional[str] = Field(default=None, env="AWS_SECRET_ACCESS_KEY")
+    SES_ENDPOINT_URL: Optional[str] = Field(default=None, env="SES_ENDPOINT_URL")  # local SES stand-in
+    EMAIL_BACKEND: str = Field(default="ses", env="EMAIL_BACKEND")  # ses | smtp | file
+    SES_MAX_SEND_RATE: float = Field(default=14, env="SES_MAX_SEND_RATE")  # messages/second per process, 0 = unlimited
+    EMAIL_MAX_CONCURRENCY: int = Field(default=10, env="EMAIL_MAX_CONCURRENCY")  # sends in flight per process
+    SMTP_HOST: str = Field(default="localhost", env="SMTP_HOST")
+    SMTP_PORT: int = Field(default=1025, env="SMTP_PORT")
+    EMAIL_FILE_DIR: str = Field(default="/tmp/taxhub-mail", env="EMAIL_FILE_DIR")  # file backend output
+
+    # Push (Firebase Cloud Messaging)
+    FCM_SERVICE_ACCOUNT_JSON: Optional[str] = Field(default=None, env="FCM_SERVICE_ACCOUNT_JSON")  # JSON or file path
+    FCM_PROJECT_ID: str = Field(default="taxease-58eb1", env="FCM_PROJECT_ID")
+    FCM_ENDPOINT_URL: str = Field(default="https://fcm.googleapis.com", env="FCM_ENDPOINT_URL")  # local FCM stand-in
+    FCM_MAX_CONCURRENCY: int = Field(default=20, env="FCM_MAX_CONCURRENCY")  # requests in flight per process
+    FCM_REQUEST_TIMEOUT: float = Field(default=8.0, env="FCM_REQUEST_TIMEOUT")
+    FCM_TOKEN_REFRESH_MARGIN_SECONDS: int = Field(default=300, env="FCM_TOKEN_REFRESH_MARGIN_SECONDS")  # before expiry
+    DEVICE_TOKEN_CACHE_TTL: int = Field(default=600, env="DEVICE_TOKEN_CACHE_TTL")  # per-user push tokens, seconds
+
+    # Notification delivery worker
+    NOTIFICATION_WORKER_BATCH: int = Field(default=50, env="NOTIFICATION_WORKER_BATCH")  # outbox rows per claim
+    NOTIFICATION_WORKER_CONCURRENCY: int = Field(default=10, env="NOTIFICATION_WORKER_CONCURRENCY")  # sends in flight
+    NOTIFICATION_WORKER_POLL_SECONDS: float = Field(default=5, env="NOTIFICATION_WORKER_POLL_SECONDS")  # besides LISTEN
+    NOTIFICATION_LEASE_SECONDS: int = Field(default=120, env="NOTIFICATION_LEASE_SECONDS")  # before a claim is retaken
+    NOTIFICATION_MAX_ATTEMPTS: int = Field(default=8, env="NOTIFICATION_MAX_ATTEMPTS")
+    NOTIFICATION_RETRY_BASE_SECONDS: float = Field(default=15, env="NOTIFICATION_RETRY_BASE_SECONDS")  # doubles per attempt
+    NOTIFICATION_UNREAD_TTL: int = Field(default=3600, env="NOTIFICATION_UNREAD_TTL")  # cached unread count, seconds
+    NOTIFICATION_DIGEST_WINDOW_SECONDS: int = Field(default=300, env="NOTIFICATION_DIGEST_WINDOW_SECONDS")  # 0 = off
+    NOTIFICATION_DIGEST_TYPES: str = Field(  # comma-separated; merged per user within the window
+        default="document_request,status_update,reupload_requested", env="NOTIFICATION_DIGEST_TYPES"
+    )
+
+    # Dashboard event feed (GET /events, server-sent events)
+    EVENTS_MAX_CONNECTIONS: int = Field(default=1000, env="EVENTS_MAX_CONNECTIONS")  # open streams per worker
+    EVENTS_HEARTBEAT_SECONDS: float = Field(default=15, env="EVENTS_HEARTBEAT_SECONDS")  # keeps proxies from timing out
+    EVENTS_QUEUE_SIZE: int = Field(default=100, env="EVENTS_QUEUE_SIZE")  # per stream; a slow reader gets a resync
+    EVENTS_RELAY_LOCK_TTL: float = Field(default=15, env="EVENTS_RELAY_LOCK_TTL")  # relay lease, renewed every third
+    EVENTS_REDIS_CHANNEL: str = Field(default="events:dashboard", env="EVENTS_REDIS_CHANNEL")
+    EVENTS_TICKET_TTL: int = Field(default=30, env="EVENTS_TICKET_TTL")  # seconds to open a stream with a ticket
+    EVENTS_STREAM_MAX_SECONDS: int = Field(default=3600, env="EVENTS_STREAM_MAX_SECONDS")  # then reconnect, re-checking the admin
+
+    # Global search (GET /search)
+    SEARCH_CANDIDATE_LIMIT: int = Field(default=200, env="SEARCH_CANDIDATE_LIMIT")  # matches ranked per type
+    SEARCH_FUZZY_LIMIT: int = Field(default=5000, env="SEARCH_FUZZY_LIMIT")  # gin_fuzzy_search_limit; 0 = exact
     
 # Global settings instance
 settings = Settings()
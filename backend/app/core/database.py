@@ -1,9 +1,9 @@
 """
 Database configuration and connection management
 """
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Callable, Iterable
 from .config import settings
 
 # Create async engine with connection pooling
@@ -44,6 +44,31 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def release_listen_connection(
+    conn: AsyncConnection, listeners: Iterable[tuple[str, Callable[..., Any]]]
+) -> None:
+    """
+    Close a connection used for LISTEN, removing its (channel, callback) listeners first
+
+    A connection returned to the pool while still LISTENing would keep
+    queueing NOTIFY payloads for callbacks nobody reads. When the listeners
+    cannot be removed the connection is discarded instead of pooled.
+    """
+    try:
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+        if driver.is_closed():
+            await conn.invalidate()
+        else:
+            # UNLISTEN inside a transaction takes effect only on commit
+            await conn.rollback()
+            for channel, callback in listeners:
+                await driver.remove_listener(channel, callback)
+    except Exception:
+        await conn.invalidate()
+    await conn.close()
+
+
 async def init_db():
     """Initialize database tables"""
     async with engine.begin() as conn:
@@ -4,48 +4,57 @@ FastAPI dependencies
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.auth import decode_token, get_admin_user
+from app.core.auth import AdminPrincipal, decode_token, get_admin_principal
 from app.core.permissions import ALL_PERMISSIONS
-from app.models.admin_user import AdminUser
 from uuid import UUID
 
 security = HTTPBearer()
 
 
 async def get_current_admin(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> AdminUser:
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> AdminPrincipal:
     """
     Get current authenticated admin user
+
+    Resolved from the principal cache; the database is read only on a miss.
     """
-    credentials_exception = HTTPException(
+    return await admin_from_token(credentials.credentials)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    token = credentials.credentials
+
+
+async def admin_from_token(token: str) -> AdminPrincipal:
+    """The active admin an access token belongs to; raises 401/403 otherwise"""
     payload = decode_token(token)
     
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     user_id: str = payload.get("sub")
     if user_id is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     try:
         user_uuid = UUID(user_id)
     except ValueError:
-        raise credentials_exception
+        raise _credentials_exception()
     
-    admin = await get_admin_user(db, user_uuid)
+    return await active_admin(user_uuid)
+
+
+async def active_admin(admin_id: UUID) -> AdminPrincipal:
+    """The principal for an authenticated admin id; raises 401 if gone, 403 if inactive"""
+    admin = await get_admin_principal(admin_id)
     if admin is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     if not admin.is_active:
         raise HTTPException(
@@ -57,8 +66,8 @@ async def get_current_admin(
 
 
 async def get_current_superadmin(
-    current_admin: AdminUser = Depends(get_current_admin)
-) -> AdminUser:
+    current_admin: AdminPrincipal = Depends(get_current_admin)
+) -> AdminPrincipal:
     """
     Get current authenticated superadmin (for admin management only)
     Note: This is only used for admin user management endpoints.
@@ -73,9 +82,8 @@ async def get_current_superadmin(
 
 
 async def get_current_admin_optional(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> Optional[AdminUser]:
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> Optional[AdminPrincipal]:
     """
     Get current authenticated admin user (optional - returns None if not authenticated)
     This allows pages to be accessed without authentication check, but actions require auth
@@ -99,7 +107,7 @@ async def get_current_admin_optional(
         except ValueError:
             return None
         
-        admin = await get_admin_user(db, user_uuid)
+        admin = await get_admin_principal(user_uuid)
         if admin is None or not admin.is_active:
             return None
         
@@ -113,8 +121,8 @@ def require_permission(permission: str):
     Dependency factory to require a specific permission
     """
     async def permission_checker(
-        current_admin: AdminUser = Depends(get_current_admin)
-    ) -> AdminUser:
+        current_admin: AdminPrincipal = Depends(get_current_admin)
+    ) -> AdminPrincipal:
         if current_admin.role == "superadmin":
             return current_admin
         
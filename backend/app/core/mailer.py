@@ -0,0 +1,202 @@
+"""
+Outgoing email transport
+
+One ``mailer`` per process, used by the invite endpoint and the notification
+worker. EMAIL_BACKEND selects where messages go:
+
+  • ses  — AWS SES (SendRawEmail). The boto3 client is built once and shared:
+           it is thread-safe and keeps its HTTPS connections alive. Calls run
+           in worker threads, so the event loop never waits on SES.
+  • smtp — a plain SMTP server (SMTP_HOST:SMTP_PORT), e.g. a local catcher
+  • file — one .eml file per message under EMAIL_FILE_DIR, for tests and
+           benchmarks
+
+Sends are paced by a token bucket of SES_MAX_SEND_RATE messages per second
+(0 disables it) so a burst is smoothed out instead of being throttled by SES.
+The bucket is per process: with several sending processes, split the account
+quota between them.
+"""
+import asyncio
+import logging
+import smtplib
+import time
+import uuid
+from dataclasses import dataclass
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from pathlib import Path
+from typing import Any
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# SES error codes that no retry will fix
+_PERMANENT_SES_ERRORS = {"MessageRejected", "MailFromDomainNotVerified", "InvalidParameterValue"}
+
+
+class MailError(Exception):
+    """Sending failed; a later retry may succeed"""
+
+
+class PermanentMailError(MailError):
+    """The message was rejected and a retry will not help"""
+
+
+@dataclass(frozen=True)
+class EmailMessage:
+    to: str
+    subject: str
+    html: str
+    plain: str
+
+    def to_mime(self) -> str:
+        mime = MIMEMultipart("alternative")
+        mime["Subject"] = self.subject
+        mime["From"] = f"{settings.SENDER_NAME} <{settings.SES_FROM_EMAIL}>"
+        mime["To"] = self.to
+        mime.attach(MIMEText(self.plain, "plain", "utf-8"))
+        mime.attach(MIMEText(self.html, "html", "utf-8"))
+        return mime.as_string()
+
+
+class TokenBucket:
+    """``rate`` tokens per second, up to ``burst`` saved; waiters are served in order"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """Take one token, waiting for it if needed; returns seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        async with self._lock:
+            self._refill()
+            waited = 0.0
+            if self.tokens < 1:
+                waited = (1 - self.tokens) / self.rate
+                await asyncio.sleep(waited)
+                self._refill()
+            self.tokens -= 1
+            return waited
+
+
+class SesBackend:
+    name = "ses"
+
+    def __init__(self):
+        self._client = None
+
+    def _ses(self):
+        if self._client is None:
+            import boto3
+            from botocore.config import Config
+
+            self._client = boto3.client(
+                "ses",
+                region_name=settings.AWS_REGION,
+                endpoint_url=settings.SES_ENDPOINT_URL,
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                config=Config(max_pool_connections=settings.EMAIL_MAX_CONCURRENCY, retries={"max_attempts": 2}),
+            )
+        return self._client
+
+    def send(self, message: EmailMessage) -> str:
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        try:
+            resp = self._ses().send_raw_email(
+                Source=settings.SES_FROM_EMAIL,
+                Destinations=[message.to],
+                RawMessage={"Data": message.to_mime()},
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in _PERMANENT_SES_ERRORS:
+                raise PermanentMailError(str(e)) from e
+            raise MailError(str(e)) from e
+        except BotoCoreError as e:
+            raise MailError(str(e)) from e
+        return resp.get("MessageId", "")
+
+
+class SmtpBackend:
+    name = "smtp"
+
+    def send(self, message: EmailMessage) -> str:
+        # Test/dev transport: a connection per message keeps it thread-safe
+        try:
+            with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=10) as smtp:
+                smtp.sendmail(settings.SES_FROM_EMAIL, [message.to], message.to_mime())
+        except smtplib.SMTPRecipientsRefused as e:
+            raise PermanentMailError(str(e)) from e
+        except (smtplib.SMTPException, OSError) as e:
+            raise MailError(str(e)) from e
+        return ""
+
+
+class FileBackend:
+    name = "file"
+
+    def send(self, message: EmailMessage) -> str:
+        message_id = uuid.uuid4().hex
+        directory = Path(settings.EMAIL_FILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{message_id}.eml").write_text(message.to_mime())
+        return message_id
+
+
+_BACKENDS = {"ses": SesBackend, "smtp": SmtpBackend, "file": FileBackend}
+
+
+class Mailer:
+    """Rate-limited, non-blocking front for the configured backend"""
+
+    def __init__(self):
+        self._backend = None
+        self.bucket = TokenBucket(settings.SES_MAX_SEND_RATE, settings.SES_MAX_SEND_RATE or 1)
+        self._semaphore = asyncio.Semaphore(settings.EMAIL_MAX_CONCURRENCY)
+        self.sent = 0
+        self.failed = 0
+        self.throttled_seconds = 0.0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            try:
+                self._backend = _BACKENDS[settings.EMAIL_BACKEND]()
+            except KeyError:
+                raise ValueError(f"Unknown EMAIL_BACKEND {settings.EMAIL_BACKEND!r}") from None
+        return self._backend
+
+    async def send(self, message: EmailMessage) -> str:
+        """Send one message; returns the provider's message id (may be empty)"""
+        self.throttled_seconds += await self.bucket.acquire()
+        async with self._semaphore:
+            try:
+                message_id = await asyncio.to_thread(self.backend.send, message)
+            except MailError:
+                self.failed += 1
+                raise
+        self.sent += 1
+        return message_id
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": settings.EMAIL_BACKEND,
+            "sent": self.sent,
+            "failed": self.failed,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+        }
+
+
+mailer = Mailer()
@@ -0,0 +1,174 @@
+"""
+Firebase Cloud Messaging (HTTP v1) sender
+
+One long-lived ``httpx.AsyncClient`` per process keeps an HTTP/2 connection to
+FCM open, so a send costs one multiplexed request instead of a TLS handshake.
+The OAuth access token from the service account is cached until
+FCM_TOKEN_REFRESH_MARGIN_SECONDS before it expires, and one refresh serves all
+concurrent sends. A user's devices are sent to concurrently, and every request
+to FCM in the process goes through one FCM_MAX_CONCURRENCY semaphore.
+
+Tokens FCM reports as dead (UNREGISTERED, SENDER_ID_MISMATCH, or an invalid
+registration token) come back in ``PushResult.invalid_tokens`` so the caller
+can deactivate them.
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import httpx
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_FCM_SCOPE = "https://www.googleapis.com/auth/firebase.messaging"
+# FcmError codes meaning the token will never work again
+_DEAD_TOKEN_CODES = {"UNREGISTERED", "SENDER_ID_MISMATCH"}
+
+
+@dataclass
+class PushResult:
+    """Outcome of one message sent to a list of device tokens"""
+    sent: int = 0
+    invalid_tokens: list[str] = field(default_factory=list)
+    # Errors worth retrying (throttling, 5xx, network) and ones that are not
+    retryable: list[str] = field(default_factory=list)
+    rejected: list[str] = field(default_factory=list)
+
+
+def _fcm_error(resp: httpx.Response) -> tuple[str, str]:
+    """(error code, message) of an FCM error response"""
+    try:
+        error = resp.json().get("error") or {}
+    except ValueError:
+        return "", resp.text[:200]
+    code = error.get("status") or ""
+    for detail in error.get("details") or []:
+        if detail.get("@type", "").endswith("google.firebase.fcm.v1.FcmError") and detail.get("errorCode"):
+            code = detail["errorCode"]
+    return code, error.get("message") or ""
+
+
+class FcmSender:
+    """Pooled, concurrency-bounded FCM sender with a cached access token"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._credentials = None
+        self._token_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(settings.FCM_MAX_CONCURRENCY)
+        self.requests = 0
+        self.token_refreshes = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool((settings.FCM_SERVICE_ACCOUNT_JSON or "").strip())
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=settings.FCM_ENDPOINT_URL.rstrip("/"),
+                http2=True,
+                timeout=settings.FCM_REQUEST_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.FCM_MAX_CONCURRENCY,
+                    max_keepalive_connections=settings.FCM_MAX_CONCURRENCY,
+                ),
+            )
+        return self._client
+
+    def _load_credentials(self):
+        from google.oauth2 import service_account
+
+        raw = settings.FCM_SERVICE_ACCOUNT_JSON.strip()
+        if raw.startswith("{"):
+            info = json.loads(raw)
+        else:
+            with open(raw) as f:
+                info = json.load(f)
+        return service_account.Credentials.from_service_account_info(info, scopes=[_FCM_SCOPE])
+
+    def _token_fresh(self) -> bool:
+        credentials = self._credentials
+        if credentials is None or not credentials.token or credentials.expiry is None:
+            return False
+        # google-auth keeps expiry as naive UTC
+        margin = timedelta(seconds=settings.FCM_TOKEN_REFRESH_MARGIN_SECONDS)
+        return datetime.utcnow() < credentials.expiry - margin
+
+    async def access_token(self) -> str:
+        if self._token_fresh():
+            return self._credentials.token
+        async with self._token_lock:
+            if not self._token_fresh():
+                import google.auth.transport.requests
+
+                if self._credentials is None:
+                    self._credentials = self._load_credentials()
+                # The token exchange is a blocking request, made once per hour
+                await asyncio.to_thread(self._credentials.refresh, google.auth.transport.requests.Request())
+                self.token_refreshes += 1
+            return self._credentials.token
+
+    def _expire_token(self) -> None:
+        if self._credentials is not None:
+            self._credentials.token = None
+
+    async def send(self, tokens: list[str], title: str, body: str, data: Optional[dict] = None) -> PushResult:
+        """Send one notification to every token, concurrently"""
+        access_token = await self.access_token()
+        url = f"/v1/projects/{settings.FCM_PROJECT_ID}/messages:send"
+        headers = {"Authorization": f"Bearer {access_token}"}
+        data = {str(k): str(v) for k, v in (data or {}).items() if v is not None}
+        result = PushResult()
+
+        async def one(device_token: str) -> None:
+            message = {
+                "message": {
+                    "token": device_token,
+                    "notification": {"title": title, "body": body},
+                    "data": data,
+                    "android": {"priority": "high", "notification": {"channel_id": "default_channel", "sound": "default"}},
+                    "apns": {"headers": {"apns-priority": "10"}, "payload": {"aps": {"sound": "default", "badge": 1}}},
+                }
+            }
+            try:
+                async with self._semaphore:
+                    self.requests += 1
+                    resp = await self._http().post(url, headers=headers, json=message)
+            except httpx.HTTPError as e:
+                result.retryable.append(f"{type(e).__name__}: {e}")
+                return
+            if resp.status_code == 200:
+                result.sent += 1
+                return
+            code, detail = _fcm_error(resp)
+            error = f"HTTP {resp.status_code} {code}: {detail}".strip()
+            if code in _DEAD_TOKEN_CODES or (code == "INVALID_ARGUMENT" and "registration token" in detail.lower()):
+                result.invalid_tokens.append(device_token)
+            elif resp.status_code == 401:
+                # Revoked or clock-skewed token: fetch a new one before the retry
+                self._expire_token()
+                result.retryable.append(error)
+            elif resp.status_code == 429 or resp.status_code >= 500:
+                result.retryable.append(error)
+            else:
+                result.rejected.append(error)
+
+        await asyncio.gather(*(one(token) for token in tokens))
+        return result
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict[str, Any]:
+        return {"requests": self.requests, "token_refreshes": self.token_refreshes}
+
+
+fcm = FcmSender()
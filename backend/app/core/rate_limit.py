@@ -0,0 +1,228 @@
+"""
+Sliding-window rate limiting
+
+Each limit is a Redis sorted set of attempt timestamps. One Lua script checks
+every limit of a request and records the attempt only when all of them have
+room. The decision costs one round trip, and a rejected attempt is never
+recorded, so a client that keeps hammering is locked out only for the window.
+A limit with ``record=False`` is only checked; its hits are added afterwards
+with ``RateLimiter.record`` (used to count failed logins, not every login).
+
+Without Redis (not connected, failing, or circuit open) the same windows are
+kept per worker in memory. That is weaker across workers, but never unlimited.
+"""
+import hashlib
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request, status
+
+from .config import settings
+from .redis_cache import cache
+
+# KEYS: one sorted set per limit; ARGV: now_ms, member, then max_hits,
+# window_ms and record (0/1) for each key. Returns 0 when allowed, else
+# milliseconds to wait.
+_SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local max_hits = tonumber(ARGV[i * 3])
+    local window = tonumber(ARGV[1 + i * 3])
+    redis.call('zremrangebyscore', key, '-inf', now - window)
+    if redis.call('zcard', key) >= max_hits then
+        local oldest = redis.call('zrange', key, 0, 0, 'WITHSCORES')
+        local key_wait = tonumber(oldest[2]) + window - now
+        if key_wait > wait then
+            wait = key_wait
+        end
+    end
+end
+if wait > 0 then
+    return wait
+end
+for i, key in ipairs(KEYS) do
+    if ARGV[2 + i * 3] == '1' then
+        redis.call('zadd', key, now, ARGV[2])
+        redis.call('pexpire', key, tonumber(ARGV[1 + i * 3]))
+    end
+end
+return 0
+"""
+
+# KEYS: one sorted set per limit; ARGV: now_ms, member, then window_ms for
+# each key. Adds the hit without checking.
+_RECORD_SCRIPT = """
+local now = tonumber(ARGV[1])
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[2 + i])
+    redis.call('zremrangebyscore', key, '-inf', now - window)
+    redis.call('zadd', key, now, ARGV[2])
+    redis.call('pexpire', key, window)
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class Limit:
+    """At most ``max_hits`` attempts per ``window_seconds`` under ``key``"""
+    key: str
+    max_hits: int
+    window_seconds: int
+    # False: checked on hit() but only counted through record()
+    record: bool = True
+
+
+class LocalWindows:
+    """Per-worker sliding windows, used while Redis is unavailable"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._windows: OrderedDict[str, deque[float]] = OrderedDict()
+
+    def hit(self, limits: list[Limit], now: float) -> float:
+        """Record an attempt if every limit has room; returns seconds to wait (0 when allowed)"""
+        wait = 0.0
+        for limit in limits:
+            window = self._windows.get(limit.key)
+            if window is None:
+                continue
+            while window and window[0] <= now - limit.window_seconds:
+                window.popleft()
+            if len(window) >= limit.max_hits:
+                wait = max(wait, window[0] + limit.window_seconds - now)
+        if wait > 0:
+            return wait
+
+        self.record([limit for limit in limits if limit.record], now)
+        return 0.0
+
+    def record(self, limits: list[Limit], now: float) -> None:
+        """Record an attempt against ``limits`` without checking them"""
+        for limit in limits:
+            window = self._windows.setdefault(limit.key, deque())
+            while window and window[0] <= now - limit.window_seconds:
+                window.popleft()
+            window.append(now)
+            self._windows.move_to_end(limit.key)
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+
+
+class RateLimiter:
+    """Sliding-window limiter backed by Redis, with an in-memory fallback"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.local = LocalWindows(settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+        self.allowed = 0
+        self.rejected = 0
+        self.fallback_decisions = 0
+        # Recent decision latencies in milliseconds
+        self._latencies: deque[float] = deque(maxlen=1024)
+
+    async def hit(self, limits: list[Limit]) -> float:
+        """Count an attempt against ``limits``; returns seconds to wait, 0 when allowed"""
+        start = time.perf_counter()
+        now = time.time()
+        keys = [self._key(limit) for limit in limits]
+        args: list = [int(now * 1000), self._member(now)]
+        for limit in limits:
+            args += [limit.max_hits, limit.window_seconds * 1000, int(limit.record)]
+
+        result = await cache.run_script(_SLIDING_WINDOW_SCRIPT, keys, args)
+        if result is None:
+            self.fallback_decisions += 1
+            wait = self.local.hit(limits, now)
+        else:
+            wait = int(result) / 1000
+
+        self._latencies.append((time.perf_counter() - start) * 1000)
+        if wait > 0:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    async def record(self, limits: list[Limit]) -> None:
+        """Count an attempt against ``limits`` without checking them"""
+        now = time.time()
+        keys = [self._key(limit) for limit in limits]
+        args: list = [int(now * 1000), self._member(now)]
+        args += [limit.window_seconds * 1000 for limit in limits]
+        if await cache.run_script(_RECORD_SCRIPT, keys, args) is None:
+            self.local.record(limits, now)
+
+    def _key(self, limit: Limit) -> str:
+        return f"ratelimit:{self.name}:{limit.key}"
+
+    @staticmethod
+    def _member(now: float) -> str:
+        return f"{now:.6f}:{uuid.uuid4().hex[:8]}"
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def pct(p: int):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 3)
+
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "fallback_decisions": self.fallback_decisions,
+            "decision_ms_p50": pct(50),
+            "decision_ms_p99": pct(99),
+        }
+
+
+login_limiter = RateLimiter("login")
+
+
+def client_ip(request: Request) -> str:
+    """
+    Caller's address. With FORWARDED_PROXY_COUNT trusted proxies in front, it is
+    the entry they appended to X-Forwarded-For; entries further left are
+    client-supplied and ignored.
+    """
+    hops = settings.FORWARDED_PROXY_COUNT
+    if hops > 0:
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+def _account_limit(email: str, record: bool) -> Limit:
+    account = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+    return Limit(f"email:{account}", settings.LOGIN_RATE_LIMIT_EMAIL, settings.LOGIN_RATE_LIMIT_EMAIL_WINDOW, record)
+
+
+async def enforce_login_rate_limit(request: Request, email: str) -> None:
+    """
+    Raise 429 before any password work when the caller or the account is over its limit
+
+    Every attempt counts against the caller's address. The account only counts
+    failed attempts (see ``record_failed_login``), so successful logins by
+    others never lock its owner out.
+    """
+    wait = await login_limiter.hit([
+        Limit(f"ip:{client_ip(request)}", settings.LOGIN_RATE_LIMIT_IP, settings.LOGIN_RATE_LIMIT_IP_WINDOW),
+        _account_limit(email, record=False),
+    ])
+    if wait > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Please try again later.",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+
+async def record_failed_login(email: str) -> None:
+    """Count a rejected password against the account's login window"""
+    await login_limiter.record([_account_limit(email, record=True)])
@@ -1,120 +1,680 @@
 """
 Redis caching service with decorators and utilities
+
+Two tiers: hot keys that opt in with ``local_ttl`` are also kept in a bounded
+per-worker LRU, so repeat reads skip the network round trip and the decode.
+Deletes are broadcast over Redis pub/sub and every worker drops its local copy.
+
+Bulk invalidation never scans the keyspace. Keys built with ``versioned_key``
+embed a per-namespace version; ``bump_namespace`` increments it in O(1) and the
+old keys become unreachable and age out by TTL.
+
+Every Redis call runs under a per-call deadline (``REDIS_COMMAND_TIMEOUT``) and
+a circuit breaker. When Redis turns slow or fails, the breaker opens and calls
+stop reaching the network. Reads and writes then fall back to the local tier
+for up to ``CACHE_DEGRADED_LOCAL_TTL`` seconds.
 """
+import asyncio
 import json
-import pickle
-from typing import Any, Optional, Callable, TypeVar
+import math
+import random
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Iterable, Mapping, Optional, Callable, TypeVar, Union
 from functools import wraps
 import redis.asyncio as redis
 from .config import settings
+from .cache_codecs import CodecError, build_codec
+from .circuit_breaker import CLOSED, CircuitBreaker, CircuitOpenError
 import logging
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+_MISSING = object()
+# Result of an in-flight recompute whose caller was cancelled
+_ABANDONED = object()
+
+# Compare-and-delete, so a lock that expired and was re-acquired is not released
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Get-and-delete in one step (GETDEL needs Redis 6.2)
+_POP_SCRIPT = """
+local value = redis.call('get', KEYS[1])
+if value then
+    redis.call('del', KEYS[1])
+end
+return value
+"""
+
+
+class LocalCache:
+    """Bounded in-process LRU with per-entry expiry (one per worker)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or ``_MISSING``"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CachePipeline:
+    """
+    Commands queued inside ``RedisCache.pipeline()``
+
+    Values go through the cache codec like ``RedisCache.set``. Everything is
+    sent in one round trip when the ``async with`` block exits, and
+    ``results`` then holds the raw reply of each command. Without Redis the
+    commands are dropped.
+    """
+
+    def __init__(self, owner: "RedisCache", pipe: Optional[Any]):
+        self._owner = owner
+        self._pipe = pipe
+        self._touched: list[str] = []
+        self.results: list[Any] = []
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> "CachePipeline":
+        serialized = self._owner.codec.encode(value)
+        self._touched.append(key)
+        if self._pipe is not None:
+            self._pipe.setex(key, ttl or settings.REDIS_CACHE_TTL, serialized)
+        return self
+
+    def delete(self, *keys: str) -> "CachePipeline":
+        self._touched.extend(keys)
+        if self._pipe is not None:
+            self._pipe.delete(*keys)
+        return self
+
+    def increment(self, key: str, amount: int = 1) -> "CachePipeline":
+        if self._pipe is not None:
+            self._pipe.incrby(key, amount)
+        return self
+
+    def expire(self, key: str, ttl: int) -> "CachePipeline":
+        if self._pipe is not None:
+            self._pipe.expire(key, ttl)
+        return self
+
 
 class RedisCache:
     """Redis cache service"""
     
     def __init__(self):
         self._client: Optional[redis.Redis] = None
+        self.codec = build_codec()
+        self.local = LocalCache(settings.LOCAL_CACHE_MAX_ENTRIES)
+        # Identifies this worker's own invalidation messages
+        self.instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+        self.decode_failures = 0
+        self.invalidations_sent = 0
+        self.invalidations_received = 0
+        # cache_result stampede counters
+        self.recomputes = 0
+        self.coalesced = 0
+        self.stale_served = 0
+        self.early_refreshes = 0
+        self.lock_waits = 0
+        self.breaker = CircuitBreaker(
+            "redis",
+            window_seconds=settings.CACHE_BREAKER_WINDOW_SECONDS,
+            min_calls=settings.CACHE_BREAKER_MIN_CALLS,
+            error_rate=settings.CACHE_BREAKER_ERROR_RATE,
+            slow_call_seconds=settings.CACHE_BREAKER_SLOW_CALL_SECONDS,
+            slow_rate=settings.CACHE_BREAKER_SLOW_RATE,
+            open_seconds=settings.CACHE_BREAKER_OPEN_SECONDS,
+            half_open_probes=settings.CACHE_BREAKER_HALF_OPEN_PROBES,
+            # Invalidations were not delivered while open
+            on_close=self.local.clear,
+        )
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    @property
+    def degraded(self) -> bool:
+        """Redis is configured but the breaker is keeping calls away from it"""
+        return self._client is not None and self.breaker.state != CLOSED
+
+    async def _execute(self, command: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """
+        Run one Redis call under the breaker and the per-call deadline
+
+        Raises CircuitOpenError without calling Redis while the circuit is
+        open; any other exception is the command's own (or a timeout).
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("Redis circuit is open")
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(command(*args, **kwargs), settings.REDIS_COMMAND_TIMEOUT)
+        except asyncio.CancelledError:
+            self.breaker.record_cancelled()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success(time.monotonic() - start)
+        return result
+
+    def _failed(self, what: str, e: Exception) -> None:
+        """Count and log a failed Redis call; refusals by the open breaker are already counted"""
+        if isinstance(e, CircuitOpenError):
+            return
+        self.redis_errors += 1
+        logger.error(f"Redis {what}: {e or type(e).__name__}")
+
+    def _local_ttl(self, local_ttl: Optional[int]) -> Optional[int]:
+        """Local-tier TTL for a value: the caller's, or the fallback one while degraded"""
+        if local_ttl:
+            return local_ttl
+        if self.degraded:
+            return settings.CACHE_DEGRADED_LOCAL_TTL
+        return None
     
     async def connect(self):
         """Connect to Redis"""
         try:
-            self._client = await redis.from_url(
+            # Blocking pool: a burst beyond max_connections queues briefly
+            # instead of failing with "Too many connections"
+            pool = redis.BlockingConnectionPool.from_url(
                 f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
                 password=settings.REDIS_PASSWORD,
                 db=settings.REDIS_DB,
                 encoding="utf-8",
                 decode_responses=False,  # We'll handle encoding manually
                 max_connections=50,
+                timeout=2,
                 socket_connect_timeout=5,
                 socket_timeout=5,
                 health_check_interval=30,
             )
+            self._client = redis.Redis(connection_pool=pool)
             await self._client.ping()
             logger.info("Redis connected successfully")
+            self._listener = asyncio.create_task(self._listen_invalidations())
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             self._client = None
     
     async def disconnect(self):
         """Disconnect from Redis"""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
         if self._client:
             await self._client.close()
             self._client = None
-    
-    async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
+        self.local.clear()
+
+    async def get(self, key: str, local_ttl: Optional[int] = None) -> Optional[Any]:
+        """
+        Get value from cache
+
+        With ``local_ttl`` the worker-local tier is consulted first and a Redis
+        hit is kept locally for that many seconds. Locally cached values are
+        shared between callers and must not be mutated. While the circuit
+        is open every key is looked up in the local tier instead of Redis.
+        """
+        if local_ttl:
+            value = self.local.get(key)
+            if value is not _MISSING:
+                return value
+
         if not self._client:
             return None
         
         try:
-            value = await self._client.get(key)
+            value = await self._execute(self._client.get, key)
             if value:
-                # Try JSON first, fallback to pickle
-                try:
-                    return json.loads(value.decode('utf-8'))
-                except (json.JSONDecodeError, UnicodeDecodeError):
-                    return pickle.loads(value)
+                decoded = self.codec.decode(value)
+                self.redis_hits += 1
+                keep = self._local_ttl(local_ttl)
+                if keep:
+                    self.local.set(key, decoded, keep)
+                return decoded
+            self.redis_misses += 1
+        except CircuitOpenError:
+            if not local_ttl:
+                value = self.local.get(key)
+                if value is not _MISSING:
+                    return value
+        except CodecError as e:
+            # Written by another codec version or not by us — recompute
+            self.decode_failures += 1
+            self.redis_misses += 1
+            logger.warning(f"Undecodable cache value for key {key}: {e}")
         except Exception as e:
-            logger.error(f"Redis get error for key {key}: {e}")
+            self._failed(f"get error for key {key}", e)
         return None
     
     async def set(
         self,
         key: str,
         value: Any,
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        local_ttl: Optional[int] = None
     ) -> bool:
-        """Set value in cache"""
+        """Set value in cache (and in the local tier when ``local_ttl`` is given)"""
+        ttl = ttl or settings.REDIS_CACHE_TTL
+        try:
+            serialized = self.codec.encode(value)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Cannot encode cache value for key {key}: {e}")
+            return False
+        publish = bool(local_ttl)
+        local_ttl = self._local_ttl(local_ttl)
+        if local_ttl:
+            # Store what a Redis read would return, so both tiers agree
+            self.local.set(key, self.codec.decode(serialized), min(local_ttl, ttl))
+        else:
+            self.local.delete(key)
+
         if not self._client:
             return False
         
         try:
-            ttl = ttl or settings.REDIS_CACHE_TTL
-            # Try JSON first, fallback to pickle for complex objects
-            try:
-                serialized = json.dumps(value, default=str).encode('utf-8')
-            except (TypeError, ValueError):
-                serialized = pickle.dumps(value)
-            
-            await self._client.setex(key, ttl, serialized)
+            await self._execute(self._client.setex, key, ttl, serialized)
+            if publish:
+                # Other workers may hold the previous value locally
+                await self._publish_invalidation(keys=[key])
             return True
         except Exception as e:
-            logger.error(f"Redis set error for key {key}: {e}")
+            self._failed(f"set error for key {key}", e)
         return False
     
+    async def get_many(self, keys: Iterable[str], local_ttl: Optional[int] = None) -> dict[str, Any]:
+        """
+        Get several keys in one round trip (MGET); returns only the hits
+
+        ``local_ttl`` and the open-circuit fallback work as in ``get``.
+        """
+        found: dict[str, Any] = {}
+        remote = []
+        for key in dict.fromkeys(keys):
+            if local_ttl:
+                value = self.local.get(key)
+                if value is not _MISSING:
+                    found[key] = value
+                    continue
+            remote.append(key)
+
+        if not remote or not self._client:
+            return found
+        
+        try:
+            values = await self._execute(self._client.mget, remote)
+        except CircuitOpenError:
+            if not local_ttl:
+                for key in remote:
+                    value = self.local.get(key)
+                    if value is not _MISSING:
+                        found[key] = value
+            return found
+        except Exception as e:
+            self._failed(f"mget error for {len(remote)} keys", e)
+            return found
+
+        for key, value in zip(remote, values):
+            if not value:
+                self.redis_misses += 1
+                continue
+            try:
+                decoded = self.codec.decode(value)
+            except CodecError as e:
+                self.decode_failures += 1
+                self.redis_misses += 1
+                logger.warning(f"Undecodable cache value for key {key}: {e}")
+                continue
+            self.redis_hits += 1
+            found[key] = decoded
+            keep = self._local_ttl(local_ttl)
+            if keep:
+                self.local.set(key, decoded, keep)
+        return found
+
+    async def set_many(
+        self,
+        items: Mapping[str, Any],
+        ttl: Union[int, Mapping[str, int], None] = None,
+        local_ttl: Optional[int] = None
+    ) -> bool:
+        """
+        Set several keys in one round trip (pipelined SETEX)
+
+        ``ttl`` is either one TTL for every key or a per-key mapping; keys
+        missing from the mapping get the default TTL.
+        """
+        default_ttl = ttl if isinstance(ttl, int) else settings.REDIS_CACHE_TTL
+        per_key = ttl if isinstance(ttl, Mapping) else {}
+        publish = bool(local_ttl)
+        local_ttl = self._local_ttl(local_ttl)
+
+        encoded: dict[str, tuple[bytes, int]] = {}
+        for key, value in items.items():
+            try:
+                serialized = self.codec.encode(value)
+            except (TypeError, ValueError) as e:
+                logger.error(f"Cannot encode cache value for key {key}: {e}")
+                continue
+            key_ttl = per_key.get(key) or default_ttl
+            encoded[key] = (serialized, key_ttl)
+            if local_ttl:
+                self.local.set(key, self.codec.decode(serialized), min(local_ttl, key_ttl))
+            else:
+                self.local.delete(key)
+
+        if not encoded or not self._client:
+            return False
+        
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for key, (serialized, key_ttl) in encoded.items():
+                pipe.setex(key, key_ttl, serialized)
+            await self._execute(pipe.execute)
+            if publish:
+                await self._publish_invalidation(keys=list(encoded))
+            return True
+        except Exception as e:
+            self._failed(f"set_many error for {len(encoded)} keys", e)
+        return False
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = True) -> AsyncIterator[CachePipeline]:
+        """
+        Queue cache commands and send them together on exit
+
+        With ``transaction`` the batch runs inside MULTI/EXEC, so other
+        clients never see it half-applied. A Redis failure is logged and
+        leaves ``results`` empty, like the single-key methods.
+        """
+        pipe = self._client.pipeline(transaction=transaction) if self._client else None
+        batch = CachePipeline(self, pipe)
+        try:
+            yield batch
+            for key in batch._touched:
+                self.local.delete(key)
+            if pipe is None:
+                return
+            try:
+                batch.results = await self._execute(pipe.execute)
+                if batch._touched:
+                    await self._publish_invalidation(keys=batch._touched)
+            except Exception as e:
+                self._failed("pipeline error", e)
+        finally:
+            if pipe is not None:
+                await pipe.reset()
+
     async def delete(self, key: str) -> bool:
-        """Delete key from cache"""
+        """Delete key from cache (all workers' local tiers included)"""
+        self.local.delete(key)
         if not self._client:
             return False
         
         try:
-            await self._client.delete(key)
+            await self._execute(self._client.delete, key)
+            await self._publish_invalidation(keys=[key])
             return True
         except Exception as e:
-            logger.error(f"Redis delete error for key {key}: {e}")
+            self._failed(f"delete error for key {key}", e)
         return False
     
-    async def delete_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern"""
+    async def pop(self, key: str) -> Optional[Any]:
+        """
+        Get and delete a value atomically, so exactly one caller receives it
+
+        Values stored only in the local tier (set without Redis, or while
+        degraded) are popped from there.
+        """
+        local = self.local.get(key)
+        self.local.delete(key)
+        if self._client:
+            try:
+                value = await self._execute(self._client.eval, _POP_SCRIPT, 1, key)
+                if value:
+                    return self.codec.decode(value)
+            except CodecError as e:
+                self.decode_failures += 1
+                logger.warning(f"Undecodable cache value for key {key}: {e}")
+            except Exception as e:
+                self._failed(f"pop error for key {key}", e)
+        return None if local is _MISSING else local
+
+    async def namespace_version(self, namespace: str) -> int:
+        """Current version of ``namespace`` (0 until first bumped)"""
+        version_key = f"ns:{namespace}"
+        version = self.local.get(version_key)
+        if version is not _MISSING:
+            return version
         if not self._client:
             return 0
-        
+
         try:
-            keys = []
-            async for key in self._client.scan_iter(match=pattern):
-                keys.append(key)
-            
-            if keys:
-                return await self._client.delete(*keys)
-            return 0
+            raw = await self._execute(self._client.get, version_key)
+            version = int(raw) if raw else 0
+            # Bumps are broadcast, so this copy is dropped as soon as it changes
+            self.local.set(version_key, version, settings.LOCAL_CACHE_TTL)
+            return version
         except Exception as e:
-            logger.error(f"Redis delete_pattern error for {pattern}: {e}")
+            self._failed(f"version error for namespace {namespace}", e)
         return 0
+
+    async def versioned_key(self, namespace: str, key: str) -> str:
+        """``key`` inside ``namespace``; changes whenever the namespace is bumped"""
+        return f"{namespace}:v{await self.namespace_version(namespace)}:{key}"
+
+    async def bump_namespace(self, *namespaces: str) -> None:
+        """Invalidate every key in ``namespaces`` (O(1) each; old keys age out by TTL)"""
+        version_keys = [f"ns:{namespace}" for namespace in namespaces]
+        for version_key in version_keys:
+            self.local.delete(version_key)
+        if not self._client:
+            return
+        
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for version_key in version_keys:
+                pipe.incr(version_key)
+            versions = await self._execute(pipe.execute)
+            for version_key, version in zip(version_keys, versions):
+                self.local.set(version_key, version, settings.LOCAL_CACHE_TTL)
+            await self._publish_invalidation(keys=version_keys)
+        except Exception as e:
+            self._failed(f"namespace bump error for {namespaces}", e)
+            # The old version still names live keys; drop any local copies
+            self.local.clear()
+
+    async def run_script(self, script: str, keys: list[str], args: list[Any]) -> Optional[Any]:
+        """Run a Lua script; None without Redis or on failure, so callers can fall back"""
+        if not self._client:
+            return None
+        
+        try:
+            return await self._execute(self._client.eval, script, len(keys), *keys, *args)
+        except Exception as e:
+            self._failed(f"script error for keys {keys}", e)
+        return None
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        """
+        Try to take a short-lived lock on ``key``
+
+        Returns a token to pass to ``release_lock``, or None when another
+        caller holds it. Without Redis the lock is always granted.
+        """
+        token = uuid.uuid4().hex
+        if not self._client:
+            return token
+        
+        try:
+            if await self._execute(self._client.set, f"lock:{key}", token, nx=True, px=int(ttl * 1000)):
+                return token
+            return None
+        except Exception as e:
+            self._failed(f"lock error for key {key}", e)
+        # Fail open: computing twice beats waiting on a lock nobody holds
+        return token
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """Release a lock taken with ``acquire_lock``"""
+        if not self._client:
+            return
+        
+        try:
+            await self._execute(self._client.eval, _RELEASE_LOCK_SCRIPT, 1, f"lock:{key}", token)
+        except Exception as e:
+            self._failed(f"unlock error for key {key}", e)
+
+    async def publish(self, channel: str, message: Union[str, bytes]) -> bool:
+        """Publish to a pub/sub channel; False without Redis or on failure"""
+        if not self._client:
+            return False
+
+        try:
+            await self._execute(self._client.publish, channel, message)
+            return True
+        except Exception as e:
+            self._failed(f"publish error for channel {channel}", e)
+        return False
+
+    def pubsub(self):
+        """A new pub/sub connection (close it with ``aclose``), or None without Redis"""
+        if not self._client:
+            return None
+        return self._client.pubsub(ignore_subscribe_messages=True)
+
+    async def _publish_invalidation(self, keys: list[str]) -> None:
+        message = json.dumps({"origin": self.instance_id, "keys": keys})
+        await self._execute(self._client.publish, settings.CACHE_INVALIDATION_CHANNEL, message)
+        self.invalidations_sent += 1
+
+    def _apply_invalidation(self, data: bytes) -> None:
+        try:
+            message = json.loads(data)
+        except (json.JSONDecodeError, UnicodeDecodeError, TypeError):
+            logger.warning("Ignoring malformed cache invalidation message")
+            return
+        if message.get("origin") == self.instance_id:
+            return
+        self.invalidations_received += 1
+        for key in message.get("keys") or []:
+            self.local.delete(key)
+
+    async def _listen_invalidations(self) -> None:
+        """Apply other workers' invalidations to the local tier until cancelled"""
+        backoff = 1
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                # Messages published while unsubscribed are lost
+                self.local.clear()
+                backoff = 1
+                while True:
+                    # Poll with a timeout; a blocking read would trip socket_timeout
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        self._apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis invalidation listener error: {e}")
+                # Until resubscribed, local entries could go stale unnoticed
+                self.local.clear()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    def stats(self) -> dict:
+        """Hit/miss counters per tier, for /health"""
+        return {
+            "local": self.local.stats(),
+            "redis": {
+                "connected": self._client is not None,
+                "breaker": self.breaker.stats(),
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "errors": self.redis_errors,
+                "decode_failures": self.decode_failures,
+            },
+            "invalidations": {
+                "sent": self.invalidations_sent,
+                "received": self.invalidations_received,
+            },
+            "recompute": {
+                "recomputes": self.recomputes,
+                "coalesced": self.coalesced,
+                "stale_served": self.stale_served,
+                "early_refreshes": self.early_refreshes,
+                "lock_waits": self.lock_waits,
+            },
+        }
     
     async def exists(self, key: str) -> bool:
         """Check if key exists"""
@@ -122,20 +682,31 @@ class RedisCache:
             return False
         
         try:
-            return bool(await self._client.exists(key))
+            return bool(await self._execute(self._client.exists, key))
         except Exception as e:
-            logger.error(f"Redis exists error for key {key}: {e}")
+            self._failed(f"exists error for key {key}", e)
         return False
     
+    async def get_raw(self, key: str) -> Optional[bytes]:
+        """Plain GET of a value not written by ``set`` (counters, markers); no codec, no local tier"""
+        if not self._client:
+            return None
+        
+        try:
+            return await self._execute(self._client.get, key)
+        except Exception as e:
+            self._failed(f"get error for key {key}", e)
+        return None
+    
     async def increment(self, key: str, amount: int = 1) -> Optional[int]:
         """Increment value"""
         if not self._client:
             return None
         
         try:
-            return await self._client.incrby(key, amount)
+            return await self._execute(self._client.incrby, key, amount)
         except Exception as e:
-            logger.error(f"Redis increment error for key {key}: {e}")
+            self._failed(f"increment error for key {key}", e)
         return None
 
 
@@ -143,10 +714,52 @@ class RedisCache:
 cache = RedisCache()
 
 
+def _unwrap(cached: Any) -> Optional[dict]:
+    """Return a cache_result envelope, or None for a miss or a pre-envelope value"""
+    if isinstance(cached, dict) and "_v" in cached and "_soft" in cached:
+        return cached
+    return None
+
+
+def _needs_refresh(entry: dict) -> bool:
+    """
+    True once the entry is past its soft expiry, or — probabilistically —
+    shortly before it (XFetch): the longer the last recomputation took, the
+    earlier a caller volunteers to refresh, so the key rarely expires under load.
+    """
+    now = time.time()
+    if now >= entry["_soft"]:
+        return True
+    delta = entry.get("_delta") or 0
+    early = now - delta * settings.CACHE_XFETCH_BETA * math.log(1.0 - random.random()) >= entry["_soft"]
+    if early:
+        cache.early_refreshes += 1
+    return early
+
+
+async def _wait_for_entry(cache_key: str) -> Optional[dict]:
+    """Poll while another worker holds the recompute lock"""
+    cache.lock_waits += 1
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        entry = _unwrap(await cache.get(cache_key))
+        if entry is not None:
+            return entry
+        if not await cache.exists(f"lock:{cache_key}"):
+            # Holder gave up without storing a value
+            return None
+    return None
+
+
 def cache_result(
     key_prefix: str,
     ttl: Optional[int] = None,
-    key_params: Optional[list[str]] = None
+    key_params: Optional[list[str]] = None,
+    local_ttl: Optional[int] = None,
+    stale_ttl: Optional[int] = None,
+    namespace: Optional[str] = None,
+    batch_param: Optional[str] = None
 ):
     """
     Decorator to cache function results
@@ -155,10 +768,88 @@ def cache_result(
         key_prefix: Prefix for cache key
         ttl: Time to live in seconds (uses default if None)
         key_params: List of parameter names to include in cache key
+        local_ttl: Also keep the result in the worker-local tier for this many seconds
+        stale_ttl: How long past ``ttl`` the previous result may still be served
+            while one caller recomputes (defaults to ``ttl``)
+        namespace: Version the key under this namespace, so ``bump_namespace``
+            invalidates it
+        batch_param: Name of a list-of-ids keyword argument. The function must
+            return ``{id: value}``; each id is cached under its own key, read
+            with one MGET, and the function is called only for the missing
+            ids. Stampede protection does not apply in this mode.
+
+    Only one caller recomputes an expired key. Concurrent callers in the same
+    worker await that caller's result, and a short Redis lock elects a single
+    recomputer across workers. Callers holding a stale value return it
+    immediately instead of waiting. Values are stored as
+    ``{"_v": result, "_soft": expiry, "_delta": compute seconds}``.
     """
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        # cache_key -> (future of the running recompute, entry it replaces)
+        inflight: dict[str, tuple[asyncio.Future, Optional[dict]]] = {}
+
+        async def recompute(cache_key: str, entry: Optional[dict], args, kwargs) -> Any:
+            fresh_ttl = ttl or settings.REDIS_CACHE_TTL
+            grace = stale_ttl if stale_ttl is not None else fresh_ttl
+
+            token = await cache.acquire_lock(cache_key, settings.CACHE_LOCK_TIMEOUT)
+            if token is None:
+                if entry is not None:
+                    # Another worker is refreshing; the current value will do
+                    cache.stale_served += 1
+                    return entry["_v"]
+                waited = await _wait_for_entry(cache_key)
+                if waited is not None:
+                    return waited["_v"]
+                # Lock holder failed or is too slow; compute without the lock
+
+            try:
+                start = time.monotonic()
+                result = await func(*args, **kwargs)
+                cache.recomputes += 1
+                envelope = {"_v": result, "_soft": time.time() + fresh_ttl, "_delta": time.monotonic() - start}
+                await cache.set(cache_key, envelope, fresh_ttl + grace, local_ttl=local_ttl)
+                return result
+            finally:
+                if token is not None:
+                    await cache.release_lock(cache_key, token)
+
+        async def batch_call(args, kwargs) -> dict:
+            ids = list(dict.fromkeys(kwargs.get(batch_param) or []))
+            key_parts = [key_prefix]
+            for param in key_params or []:
+                if param in kwargs:
+                    key_parts.append(f"{param}:{kwargs[param]}")
+            base = ":".join(key_parts)
+            if namespace:
+                base = await cache.versioned_key(namespace, base)
+            keys = {item: f"{base}:{item}" for item in ids}
+
+            cached = await cache.get_many(keys.values(), local_ttl=local_ttl)
+            result = {item: cached[key] for item, key in keys.items() if key in cached}
+            missing = [item for item in ids if item not in result]
+            if missing:
+                computed = await func(*args, **{**kwargs, batch_param: missing})
+                await cache.set_many(
+                    {keys[item]: value for item, value in computed.items() if item in keys},
+                    ttl,
+                    local_ttl=local_ttl,
+                )
+                result.update(computed)
+            return {item: result[item] for item in ids if item in result}
+
+        async def join(pending: asyncio.Future, args, kwargs) -> Any:
+            result = await asyncio.shield(pending)
+            if result is _ABANDONED:
+                # The caller computing it went away; start over (cache or recompute)
+                return await wrapper(*args, **kwargs)
+            return result
+
         @wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
+            if batch_param:
+                return await batch_call(args, kwargs)
+
             # Build cache key
             if key_params:
                 key_parts = [key_prefix]
@@ -168,25 +859,54 @@ def cache_result(
                 cache_key = ":".join(key_parts)
             else:
                 cache_key = f"{key_prefix}:{func.__name__}"
+            if namespace:
+                cache_key = await cache.versioned_key(namespace, cache_key)
             
+            # Single-flight within this worker: join a running recompute
+            # without touching Redis, serving the value it replaces if any
+            if cache_key in inflight:
+                pending, previous = inflight[cache_key]
+                if previous is not None:
+                    cache.stale_served += 1
+                    return previous["_v"]
+                cache.coalesced += 1
+                return await join(pending, args, kwargs)
+
             # Try to get from cache
-            cached = await cache.get(cache_key)
-            if cached is not None:
-                return cached
-            
-            # Execute function
-            result = await func(*args, **kwargs)
-            
-            # Store in cache
-            await cache.set(cache_key, result, ttl)
-            
-            return result
-        return wrapper
-    return decorator
+            entry = _unwrap(await cache.get(cache_key, local_ttl=local_ttl))
+            if entry is not None and not _needs_refresh(entry):
+                return entry["_v"]
 
+            if cache_key in inflight:
+                # Started while we were reading
+                pending, _ = inflight[cache_key]
+                if entry is not None:
+                    cache.stale_served += 1
+                    return entry["_v"]
+                cache.coalesced += 1
+                return await join(pending, args, kwargs)
 
-async def invalidate_cache(pattern: str):
-    """Invalidate cache by pattern"""
-    await cache.delete_pattern(pattern)
+            future = asyncio.get_running_loop().create_future()
+            inflight[cache_key] = (future, entry)
+            try:
+                result = await recompute(cache_key, entry, args, kwargs)
+            except asyncio.CancelledError:
+                # Only this caller is cancelled; waiters retry on their own
+                future.set_result(_ABANDONED)
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()  # retrieved; followers re-raise it
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                inflight.pop(cache_key, None)
+        return wrapper
+    return decorator
 
 
+async def invalidate_cache(*namespaces: str):
+    """Invalidate every key in the given namespaces (a version bump, no SCAN)"""
+    await cache.bump_namespace(*namespaces)
@@ -1,9 +1,12 @@
 """
 Utility functions for the application
 """
-from typing import Optional, Tuple
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, select
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy import func, select, text
 from app.models.audit_log import AuditLog
 from datetime import datetime
 
@@ -75,3 +78,111 @@ def calculate_pagination(page: int, page_size: int, total: int) -> dict:
         "has_prev": page > 1,
     }
 
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode keyset pagination values into an opaque cursor
+
+    Args:
+        values: Sort key of the last row on the page, e.g. (created_at, id)
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Opaque cursor string
+        size: Number of values the cursor is expected to carry
+
+    Returns:
+        List of the encoded values as strings
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return [str(v) for v in values]
+
+
+def escape_like(term: str) -> str:
+    """
+    Escape LIKE/ILIKE wildcards so user input matches literally
+
+    Args:
+        term: Raw search text
+
+    Returns:
+        Text with backslash, % and _ escaped (PostgreSQL's default ESCAPE '\\')
+    """
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@dataclass
+class SearchSupport:
+    """What scripts/search_indexes.py --install added to this database"""
+    word_similarity: bool = False  # pg_trgm is installed
+    user_full_name: bool = False  # users.full_name exists
+
+
+# Filled in once at startup by detect_search_support; until then, or on a
+# database without --install, search falls back to plain ILIKE
+search_support = SearchSupport()
+
+
+async def detect_search_support(conn: AsyncConnection) -> SearchSupport:
+    """Probe for pg_trgm and users.full_name and record the result in ``search_support``"""
+    row = (await conn.execute(text("""
+        SELECT to_regprocedure('word_similarity(text, text)') IS NOT NULL AS word_similarity,
+               EXISTS (
+                   SELECT 1 FROM information_schema.columns
+                   WHERE table_schema = current_schema() AND table_name = 'users' AND column_name = 'full_name'
+               ) AS user_full_name
+    """))).one()
+    search_support.word_similarity = row.word_similarity
+    search_support.user_full_name = row.user_full_name
+    return search_support
+
+
+def user_name_sql(alias: str) -> str:
+    """A user's full name as SQL: the indexed column when present, else the expression it stores"""
+    if search_support.user_full_name:
+        return f"{alias}.full_name"
+    return f"btrim(COALESCE({alias}.first_name, '') || ' ' || COALESCE({alias}.last_name, ''))"
+
+
+def text_search(columns: list[str], term: str) -> Tuple[str, Optional[str], dict]:
+    """
+    Substring search over text columns, ranked by relevance
+
+    The filter is ``column ILIKE '%term%'``, served by the pg_trgm GIN index
+    on each column (scripts/search_indexes.py) for terms of three or more
+    characters. The rank is the best ``word_similarity`` of the term across
+    the columns, so whole-word and prefix matches sort first. Without pg_trgm
+    there is no rank (None) and callers keep their usual order.
+
+    Args:
+        columns: SQL column expressions, each with a trigram index
+        term: Raw search text
+
+    Returns:
+        (WHERE fragment, rank expression for ORDER BY ... DESC or None, bind params)
+    """
+    where = "(" + " OR ".join(f"{c} ILIKE :search" for c in columns) + ")"
+    params = {"search": f"%{escape_like(term)}%"}
+    if not search_support.word_similarity:
+        return where, None, params
+    rank = "GREATEST(" + ", ".join(f"word_similarity(:search_term, {c})" for c in columns) + ")"
+    return where, rank, {**params, "search_term": term}
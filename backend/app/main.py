@@ -5,9 +5,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
+from app.core.auth import shutdown_password_pool
 from app.core.config import settings
-from app.core.database import init_db, close_db
+from app.core.database import engine, init_db, close_db
+from app.core.rate_limit import login_limiter
 from app.core.redis_cache import cache
+from app.core.utils import detect_search_support
+from app.services.events import event_hub
 from app.api.v1 import api_router
 
 
@@ -16,11 +20,15 @@ async def lifespan(app: FastAPI):
     """Lifespan events for startup and shutdown"""
     # Startup
     await init_db()
+    async with engine.connect() as conn:
+        await detect_search_support(conn)
     await cache.connect()
     yield
     # Shutdown
+    await event_hub.stop()
     await cache.disconnect()
     await close_db()
+    shutdown_password_pool()
 
 
 app = FastAPI(
@@ -58,7 +66,10 @@ async def health():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "redis": "connected" if cache._client else "disconnected"
+        "redis": ("degraded" if cache.degraded else "connected") if cache._client else "disconnected",
+        "cache": cache.stats(),
+        "rate_limit": {"login": login_limiter.stats()},
+        "events": event_hub.stats(),
     }
 
 
@@ -51,3 +51,13 @@ class AdminUserWithWorkload(AdminUserResponse):
     client_count: int = 0
 
 
+class AdminWorkloadResponse(BaseModel):
+    """Filings assigned to one admin, by stage"""
+    admin_id: UUID
+    name: str
+    total: int
+    open: int
+    in_review: int
+    awaiting_payment: int
+
+
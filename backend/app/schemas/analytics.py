@@ -1,13 +1,14 @@
 """
 Analytics schemas
 """
+from datetime import date
 from typing import List
 from pydantic import BaseModel
 
 
 class MonthlyRevenue(BaseModel):
     """Monthly revenue data"""
-    month: str
+    month: str  # e.g. "Mar 2025"
     revenue: float
 
 
@@ -36,3 +37,21 @@ class AnalyticsResponse(BaseModel):
     admin_workload: List[AdminWorkload]
 
 
+
+
+class TimeSeriesPoint(BaseModel):
+    """One bucket of an analytics time series"""
+    bucket: date
+    label: str
+    series: str = "total"
+    value: float
+    count: int
+
+
+class TimeSeriesResponse(BaseModel):
+    """Analytics time series served from the daily rollups"""
+    metric: str
+    granularity: str
+    from_date: date
+    to_date: date
+    points: List[TimeSeriesPoint]
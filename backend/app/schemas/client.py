@@ -52,9 +52,11 @@ class ClientResponse(ClientBase):
 class ClientListResponse(BaseModel):
     """Client list response with pagination"""
     clients: list[ClientResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
 
@@ -0,0 +1,104 @@
+"""
+Client id resolution
+
+The dashboard calls a "client" by a filing id or, for users without filings
+or in older screens, a user id. ``resolve_client`` maps either to the user
+and all of their filings in one query on primary keys and
+filings(user_id), so routes can filter with a plain ``filing_id = ANY(...)``
+instead of ``filing_id = :id OR filing_id IN (SELECT ... WHERE user_id = :id)``.
+
+Results are memoised on the request's session and shared across workers for
+CLIENT_RESOLVER_TTL seconds. Filings are created and deleted by the client
+app without invalidating that cache, so listings can lag by that long. Write
+paths pass ``use_cache=False``: a payment must land on the current latest
+filing, and a stale filing id would fail its foreign key.
+"""
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis_cache import cache
+
+# The user named by the id, or the owner of the filing named by it, with all
+# of the user's filings newest first
+_RESOLVE_SQL = text("""
+    WITH target AS (
+        SELECT id AS user_id, CAST(NULL AS uuid) AS filing_id FROM users WHERE id = CAST(:id AS uuid)
+        UNION ALL
+        SELECT user_id, id FROM filings WHERE id = CAST(:id AS uuid)
+        LIMIT 1
+    )
+    SELECT t.user_id::text AS user_id,
+           t.filing_id::text AS filing_id,
+           ARRAY(SELECT f.id::text FROM filings f WHERE f.user_id = t.user_id
+                 ORDER BY f.created_at DESC, f.id DESC) AS filing_ids
+    FROM target t
+""")
+
+_MEMO_KEY = "resolved_clients"
+
+
+@dataclass(frozen=True)
+class ResolvedClient:
+    user_id: str
+    filing_ids: tuple[str, ...]  # newest first
+    # The filing the id named; None when it was a user id
+    filing_id: Optional[str] = None
+
+    @property
+    def scope(self) -> tuple[str, ...]:
+        """Filings the id covers: the one it named, or all of the user's"""
+        return (self.filing_id,) if self.filing_id else self.filing_ids
+
+    @property
+    def latest_filing_id(self) -> Optional[str]:
+        return self.filing_ids[0] if self.filing_ids else None
+
+    @property
+    def overview_id(self) -> str:
+        """client_overview.client_id of the row this id stands for"""
+        return self.filing_id or self.latest_filing_id or self.user_id
+
+
+def _cache_key(client_id: str) -> str:
+    return f"client:resolve:{client_id}"
+
+
+async def resolve_client(db: AsyncSession, client_id, *, use_cache: bool = True) -> Optional[ResolvedClient]:
+    """
+    The user and filings behind a user or filing id; None if neither
+
+    ``use_cache=False`` queries the database, bypassing the memo and the
+    shared cache, and refreshes both with the result.
+    """
+    try:
+        client_id = str(uuid.UUID(str(client_id)))
+    except ValueError:
+        return None
+
+    memo = db.info.setdefault(_MEMO_KEY, {})
+    if use_cache and client_id in memo:
+        return memo[client_id]
+
+    resolved = None
+    cached = await cache.get(_cache_key(client_id), local_ttl=settings.LOCAL_CACHE_TTL) if use_cache else None
+    if cached is not None:
+        resolved = ResolvedClient(cached["user_id"], tuple(cached["filing_ids"]), cached["filing_id"])
+    else:
+        row = (await db.execute(_RESOLVE_SQL, {"id": client_id})).fetchone()
+        if row is not None:
+            resolved = ResolvedClient(row.user_id, tuple(row.filing_ids or ()), row.filing_id)
+            await cache.set(
+                _cache_key(client_id),
+                {"user_id": resolved.user_id, "filing_ids": list(resolved.filing_ids), "filing_id": resolved.filing_id},
+                ttl=settings.CLIENT_RESOLVER_TTL,
+                local_ttl=settings.LOCAL_CACHE_TTL,
+            )
+    memo[client_id] = resolved
+    return resolved
@@ -0,0 +1,214 @@
+"""
+Dashboard change events
+
+Triggers installed by scripts/events_schema.py NOTIFY EVENTS_CHANNEL with a
+small JSON event per write statement on filings, payments, documents and
+notifications. ``event_hub`` streams them to the dashboards connected to this
+worker (GET /api/v1/events):
+
+  • relay — one API worker in the deployment holds the Redis lock
+    ``events:relay``, LISTENs on EVENTS_CHANNEL and publishes each event to
+    EVENTS_REDIS_CHANNEL. The lock is renewed every third of
+    EVENTS_RELAY_LOCK_TTL; the other workers retry it as often and take over
+    when the relay dies.
+  • fan-out — every worker subscribes to EVENTS_REDIS_CHANNEL and copies each
+    event into the queue of every open stream.
+
+Without Redis every worker LISTENs itself and fans out locally. An open stream
+is a bounded queue and an idle coroutine, with no database connection, so a
+worker holds EVENTS_MAX_CONNECTIONS of them cheaply. A stream whose reader
+falls behind, or that may have missed events (relay handover, Redis
+reconnect), is sent ``resync`` and refetches everything.
+"""
+import asyncio
+import logging
+from typing import Any, Optional, Union
+
+from app.core.config import settings
+from app.core.database import engine, release_listen_connection
+from app.core.redis_cache import cache
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "dashboard_events"
+# Ids carried per event; past this the trigger reports them as null ("many")
+MAX_EVENT_IDS = 100
+RESYNC = '{"type": "resync"}'
+
+_RELAY_LOCK = "events:relay"
+
+# Extend the relay lock only while this worker still holds it
+_RENEW_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class EventHub:
+    """Per-worker fan-out of dashboard events to open streams"""
+
+    def __init__(self):
+        self._streams: set[asyncio.Queue] = set()
+        self._relay_task: Optional[asyncio.Task] = None
+        self._fan_in_task: Optional[asyncio.Task] = None
+        self.relaying = False
+        self.relayed = 0
+        self.delivered = 0
+        self.resyncs = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self._streams) >= settings.EVENTS_MAX_CONNECTIONS
+
+    def subscribe(self) -> asyncio.Queue:
+        """A queue of event payloads (JSON strings) for one stream"""
+        if self._relay_task is None:
+            self._relay_task = asyncio.create_task(self._relay())
+            if cache.connected:
+                self._fan_in_task = asyncio.create_task(self._fan_in())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self._streams.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._streams.discard(queue)
+
+    def _deliver(self, payload: Union[str, bytes]) -> None:
+        if isinstance(payload, bytes):
+            payload = payload.decode("utf-8", "replace")
+        for queue in self._streams:
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._resync(queue)
+        self.delivered += 1
+
+    def _resync(self, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC)
+        self.resyncs += 1
+
+    def _resync_all(self) -> None:
+        for queue in self._streams:
+            self._resync(queue)
+
+    async def _publish(self, payload: str) -> None:
+        self.relayed += 1
+        if self._fan_in_task is not None and await cache.publish(settings.EVENTS_REDIS_CHANNEL, payload):
+            return
+        # No Redis: this worker's streams are all we can reach
+        self._deliver(payload)
+
+    async def _relay(self) -> None:
+        """Hold the relay lock when free and relay NOTIFYs while holding it"""
+        ttl = settings.EVENTS_RELAY_LOCK_TTL
+        while True:
+            # Granted without Redis, so every worker relays for itself
+            token = await cache.acquire_lock(_RELAY_LOCK, ttl)
+            if token is None:
+                await asyncio.sleep(ttl / 3)
+                continue
+            try:
+                await self._listen(token, ttl)
+            except asyncio.CancelledError:
+                # Shutting down: let another worker take over straight away
+                await cache.release_lock(_RELAY_LOCK, token)
+                raise
+            except Exception as e:
+                logger.error(f"event relay error: {e}")
+            finally:
+                self.relaying = False
+            await cache.release_lock(_RELAY_LOCK, token)
+            await asyncio.sleep(1)
+
+    async def _listen(self, token: str, ttl: float) -> None:
+        notifications: asyncio.Queue = asyncio.Queue()
+
+        def callback(_conn, _pid, _channel, payload):
+            notifications.put_nowait(payload)
+
+        conn = await engine.connect()
+        try:
+            raw = await conn.get_raw_connection()
+            listener = raw.driver_connection
+            await listener.add_listener(EVENTS_CHANNEL, callback)
+            self.relaying = True
+            logger.info("event relay: listening")
+            # Changes made while no relay was listening were never published
+            await self._publish(RESYNC)
+
+            loop = asyncio.get_running_loop()
+            renew_at = loop.time() + ttl / 3
+            while True:
+                try:
+                    payload = await asyncio.wait_for(notifications.get(), max(0.0, renew_at - loop.time()))
+                except asyncio.TimeoutError:
+                    if listener.is_closed():
+                        raise ConnectionError("LISTEN connection closed")
+                    renewed = await cache.run_script(
+                        _RENEW_LOCK_SCRIPT, [f"lock:{_RELAY_LOCK}"], [token, int(ttl * 1000)]
+                    )
+                    if cache.connected and not renewed:
+                        logger.warning("event relay: lost the relay lock, stepping down")
+                        return
+                    renew_at = loop.time() + ttl / 3
+                    continue
+                await self._publish(payload)
+        finally:
+            await release_listen_connection(conn, [(EVENTS_CHANNEL, callback)])
+
+    async def _fan_in(self) -> None:
+        """Deliver events published by the relay until cancelled"""
+        backoff = 1
+        while True:
+            pubsub = None
+            try:
+                pubsub = cache.pubsub()
+                if pubsub is None:
+                    raise ConnectionError("Redis not connected")
+                await pubsub.subscribe(settings.EVENTS_REDIS_CHANNEL)
+                backoff = 1
+                while True:
+                    # Poll with a timeout; a blocking read would trip socket_timeout
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        self._deliver(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"event fan-in error: {e}")
+                # Events published while unsubscribed are lost
+                self._resync_all()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    async def stop(self) -> None:
+        for task in (self._relay_task, self._fan_in_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._relay_task = self._fan_in_task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "streams": len(self._streams),
+            "relaying": self.relaying,
+            "relayed": self.relayed,
+            "delivered": self.delivered,
+            "resyncs": self.resyncs,
+        }
+
+
+event_hub = EventHub()
@@ -0,0 +1,420 @@
+"""
+Notification delivery worker
+
+Delivers `notification_outbox` rows written by ``enqueue_notification``:
+
+  1. claim up to NOTIFICATION_WORKER_BATCH due rows (FOR UPDATE SKIP LOCKED,
+     so any number of workers can run side by side), mark them `sending`
+     with a lease, and commit
+  2. deliver them concurrently, outside any transaction
+  3. mark each row `sent`, `skipped` (nothing to deliver), `pending` again
+     with exponential backoff, or `failed` after NOTIFICATION_MAX_ATTEMPTS
+
+Digest rows (see ``enqueue_notification``) are claimed together per user and
+channel and delivered as one email or push; each row gets the outcome.
+
+The worker sleeps on LISTEN notification_outbox, so new rows go out right
+after the request commits; it also polls every NOTIFICATION_WORKER_POLL_SECONDS.
+A dropped LISTEN connection is re-established on the next poll. A row whose
+lease expired (worker crashed mid-send) is put back in the queue. A batch that
+fails as a whole (database or Redis down) is logged and retried with backoff;
+a malformed digest fails only its own rows.
+
+EMAIL_BACKEND=file|smtp and FCM_ENDPOINT_URL point delivery at local stand-ins.
+
+Usage (from backend directory, with venv active):
+
+  python -m app.services.notification_worker
+  python -m app.services.notification_worker --once    # drain due rows and exit
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import signal
+import time
+from typing import Any, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine, release_listen_connection
+from app.core.mailer import EmailMessage, PermanentMailError, mailer
+from app.core.push import fcm
+from app.core.redis_cache import cache
+from app.services.notifications import (
+    DEVICE_TOKENS_CHANNEL,
+    OUTBOX_CHANNEL,
+    build_digest_email,
+    build_digest_push,
+    build_email,
+    get_device_tokens,
+    invalidate_device_tokens,
+)
+
+logger = logging.getLogger(__name__)
+
+# Due rows, plus every other held digest row of the same user and channel:
+# once the first of them is due, the whole digest goes out
+_CLAIM_SQL = text("""
+    WITH due AS (
+        SELECT id, user_id, channel, digest FROM notification_outbox
+        WHERE status = 'pending' AND available_at <= NOW()
+        ORDER BY available_at
+        LIMIT :batch
+        FOR UPDATE SKIP LOCKED
+    ),
+    held AS (
+        SELECT o.id FROM notification_outbox o
+        JOIN (SELECT DISTINCT user_id, channel FROM due WHERE digest) d
+          ON d.user_id = o.user_id AND d.channel = o.channel
+        WHERE o.status = 'pending' AND o.digest
+          AND NOT EXISTS (SELECT 1 FROM due WHERE due.id = o.id)
+        FOR UPDATE OF o SKIP LOCKED
+    )
+    UPDATE notification_outbox o
+    SET status = 'sending',
+        attempts = o.attempts + 1,
+        locked_until = NOW() + make_interval(secs => :lease)
+    FROM (SELECT id FROM due UNION ALL SELECT id FROM held) claimed
+    WHERE o.id = claimed.id
+    RETURNING o.id, o.user_id, o.channel, o.payload, o.attempts, o.digest
+""")
+
+_RECLAIM_SQL = text("""
+    UPDATE notification_outbox
+    SET status = 'pending', locked_until = NULL, last_error = 'lease expired'
+    WHERE status = 'sending' AND locked_until < NOW()
+""")
+
+_DONE_SQL = text("""
+    UPDATE notification_outbox
+    SET status = CAST(:status AS VARCHAR),
+        sent_at = CASE WHEN CAST(:status AS VARCHAR) = 'sent' THEN NOW() END,
+        locked_until = NULL, last_error = :error
+    WHERE id = :id
+""")
+
+_RETRY_SQL = text("""
+    UPDATE notification_outbox
+    SET status = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'pending' END,
+        available_at = NOW() + make_interval(secs => :delay),
+        locked_until = NULL, last_error = :error
+    WHERE id = :id
+""")
+
+
+_DEACTIVATE_TOKENS_SQL = text("""
+    UPDATE notification_device_tokens SET is_active = false, updated_at = NOW()
+    WHERE token = ANY(CAST(:tokens AS text[])) AND is_active = true
+""")
+
+
+_BROADCASTS_SQL = text("""
+    SELECT id::text AS id, type, title, message, email_params FROM notification_broadcasts
+    WHERE id = ANY(CAST(:ids AS uuid[]))
+""")
+
+
+class PermanentDeliveryError(Exception):
+    """Delivery failed in a way a retry will not fix"""
+
+
+class NothingToDeliver(Exception):
+    """No recipient for this channel (disabled, no address, no device)"""
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at one hour"""
+    delay = settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return min(delay, 3600) * random.uniform(0.8, 1.2)
+
+
+class NotificationWorker:
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._semaphore = asyncio.Semaphore(settings.NOTIFICATION_WORKER_CONCURRENCY)
+        self._tasks: set[asyncio.Task] = set()
+        self._broadcasts: dict[str, dict] = {}
+        self._listen_driver: Any = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.digested = 0
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._wakeup.set()
+
+    # ─── Queue ───────────────────────────────────────────────────────────────
+
+    async def run(self, once: bool = False) -> None:
+        listener = None
+        failures = 0
+        try:
+            while not self._stopping:
+                try:
+                    processed = await self.run_batch()
+                except Exception:
+                    if once:
+                        raise
+                    # A database or Redis blip must not kill the worker; rows
+                    # already claimed go back to the queue when their lease expires
+                    failures += 1
+                    delay = min(2 ** failures, 60)
+                    logger.exception(f"notification worker: batch failed, retrying in {delay}s")
+                    await asyncio.sleep(delay)
+                    continue
+                failures = 0
+                if processed:
+                    continue
+                if once:
+                    break
+                if listener is None or self._listen_driver.is_closed():
+                    if listener is not None:
+                        await release_listen_connection(listener, self._listeners())
+                    listener = await self._listen()
+                    if listener is not None:
+                        # Rows queued while nothing was listening sent no wakeup
+                        continue
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.NOTIFICATION_WORKER_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if listener is not None:
+                await release_listen_connection(listener, self._listeners())
+            await fcm.close()
+
+    def _listeners(self) -> list[tuple[str, Any]]:
+        return [(OUTBOX_CHANNEL, self._outbox_changed), (DEVICE_TOKENS_CHANNEL, self._device_tokens_changed)]
+
+    async def _listen(self):
+        """Wake on NOTIFY; without it the worker still polls (and tries again next time)"""
+        conn = None
+        try:
+            conn = await engine.connect()
+            raw = await conn.get_raw_connection()
+            for channel, callback in self._listeners():
+                await raw.driver_connection.add_listener(channel, callback)
+            self._listen_driver = raw.driver_connection
+            return conn
+        except Exception as e:
+            logger.warning(f"notification worker: LISTEN unavailable, polling only ({e})")
+            if conn is not None:
+                await release_listen_connection(conn, self._listeners())
+            return None
+
+    def _outbox_changed(self, *_) -> None:
+        self._wakeup.set()
+
+    def _device_tokens_changed(self, _conn, _pid, _channel, user_id: str) -> None:
+        task = asyncio.create_task(invalidate_device_tokens(user_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def run_batch(self) -> int:
+        """Claim and deliver one batch; returns the number of rows claimed"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(_RECLAIM_SQL)
+            rows = (await db.execute(_CLAIM_SQL, {
+                "lease": settings.NOTIFICATION_LEASE_SECONDS,
+                "batch": settings.NOTIFICATION_WORKER_BATCH,
+            })).fetchall()
+            await db.commit()
+        if not rows:
+            return 0
+
+        payloads = [row.payload if isinstance(row.payload, dict) else json.loads(row.payload) for row in rows]
+        push_users = {str(row.user_id) for row in rows if row.channel == "push"}
+        device_tokens = await get_device_tokens(push_users) if push_users else {}
+        broadcast_ids = {
+            payload["broadcast_id"]
+            for row, payload in zip(rows, payloads)
+            if row.channel == "email" and payload.get("broadcast_id")
+        }
+        if broadcast_ids:
+            await self._load_broadcasts(broadcast_ids)
+
+        # Digest rows of one user and channel become one message
+        groups: dict[tuple, list[tuple[Any, dict]]] = {}
+        for row, payload in sorted(zip(rows, payloads), key=lambda item: item[0].id):
+            key = (str(row.user_id), row.channel) if row.digest else (row.id,)
+            groups.setdefault(key, []).append((row, payload))
+        outcomes = await asyncio.gather(*(self._deliver_group(group, device_tokens) for group in groups.values()))
+        done, retry = [], []
+        for row, (status, error) in (
+            (row, outcome) for group, outcome in zip(groups.values(), outcomes) for row, _ in group
+        ):
+            if status == "retry":
+                retry.append({
+                    "id": row.id,
+                    "max_attempts": settings.NOTIFICATION_MAX_ATTEMPTS,
+                    "delay": retry_delay(row.attempts),
+                    "error": error,
+                })
+            else:
+                done.append({"id": row.id, "status": status, "error": error})
+        async with AsyncSessionLocal() as db:
+            if done:
+                await db.execute(_DONE_SQL, done)
+            if retry:
+                await db.execute(_RETRY_SQL, retry)
+            await db.commit()
+        return len(rows)
+
+    async def _deliver_group(
+        self, group: list[tuple[Any, dict]], device_tokens: dict[str, list[str]]
+    ) -> tuple[str, Optional[str]]:
+        return await self._deliver(group[0][0], [payload for _, payload in group], device_tokens)
+
+    def _message_payload(self, channel: str, payloads: list[dict]) -> dict:
+        """The message for one row, or the digest of a group of rows"""
+        if len(payloads) == 1:
+            return payloads[0]
+        try:
+            payload = self._digest_payload(channel, payloads)
+        except (KeyError, TypeError) as e:
+            raise PermanentDeliveryError(f"malformed digest payload: {e!r}") from e
+        self.digested += len(payloads) - 1
+        return payload
+
+    def _digest_payload(self, channel: str, payloads: list[dict]) -> dict:
+        if channel == "push":
+            title, body, data = build_digest_push([(p["title"], p["body"]) for p in payloads])
+            return {"title": title, "body": body, "data": data}
+        first = payloads[0]
+        subject, html, plain = build_digest_email(
+            client_name=first.get("name") or first["to"],
+            items=[(p["subject"], p.get("message", "")) for p in payloads],
+        )
+        return {"to": first["to"], "subject": subject, "html": html, "plain": plain}
+
+    async def _deliver(
+        self, row, payloads: list[dict], device_tokens: dict[str, list[str]]
+    ) -> tuple[str, Optional[str]]:
+        async with self._semaphore:
+            start = time.monotonic()
+            try:
+                payload = self._message_payload(row.channel, payloads)
+                if row.channel == "email":
+                    await self.send_email(payload)
+                else:
+                    await self.send_push(str(row.user_id), device_tokens.get(str(row.user_id), []), payload)
+            except NothingToDeliver as e:
+                return "skipped", str(e)
+            except PermanentDeliveryError as e:
+                self.failed += 1
+                logger.error(f"notification {row.channel} #{row.id} failed permanently: {e}")
+                return "failed", str(e)
+            except Exception as e:
+                self.retried += 1
+                logger.warning(f"notification {row.channel} #{row.id} attempt {row.attempts} failed: {e}")
+                return "retry", str(e) or type(e).__name__
+        self.sent += 1
+        logger.info(f"notification {row.channel} #{row.id} sent in {(time.monotonic() - start) * 1000:.0f}ms")
+        return "sent", None
+
+    # ─── Email ───────────────────────────────────────────────────────────────
+
+    async def send_email(self, payload: dict) -> None:
+        if not settings.ENABLE_EMAIL_NOTIFICATIONS:
+            raise NothingToDeliver("email disabled")
+        if not payload.get("to"):
+            raise NothingToDeliver("no recipient")
+        if payload.get("broadcast_id"):
+            payload = self._render_broadcast(payload)
+        message = EmailMessage(to=payload["to"], subject=payload["subject"], html=payload["html"], plain=payload["plain"])
+        try:
+            await mailer.send(message)
+        except PermanentMailError as e:
+            raise PermanentDeliveryError(str(e)) from e
+
+    async def _load_broadcasts(self, broadcast_ids: set[str]) -> None:
+        """Fetch the templates of broadcasts not seen yet (they never change)"""
+        missing = [broadcast_id for broadcast_id in broadcast_ids if broadcast_id not in self._broadcasts]
+        if not missing:
+            return
+        if len(self._broadcasts) > 256:
+            self._broadcasts.clear()
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(_BROADCASTS_SQL, {"ids": missing})).mappings().fetchall()
+        for row in rows:
+            params = row["email_params"]
+            self._broadcasts[row["id"]] = {**row, "email_params": params if isinstance(params, dict) else json.loads(params)}
+
+    def _render_broadcast(self, payload: dict) -> dict:
+        broadcast = self._broadcasts.get(payload["broadcast_id"])
+        if broadcast is None:
+            raise PermanentDeliveryError(f"broadcast {payload['broadcast_id']} not found")
+        subject, html, plain = build_email(
+            client_name=payload.get("name") or payload["to"],
+            notif_type=broadcast["type"],
+            title=broadcast["title"],
+            message=broadcast["message"],
+            **broadcast["email_params"],
+        )
+        return {"to": payload["to"], "subject": subject, "html": html, "plain": plain}
+
+    # ─── Push (FCM) ──────────────────────────────────────────────────────────
+
+    async def send_push(self, user_id: str, tokens: list[str], payload: dict) -> None:
+        if not fcm.configured:
+            raise NothingToDeliver("fcm not configured")
+        if not tokens:
+            raise NothingToDeliver("no device tokens")
+
+        result = await fcm.send(tokens, payload["title"], payload["body"], payload.get("data"))
+        if result.invalid_tokens:
+            await self._deactivate_tokens(user_id, result.invalid_tokens)
+        if result.sent:
+            # Retrying would duplicate the push on the devices that got it
+            return
+        if result.retryable:
+            raise RuntimeError(f"FCM delivery failed: {result.retryable[0]}")
+        if result.rejected:
+            raise PermanentDeliveryError(f"rejected by FCM: {result.rejected[0]}")
+        raise NothingToDeliver("no live device tokens")
+
+    async def _deactivate_tokens(self, user_id: str, tokens: list[str]) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(_DEACTIVATE_TOKENS_SQL, {"tokens": tokens})
+            await db.commit()
+        # The trigger's NOTIFY also does this, but only reaches listening workers
+        await invalidate_device_tokens(user_id)
+        logger.info(f"deactivated {len(tokens)} dead device token(s)")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    worker = NotificationWorker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await cache.connect()
+    logger.info("notification worker started")
+    try:
+        await worker.run(once=args.once)
+    finally:
+        await cache.disconnect()
+        await engine.dispose()
+    logger.info(
+        f"notification worker stopped: sent={worker.sent} retried={worker.retried} "
+        f"failed={worker.failed} merged into digests={worker.digested}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Deliver queued notification e-mails and pushes.")
+    parser.add_argument("--once", action="store_true", help="Drain due rows and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,580 @@
+"""
+Client notifications — message rendering and the transactional outbox
+
+``enqueue_notification`` writes the in-app `notifications` row and one
+`notification_outbox` row per delivery channel in the caller's transaction.
+Nothing is sent inline; ``app.services.notification_worker`` delivers the
+outbox after commit, with retries.
+
+``get_device_tokens`` returns the active push tokens of many users, from the
+cache where possible and in one query for the rest. The tokens are written by
+the client app. A trigger on `notification_device_tokens` NOTIFYs
+DEVICE_TOKENS_CHANNEL with the user id, and the worker then drops that user's
+cached entry.
+
+``list_user_notifications`` pages a user's notifications by keyset on
+(created_at, id). Unread counts are cached in Redis per user and adjusted in
+place, after commit, by the send, broadcast and mark-read paths
+(``bump_unread``); read-all drops the count.
+"""
+from __future__ import annotations
+
+import json
+import uuid
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis_cache import cache
+
+OUTBOX_CHANNEL = "notification_outbox"
+DEVICE_TOKENS_CHANNEL = "notification_device_tokens"
+
+# ─── Email content ───────────────────────────────────────────────────────────
+
+APP_URL = "https://tax.diamondaccounts.ca"
+PRIMARY = "#1a3c5e"
+ACCENT = "#2563eb"
+
+
+def build_email(*, client_name: str, notif_type: str, title: str, message: str,
+                doc_name: str = "", amount: float = 0, new_status: str = "",
+                filing_year: int = 2025) -> tuple[str, str, str]:
+    """Build subject, html, plain for a notification email."""
+
+    if notif_type == "document_request" and doc_name:
+        subject = f"Action Required: Please Upload {doc_name}"
+        plain = f"Hi {client_name},\n\nYour tax advisor has requested: {doc_name}\n\n{message}\n\nPlease upload it at: {APP_URL}/welcome"
+        html = f"""<html><body style="font-family:Arial,sans-serif;max-width:600px;margin:auto">
+        <div style="background:{PRIMARY};padding:24px 32px;color:white;border-radius:8px 8px 0 0">
+          <h2 style="margin:0">Diamond Accounts</h2>
+          <p style="margin:4px 0 0;color:#93c5fd;font-size:12px">Tax Filing Services</p>
+        </div>
+        <div style="padding:32px;border:1px solid #e5e7eb;border-top:none;border-radius:0 0 8px 8px">
+          <h3>Document Request</h3>
+          <p>Hi <strong>{client_name}</strong>,</p>
+          <p>Your tax advisor has requested the following document for your <strong>{filing_year}</strong> tax return:</p>
+          <div style="background:#f9fafb;border:1px solid #e5e7eb;border-radius:6px;padding:14px 18px;margin:16px 0">
+            <strong>{doc_name}</strong>
+          </div>
+          {"<p><em>" + message + "</em></p>" if message else ""}
+          <p><a href="{APP_URL}/welcome" style="display:inline-block;background:{ACCENT};color:white;padding:12px 28px;border-radius:6px;text-decoration:none;font-weight:bold">Upload Document Now</a></p>
+        </div>
+        </body></html>"""
+    elif notif_type == "payment_request" and amount:
+        subject = f"Payment Request — ${amount:,.2f} Due"
+        plain = f"Hi {client_name},\n\nA payment of ${amount:,.2f} CAD has been requested for your {filing_year} tax filing.\n{message}\n\nPlease log in: {APP_URL}/welcome"
+        html = f"""<html><body style="font-family:Arial,sans-serif;max-width:600px;margin:auto">
+        <div style="background:{PRIMARY};padding:24px 32px;color:white;border-radius:8px 8px 0 0">
+          <h2 style="margin:0">Diamond Accounts</h2>
+          <p style="margin:4px 0 0;color:#93c5fd;font-size:12px">Tax Filing Services</p>
+        </div>
+        <div style="padding:32px;border:1px solid #e5e7eb;border-top:none;border-radius:0 0 8px 8px">
+          <h3>Payment Request</h3>
+          <p>Hi <strong>{client_name}</strong>,</p>
+          <p>A payment has been requested for your <strong>{filing_year}</strong> tax filing:</p>
+          <div style="background:#f0fdf4;border:1px solid #86efac;border-radius:6px;padding:20px;margin:16px 0;text-align:center">
+            <p style="margin:0;font-size:13px;color:#166534;text-transform:uppercase">Amount Due</p>
+            <p style="margin:8px 0 0;font-size:32px;font-weight:800;color:#15803d">${amount:,.2f} CAD</p>
+          </div>
+          {"<p>" + message + "</p>" if message else ""}
+          <p><a href="{APP_URL}/welcome" style="display:inline-block;background:{ACCENT};color:white;padding:12px 28px;border-radius:6px;text-decoration:none;font-weight:bold">View & Pay Now</a></p>
+        </div>
+        </body></html>"""
+    elif notif_type == "status_update" and new_status:
+        label = new_status.replace("_", " ").title()
+        subject = f"Tax Return Update: {label} — {filing_year} Filing"
+        plain = f"Hi {client_name},\n\nYour {filing_year} tax return status has been updated to: {label}.\n{message}\n\nView filing: {APP_URL}/welcome"
+        html = f"""<html><body style="font-family:Arial,sans-serif;max-width:600px;margin:auto">
+        <div style="background:{PRIMARY};padding:24px 32px;color:white;border-radius:8px 8px 0 0">
+          <h2 style="margin:0">Diamond Accounts</h2>
+          <p style="margin:4px 0 0;color:#93c5fd;font-size:12px">Tax Filing Services</p>
+        </div>
+        <div style="padding:32px;border:1px solid #e5e7eb;border-top:none;border-radius:0 0 8px 8px">
+          <h3>Filing Status Update</h3>
+          <p>Hi <strong>{client_name}</strong>,</p>
+          <p>Your <strong>{filing_year}</strong> tax return status has been updated:</p>
+          <div style="background:#eff6ff;border:1px solid #bfdbfe;border-radius:6px;padding:14px 18px;margin:16px 0">
+            <strong style="color:{ACCENT}">{label}</strong>
+          </div>
+          {"<p>" + message + "</p>" if message else ""}
+          <p><a href="{APP_URL}/welcome" style="display:inline-block;background:{ACCENT};color:white;padding:12px 28px;border-radius:6px;text-decoration:none;font-weight:bold">View My Filing</a></p>
+        </div>
+        </body></html>"""
+    else:
+        subject = title or f"Message from Your Tax Advisor — {filing_year}"
+        plain = f"Hi {client_name},\n\n{message}\n\nLog in: {APP_URL}/welcome"
+        html = f"""<html><body style="font-family:Arial,sans-serif;max-width:600px;margin:auto">
+        <div style="background:{PRIMARY};padding:24px 32px;color:white;border-radius:8px 8px 0 0">
+          <h2 style="margin:0">Diamond Accounts</h2>
+          <p style="margin:4px 0 0;color:#93c5fd;font-size:12px">Tax Filing Services</p>
+        </div>
+        <div style="padding:32px;border:1px solid #e5e7eb;border-top:none;border-radius:0 0 8px 8px">
+          <h3>{title}</h3>
+          <p>Hi <strong>{client_name}</strong>,</p>
+          <div style="background:#f9fafb;border:1px solid #e5e7eb;border-radius:6px;padding:16px 20px;margin:16px 0">
+            <p style="white-space:pre-wrap">{message}</p>
+          </div>
+          <p><a href="{APP_URL}/welcome" style="display:inline-block;background:{ACCENT};color:white;padding:12px 28px;border-radius:6px;text-decoration:none;font-weight:bold">Open TaxEase App</a></p>
+        </div>
+        </body></html>"""
+
+    return subject, html, plain
+
+
+def build_digest_email(*, client_name: str, items: list[tuple[str, str]]) -> tuple[str, str, str]:
+    """Build subject, html, plain for one email covering several (heading, message) items."""
+    subject = f"You have {len(items)} updates from your tax advisor"
+    plain = f"Hi {client_name},\n\n" + "\n\n".join(
+        f"• {heading}\n{message}" if message else f"• {heading}" for heading, message in items
+    ) + f"\n\nLog in: {APP_URL}/welcome"
+    rows = "".join(
+        f"""<div style="border-left:3px solid {ACCENT};padding:8px 16px;margin:12px 0">
+            <strong>{heading}</strong>
+            {'<p style="margin:6px 0 0;white-space:pre-wrap">' + message + '</p>' if message else ''}
+          </div>"""
+        for heading, message in items
+    )
+    html = f"""<html><body style="font-family:Arial,sans-serif;max-width:600px;margin:auto">
+        <div style="background:{PRIMARY};padding:24px 32px;color:white;border-radius:8px 8px 0 0">
+          <h2 style="margin:0">Diamond Accounts</h2>
+          <p style="margin:4px 0 0;color:#93c5fd;font-size:12px">Tax Filing Services</p>
+        </div>
+        <div style="padding:32px;border:1px solid #e5e7eb;border-top:none;border-radius:0 0 8px 8px">
+          <h3>Updates on Your Tax Filing</h3>
+          <p>Hi <strong>{client_name}</strong>, here is what changed:</p>
+          {rows}
+          <p><a href="{APP_URL}/welcome" style="display:inline-block;background:{ACCENT};color:white;padding:12px 28px;border-radius:6px;text-decoration:none;font-weight:bold">Open TaxEase App</a></p>
+        </div>
+        </body></html>"""
+    return subject, html, plain
+
+
+# ─── Push content ────────────────────────────────────────────────────────────
+
+def build_push(*, notif_type: str, title: str, message: str, doc_name: str = "",
+               amount: float = 0, new_status: str = "") -> tuple[str, str, dict]:
+    """Build title, body and data for a push notification."""
+    push_title = title
+    push_body = message[:120]
+    push_data = {"type": notif_type}
+    if notif_type == "document_request":
+        push_title = "Document Required"
+        push_body = f"Please upload: {doc_name}"
+        push_data["doc_name"] = doc_name or ""
+    elif notif_type == "payment_request":
+        push_title = "Payment Due"
+        push_body = f"A payment of ${amount:,.2f} CAD has been requested."
+        push_data["amount"] = str(amount or 0)
+    elif notif_type == "status_update":
+        push_title = "Filing Status Updated"
+        push_body = f"Your tax return is now: {(new_status or '').replace('_', ' ').title()}"
+        push_data["status"] = new_status or ""
+    return push_title, push_body, push_data
+
+
+def build_digest_push(items: list[tuple[str, str]]) -> tuple[str, str, dict]:
+    """Build title, body and data for one push covering several (title, body) items."""
+    body = "; ".join(title for title, _ in items)
+    if len(body) > 120:
+        body = body[:117] + "..."
+    return f"{len(items)} updates on your tax filing", body, {"type": "digest", "count": str(len(items))}
+
+
+def digest_types() -> set[str]:
+    """Notification types merged into digests (none while the window is 0)"""
+    if settings.NOTIFICATION_DIGEST_WINDOW_SECONDS <= 0:
+        return set()
+    return {t.strip() for t in settings.NOTIFICATION_DIGEST_TYPES.split(",") if t.strip()}
+
+
+# ─── Outbox ──────────────────────────────────────────────────────────────────
+
+# The notification row and its outbox rows in one statement; channels whose
+# payload is NULL are skipped
+_ENQUEUE_SQL = text("""
+    WITH n AS (
+        INSERT INTO notifications (id, user_id, filing_id, created_by_id, type, title, message, is_read, created_at)
+        VALUES (CAST(:id AS uuid), CAST(:user_id AS uuid), CAST(:filing_id AS uuid), CAST(:admin_id AS uuid),
+                :type, :title, :message, false, NOW())
+        RETURNING id, user_id
+    )
+    INSERT INTO notification_outbox (notification_id, user_id, channel, payload, digest, available_at)
+    SELECT n.id, n.user_id, c.channel, c.payload, :digest, NOW() + make_interval(secs => :delay)
+    FROM n
+    CROSS JOIN (VALUES ('email', CAST(:email_payload AS jsonb)),
+                       ('push', CAST(:push_payload AS jsonb))) AS c(channel, payload)
+    WHERE c.payload IS NOT NULL
+""")
+
+
+async def enqueue_notification(
+    db: AsyncSession,
+    *,
+    user_id: str,
+    admin_id: Optional[str],
+    notif_type: str,
+    title: str,
+    message: str,
+    email: Optional[dict] = None,
+    push: Optional[dict] = None,
+    filing_id: Optional[str] = None,
+) -> str:
+    """
+    Record a notification and queue its email/push delivery; returns its id
+
+    ``email`` is ``{"to", "subject", "html", "plain"}`` (plus ``name`` and
+    ``message`` for digests) and ``push`` is ``{"title", "body", "data"}``;
+    pass None to skip a channel. The caller commits. The worker is woken by
+    NOTIFY once the transaction commits.
+
+    Types in NOTIFICATION_DIGEST_TYPES are held for
+    NOTIFICATION_DIGEST_WINDOW_SECONDS. Whatever else is queued for the same
+    user and channel by then goes out with them as one digest.
+    """
+    notification_id = str(uuid.uuid4())
+    digest = notif_type in digest_types()
+    await db.execute(_ENQUEUE_SQL, {
+        "id": notification_id,
+        "user_id": user_id,
+        "filing_id": filing_id,
+        "admin_id": admin_id,
+        "type": notif_type,
+        "title": title,
+        "message": message,
+        "email_payload": json.dumps(email) if email else None,
+        "push_payload": json.dumps(push) if push else None,
+        "digest": digest,
+        "delay": settings.NOTIFICATION_DIGEST_WINDOW_SECONDS if digest else 0,
+    })
+    if not digest:
+        await db.execute(text(f"NOTIFY {OUTBOX_CHANNEL}"))
+    return notification_id
+
+
+# ─── Device tokens ───────────────────────────────────────────────────────────
+
+_DEVICE_TOKENS_SQL = text("""
+    SELECT user_id::text AS user_id, token FROM notification_device_tokens
+    WHERE user_id = ANY(CAST(:user_ids AS uuid[])) AND is_active = true
+""")
+
+
+def _device_tokens_key(user_id: str) -> str:
+    return f"push:tokens:{user_id}"
+
+
+async def get_device_tokens(user_ids: Iterable[str]) -> dict[str, list[str]]:
+    """Active push tokens per user; users without a device map to []"""
+    user_ids = sorted({str(user_id) for user_id in user_ids})
+    cached = await cache.get_many(_device_tokens_key(user_id) for user_id in user_ids)
+    tokens = {
+        user_id: cached[_device_tokens_key(user_id)]
+        for user_id in user_ids
+        if _device_tokens_key(user_id) in cached
+    }
+    missing = [user_id for user_id in user_ids if user_id not in tokens]
+    if missing:
+        fetched: dict[str, list[str]] = {user_id: [] for user_id in missing}
+        async with AsyncSessionLocal() as db:
+            for row in (await db.execute(_DEVICE_TOKENS_SQL, {"user_ids": missing})).fetchall():
+                fetched[row.user_id].append(row.token)
+        # Users without a device are cached too, so they cost no query next time
+        await cache.set_many(
+            {_device_tokens_key(user_id): value for user_id, value in fetched.items()},
+            settings.DEVICE_TOKEN_CACHE_TTL,
+        )
+        tokens.update(fetched)
+    return tokens
+
+
+async def invalidate_device_tokens(*user_ids: str) -> None:
+    """Drop cached tokens after they change"""
+    if not user_ids:
+        return
+    async with cache.pipeline(transaction=False) as pipe:
+        pipe.delete(*(_device_tokens_key(user_id) for user_id in user_ids))
+
+
+# ─── Broadcasts ──────────────────────────────────────────────────────────────
+
+# Segment filters on client_overview; payment_state compares paid to fee
+_PAYMENT_STATES = {
+    "unpaid": "co.total_fee > 0 AND co.paid_amount = 0",
+    "partial": "co.paid_amount > 0 AND co.paid_amount < co.total_fee",
+    "paid": "co.total_fee > 0 AND co.paid_amount >= co.total_fee",
+}
+
+
+def segment_where(segment: dict) -> tuple[str, dict]:
+    """WHERE clause and params selecting a segment of client_overview"""
+    clauses = ["co.email IS NOT NULL"]
+    params: dict = {}
+    if segment.get("status"):
+        clauses.append("co.status = :seg_status")
+        params["seg_status"] = segment["status"]
+    if segment.get("filing_year"):
+        clauses.append("co.filing_year = :seg_year")
+        params["seg_year"] = segment["filing_year"]
+    if segment.get("payment_state"):
+        clauses.append(_PAYMENT_STATES[segment["payment_state"]])
+    if segment.get("assigned_admin_id"):
+        clauses.append("co.assigned_admin_id = CAST(:seg_admin AS uuid)")
+        params["seg_admin"] = str(segment["assigned_admin_id"])
+    return "WHERE " + " AND ".join(clauses), params
+
+
+# One row per user, however many of their filings match; the newest filing
+# is linked to the notification
+_RECIPIENTS_SQL = """
+    SELECT DISTINCT ON (co.user_id)
+           co.user_id, co.filing_id, co.email,
+           COALESCE(NULLIF(TRIM(co.name), ''),
+                    INITCAP(REPLACE(SPLIT_PART(co.email, '@', 1), '.', ' '))) AS name
+    FROM client_overview co
+    {where}
+    ORDER BY co.user_id, co.created_at DESC
+"""
+
+# Every notification and outbox row of a broadcast in one statement. The
+# notification ids are drawn up front, so both inserts read the recipients
+# directly instead of joining on RETURNING (whose row estimate is a guess).
+# Email rows carry only the recipient; the worker renders them from the
+# broadcast.
+_BROADCAST_SQL = """
+    WITH recipients AS MATERIALIZED (
+        SELECT gen_random_uuid() AS notification_id, s.* FROM ({recipients}) s
+    ),
+    n AS (
+        INSERT INTO notifications (id, user_id, filing_id, created_by_id, type, title, message, is_read, created_at)
+        SELECT r.notification_id, r.user_id, r.filing_id, CAST(:admin_id AS uuid), :type, :title, :message, false, NOW()
+        FROM recipients r
+        RETURNING user_id
+    ),
+    outbox AS (
+        INSERT INTO notification_outbox (notification_id, user_id, channel, payload, broadcast_id)
+        SELECT r.notification_id, r.user_id, c.channel,
+               CASE c.channel
+                   WHEN 'email' THEN jsonb_build_object(
+                       'broadcast_id', CAST(:broadcast_id AS text), 'to', r.email, 'name', r.name)
+                   ELSE CAST(:push_payload AS jsonb)
+               END,
+               CAST(:broadcast_id AS uuid)
+        FROM recipients r
+        CROSS JOIN (VALUES ('email'), ('push')) AS c(channel)
+        RETURNING 1
+    )
+    UPDATE notification_broadcasts
+    SET recipients = (SELECT COUNT(*) FROM n)
+    WHERE id = CAST(:broadcast_id AS uuid)
+    RETURNING recipients, (SELECT array_agg(user_id::text) FROM n) AS user_ids
+"""
+
+
+async def count_segment(db: AsyncSession, segment: dict) -> int:
+    where, params = segment_where(segment)
+    sql = f"SELECT COUNT(*) FROM ({_RECIPIENTS_SQL.format(where=where)}) r"
+    return (await db.execute(text(sql), params)).scalar() or 0
+
+
+async def broadcast_notification(
+    db: AsyncSession,
+    *,
+    admin_id: str,
+    segment: dict,
+    notif_type: str,
+    title: str,
+    message: str,
+    email_params: dict,
+    push: dict,
+) -> tuple[str, int, list[str]]:
+    """
+    Notify every client in ``segment``; returns (broadcast id, recipients,
+    recipient user ids)
+
+    ``email_params`` are the ``build_email`` arguments other than the client
+    name (doc_name, amount, new_status, filing_year). The caller commits, then
+    passes the user ids to ``bump_unread``.
+    """
+    broadcast_id = str(uuid.uuid4())
+    await db.execute(
+        text("""
+            INSERT INTO notification_broadcasts (id, created_by_id, type, title, message, email_params, segment)
+            VALUES (CAST(:id AS uuid), CAST(:admin_id AS uuid), :type, :title, :message,
+                    CAST(:email_params AS jsonb), CAST(:segment AS jsonb))
+        """),
+        {
+            "id": broadcast_id,
+            "admin_id": admin_id,
+            "type": notif_type,
+            "title": title,
+            "message": message,
+            "email_params": json.dumps(email_params),
+            "segment": json.dumps(segment, default=str),
+        },
+    )
+    where, params = segment_where(segment)
+    sql = _BROADCAST_SQL.format(recipients=_RECIPIENTS_SQL.format(where=where))
+    row = (await db.execute(text(sql), {
+        **params,
+        "broadcast_id": broadcast_id,
+        "admin_id": admin_id,
+        "type": notif_type,
+        "title": title,
+        "message": message,
+        "push_payload": json.dumps(push),
+    })).fetchone()
+    await db.execute(text(f"NOTIFY {OUTBOX_CHANNEL}"))
+    return broadcast_id, row.recipients or 0, row.user_ids or []
+
+
+async def get_broadcast(db: AsyncSession, broadcast_id: str) -> Optional[dict]:
+    """A broadcast with delivery progress per channel, or None"""
+    row = (await db.execute(
+        text("""
+            SELECT id::text, created_by_id::text, type, title, message, segment, recipients, created_at
+            FROM notification_broadcasts WHERE id = CAST(:id AS uuid)
+        """),
+        {"id": broadcast_id},
+    )).mappings().fetchone()
+    if row is None:
+        return None
+    counts = (await db.execute(
+        text("""
+            SELECT channel, status, COUNT(*) AS n FROM notification_outbox
+            WHERE broadcast_id = CAST(:id AS uuid)
+            GROUP BY channel, status
+        """),
+        {"id": broadcast_id},
+    )).fetchall()
+    channels: dict[str, dict[str, int]] = {}
+    for channel, status, n in counts:
+        channels.setdefault(channel, {})[status] = n
+    delivered = sum(n for _, status, n in counts if status not in ("pending", "sending"))
+    total = sum(n for _, _, n in counts)
+    broadcast = dict(row)
+    broadcast["created_at"] = broadcast["created_at"].isoformat() if broadcast["created_at"] else None
+    return {
+        **broadcast,
+        "channels": channels,
+        "progress": round(delivered / total, 4) if total else 1.0,
+        "complete": delivered == total,
+    }
+
+
+# ─── Listing and unread counters ─────────────────────────────────────────────
+
+# Unread counts live in Redis under notif:unread:{user_id}: an integer, or
+# "pending:<token>" while a reader recounts from the database. Counts are only
+# adjusted after commit and only when present. A bump or reset that lands
+# during a recount deletes the marker, so the recount, which may not have seen
+# that change, is not stored. A missing key is recounted on the next read and
+# a count expires after NOTIFICATION_UNREAD_TTL, so any drift is bounded.
+_UNREAD_SCRIPT = """
+local op = ARGV[1]
+if op == 'bump' then
+    for _, key in ipairs(KEYS) do
+        local value = redis.call('get', key)
+        if value then
+            if string.sub(value, 1, 8) == 'pending:' then
+                redis.call('del', key)
+            else
+                redis.call('incrby', key, ARGV[2])
+            end
+        end
+    end
+    return 0
+end
+if op == 'reset' then
+    return redis.call('del', KEYS[1])
+end
+local value = redis.call('get', KEYS[1])
+if op == 'claim' then
+    if value then
+        return value
+    end
+    redis.call('set', KEYS[1], 'pending:' .. ARGV[2], 'EX', ARGV[3])
+    return false
+end
+-- store
+if value == 'pending:' .. ARGV[2] then
+    redis.call('set', KEYS[1], ARGV[3], 'EX', ARGV[4])
+    return 1
+end
+return 0
+"""
+_PENDING = b"pending:"
+# Longest a recount can hold the key; a crashed reader's marker expires then
+_RECOUNT_SECONDS = 10
+# Keys per script call when bumping many users (broadcasts)
+_UNREAD_BUMP_CHUNK = 1000
+
+
+def _unread_key(user_id: str) -> str:
+    return f"notif:unread:{user_id}"
+
+
+async def unread_count(db: AsyncSession, user_id: str) -> int:
+    key = _unread_key(user_id)
+    cached = await cache.get_raw(key)
+    token = None
+    if cached is None:
+        token = uuid.uuid4().hex
+        cached = await cache.run_script(_UNREAD_SCRIPT, [key], ["claim", token, _RECOUNT_SECONDS])
+    if cached is not None and not cached.startswith(_PENDING):
+        return max(int(cached), 0)
+    count = (await db.execute(
+        text("SELECT COUNT(*) FROM notifications WHERE user_id = CAST(:uid AS uuid) AND is_read = false"),
+        {"uid": user_id},
+    )).scalar() or 0
+    # Only the reader holding the marker stores, and only if nothing changed meanwhile
+    if cached is None:
+        await cache.run_script(
+            _UNREAD_SCRIPT, [key], ["store", token, count, settings.NOTIFICATION_UNREAD_TTL]
+        )
+    return count
+
+
+async def bump_unread(user_ids: Iterable[str], amount: int = 1) -> None:
+    """Adjust the cached counts of users that have one (call after commit)"""
+    keys = [_unread_key(str(user_id)) for user_id in user_ids]
+    for start in range(0, len(keys), _UNREAD_BUMP_CHUNK):
+        await cache.run_script(_UNREAD_SCRIPT, keys[start:start + _UNREAD_BUMP_CHUNK], ["bump", amount])
+
+
+async def reset_unread(user_id: str) -> None:
+    """
+    Drop the cached count after read-all commits (the next read recounts)
+
+    Setting it to 0 would erase bumps from sends committed after the UPDATE.
+    """
+    await cache.run_script(_UNREAD_SCRIPT, [_unread_key(user_id)], ["reset"])
+
+
+async def list_user_notifications(
+    db: AsyncSession,
+    user_id: str,
+    *,
+    limit: int,
+    unread_only: bool = False,
+    after: Optional[tuple] = None,
+) -> list:
+    """Newest first; ``after`` is the (created_at, id) of the last row already seen"""
+    where = ["user_id = CAST(:uid AS uuid)"]
+    params: dict = {"uid": user_id, "limit": limit}
+    if unread_only:
+        where.append("is_read = false")
+    if after:
+        where.append("(created_at, id) < (:after_created_at, CAST(:after_id AS uuid))")
+        params["after_created_at"], params["after_id"] = after
+    sql = f"""
+        SELECT id::text AS id, user_id::text AS user_id, type, title, message, is_read, created_at
+        FROM notifications
+        WHERE {" AND ".join(where)}
+        ORDER BY created_at DESC, id DESC
+        LIMIT :limit
+    """
+    return (await db.execute(text(sql), params)).fetchall()
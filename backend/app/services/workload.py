@@ -0,0 +1,88 @@
+"""
+Admin workload — assigned filings per admin, read from client_overview
+"""
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis_cache import cache, cache_result
+
+WORKLOAD_CACHE_KEY = "admin:workload:get_admin_workload"
+
+# One grouped pass over the (assigned_admin_id, status) index, then joined to
+# the handful of admin rows. Completed/filed/assessed filings are not open work.
+_WORKLOAD_SQL = text("""
+    WITH w AS (
+        SELECT assigned_admin_id,
+               COUNT(*)                                                    AS total,
+               COUNT(*) FILTER (WHERE status NOT IN ('completed', 'filed', 'assessed')) AS open,
+               COUNT(*) FILTER (WHERE status = 'under_review')             AS in_review,
+               COUNT(*) FILTER (WHERE status = 'awaiting_payment')         AS awaiting_payment
+        FROM client_overview
+        WHERE assigned_admin_id IS NOT NULL
+        GROUP BY assigned_admin_id
+    )
+    SELECT a.id AS admin_id, a.name,
+           COALESCE(w.total, 0)            AS total,
+           COALESCE(w.open, 0)             AS open,
+           COALESCE(w.in_review, 0)        AS in_review,
+           COALESCE(w.awaiting_payment, 0) AS awaiting_payment
+    FROM admin_users a
+    LEFT JOIN w ON w.assigned_admin_id = a.id
+    WHERE a.is_active
+    ORDER BY a.name
+""")
+
+
+@cache_result("admin:workload", ttl=settings.WORKLOAD_CACHE_TTL, local_ttl=settings.LOCAL_CACHE_TTL)
+async def get_admin_workload(db: AsyncSession) -> list[dict]:
+    """Workload of every active admin (cached briefly across workers)"""
+    rows = (await db.execute(_WORKLOAD_SQL)).fetchall()
+    return [
+        {
+            "admin_id": str(row.admin_id),
+            "name": row.name,
+            "total": row.total,
+            "open": row.open,
+            "in_review": row.in_review,
+            "awaiting_payment": row.awaiting_payment,
+        }
+        for row in rows
+    ]
+
+
+async def count_assigned(db: AsyncSession, admin_id: UUID) -> int:
+    """Number of filings assigned to one admin"""
+    result = await db.execute(
+        text("SELECT COUNT(*) FROM client_overview WHERE assigned_admin_id = :admin_id"),
+        {"admin_id": admin_id},
+    )
+    return result.scalar() or 0
+
+
+async def assign_filing(db: AsyncSession, filing_id: UUID, admin_id: Optional[UUID]) -> None:
+    """Assign a filing to an admin, or unassign it when ``admin_id`` is None (caller commits)"""
+    if admin_id is None:
+        await db.execute(
+            text("DELETE FROM filing_assignments WHERE filing_id = :filing_id"),
+            {"filing_id": filing_id},
+        )
+    else:
+        await db.execute(
+            text("""
+                INSERT INTO filing_assignments (filing_id, admin_id, assigned_at)
+                VALUES (:filing_id, :admin_id, NOW())
+                ON CONFLICT (filing_id) DO UPDATE
+                SET admin_id = EXCLUDED.admin_id, assigned_at = EXCLUDED.assigned_at
+                WHERE filing_assignments.admin_id IS DISTINCT FROM EXCLUDED.admin_id
+            """),
+            {"filing_id": filing_id, "admin_id": admin_id},
+        )
+
+
+async def invalidate_workload() -> None:
+    """Drop the cached workload after an assignment or status change"""
+    await cache.delete(WORKLOAD_CACHE_KEY)
@@ -0,0 +1,263 @@
+"""
+Maintain the daily analytics rollup tables used by /analytics and /analytics/timeseries.
+
+  • analytics_daily_revenue   — (day, method)              → amount, payment_count
+  • analytics_daily_filings   — (day, status, filing_year) → filing_count
+  • analytics_daily_documents — (day, status)              → document_count
+
+Days are UTC calendar days of the row's created_at; rows without one are
+counted under NO_DATE_DAY (1970-01-01) everywhere. Triggers on payments,
+filings and documents apply +/- deltas in the writing transaction, so a range
+query touches at most one row per day and dimension value instead of every
+source row. Filings and documents are bucketed by the day they were created and
+counted under their current status.
+
+Usage (from backend directory, with venv active):
+
+  python scripts/analytics_rollups.py --install     # create tables, functions, triggers
+  python scripts/analytics_rollups.py --rebuild     # recompute from source tables
+  python scripts/analytics_rollups.py --check       # compare with source tables
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from db_connect import create_script_engine
+
+# Rows without a created_at go in one fixed bucket. Bucketing them by NOW()
+# would add to the insert day and subtract from a later day, and --rebuild
+# and --check could never agree with the triggers. Date ranges leave the
+# bucket out; all-time totals include it.
+NO_DATE_DAY = "1970-01-01"
+
+
+def _day(created_at: str) -> str:
+    """SQL for the rollup day of a created_at expression"""
+    return f"COALESCE(({created_at} AT TIME ZONE 'UTC')::date, DATE '{NO_DATE_DAY}')"
+
+
+DDL: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS analytics_daily_revenue (
+        day           DATE NOT NULL,
+        method        VARCHAR(50) NOT NULL,
+        amount        NUMERIC(14, 2) NOT NULL DEFAULT 0,
+        payment_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, method)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS analytics_daily_filings (
+        day          DATE NOT NULL,
+        status       VARCHAR(50) NOT NULL,
+        filing_year  INTEGER NOT NULL,
+        filing_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, status, filing_year)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS analytics_daily_documents (
+        day            DATE NOT NULL,
+        status         VARCHAR(50) NOT NULL,
+        document_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, status)
+    )
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION analytics_rollup_payments_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO analytics_daily_revenue AS r (day, method, amount, payment_count)
+            VALUES ({_day('OLD.created_at')}, COALESCE(OLD.method, 'other'), -COALESCE(OLD.amount, 0), -1)
+            ON CONFLICT (day, method) DO UPDATE
+            SET amount = r.amount + EXCLUDED.amount, payment_count = r.payment_count + EXCLUDED.payment_count;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO analytics_daily_revenue AS r (day, method, amount, payment_count)
+            VALUES ({_day('NEW.created_at')}, COALESCE(NEW.method, 'other'), COALESCE(NEW.amount, 0), 1)
+            ON CONFLICT (day, method) DO UPDATE
+            SET amount = r.amount + EXCLUDED.amount, payment_count = r.payment_count + EXCLUDED.payment_count;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION analytics_rollup_filings_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO analytics_daily_filings AS r (day, status, filing_year, filing_count)
+            VALUES ({_day('OLD.created_at')}, COALESCE(OLD.status, 'documents_pending'),
+                    COALESCE(OLD.filing_year, 0), -1)
+            ON CONFLICT (day, status, filing_year) DO UPDATE
+            SET filing_count = r.filing_count + EXCLUDED.filing_count;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO analytics_daily_filings AS r (day, status, filing_year, filing_count)
+            VALUES ({_day('NEW.created_at')}, COALESCE(NEW.status, 'documents_pending'),
+                    COALESCE(NEW.filing_year, 0), 1)
+            ON CONFLICT (day, status, filing_year) DO UPDATE
+            SET filing_count = r.filing_count + EXCLUDED.filing_count;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION analytics_rollup_documents_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO analytics_daily_documents AS r (day, status, document_count)
+            VALUES ({_day('OLD.created_at')}, COALESCE(OLD.status, 'pending'), -1)
+            ON CONFLICT (day, status) DO UPDATE
+            SET document_count = r.document_count + EXCLUDED.document_count;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO analytics_daily_documents AS r (day, status, document_count)
+            VALUES ({_day('NEW.created_at')}, COALESCE(NEW.status, 'pending'), 1)
+            ON CONFLICT (day, status) DO UPDATE
+            SET document_count = r.document_count + EXCLUDED.document_count;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_analytics_rollup_payments ON payments",
+    """
+    CREATE TRIGGER trg_analytics_rollup_payments
+    AFTER INSERT OR DELETE OR UPDATE OF amount, method, created_at ON payments
+    FOR EACH ROW EXECUTE FUNCTION analytics_rollup_payments_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_analytics_rollup_filings ON filings",
+    """
+    CREATE TRIGGER trg_analytics_rollup_filings
+    AFTER INSERT OR DELETE OR UPDATE OF status, filing_year, created_at ON filings
+    FOR EACH ROW EXECUTE FUNCTION analytics_rollup_filings_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_analytics_rollup_documents ON documents",
+    """
+    CREATE TRIGGER trg_analytics_rollup_documents
+    AFTER INSERT OR DELETE OR UPDATE OF status, created_at ON documents
+    FOR EACH ROW EXECUTE FUNCTION analytics_rollup_documents_trigger()
+    """,
+]
+
+# (table, source table, key columns, value columns, source query producing the same columns)
+_ROLLUPS = [
+    (
+        "analytics_daily_revenue",
+        "payments",
+        "day, method",
+        "amount, payment_count",
+        f"""
+        SELECT {_day('created_at')} AS day, COALESCE(method, 'other') AS method,
+               COALESCE(SUM(amount), 0) AS amount, COUNT(*) AS payment_count
+        FROM payments
+        GROUP BY 1, 2
+        """,
+    ),
+    (
+        "analytics_daily_filings",
+        "filings",
+        "day, status, filing_year",
+        "filing_count",
+        f"""
+        SELECT {_day('created_at')} AS day, COALESCE(status, 'documents_pending') AS status,
+               COALESCE(filing_year, 0) AS filing_year, COUNT(*) AS filing_count
+        FROM filings
+        GROUP BY 1, 2, 3
+        """,
+    ),
+    (
+        "analytics_daily_documents",
+        "documents",
+        "day, status",
+        "document_count",
+        f"""
+        SELECT {_day('created_at')} AS day, COALESCE(status, 'pending') AS status,
+               COUNT(*) AS document_count
+        FROM documents
+        GROUP BY 1, 2
+        """,
+    ),
+]
+
+
+async def install(conn) -> None:
+    for stmt in DDL:
+        await conn.execute(text(stmt))
+
+
+async def rebuild(conn) -> None:
+    for table, source_table, keys, values, source in _ROLLUPS:
+        # Block writers so no trigger delta lands between TRUNCATE and backfill
+        await conn.execute(text(f"LOCK TABLE {source_table} IN SHARE MODE"))
+        await conn.execute(text(f"TRUNCATE {table}"))
+        result = await conn.execute(text(f"INSERT INTO {table} ({keys}, {values}) {source}"))
+        print(f"  {table}: {result.rowcount} rows")
+
+
+async def check(conn) -> int:
+    drifted = 0
+    for table, _source_table, keys, values, source in _ROLLUPS:
+        join = " AND ".join(f"r.{k.strip()} = s.{k.strip()}" for k in keys.split(","))
+        cols = [v.strip() for v in values.split(",")]
+        # Buckets that decayed to zero are equivalent to missing ones
+        differs = " OR ".join(f"COALESCE(r.{c}, 0) <> COALESCE(s.{c}, 0)" for c in cols)
+        sql = f"""
+            SELECT COUNT(*) FROM {table} r
+            FULL OUTER JOIN ({source}) s ON {join}
+            WHERE {differs}
+        """
+        count = (await conn.execute(text(sql))).scalar() or 0
+        print(f"  {table}: {count} drifted bucket(s)")
+        drifted += count
+    return drifted
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    engine = create_script_engine(settings.DATABASE_URL)
+    try:
+        if args.install:
+            async with engine.begin() as conn:
+                await install(conn)
+            print("Analytics rollup tables, functions and triggers installed.")
+        if args.rebuild:
+            async with engine.begin() as conn:
+                await rebuild(conn)
+            print("Analytics rollups rebuilt.")
+        if args.check:
+            async with engine.begin() as conn:
+                drifted = await check(conn)
+            if drifted:
+                return 1
+    finally:
+        await engine.dispose()
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the daily analytics rollup tables.")
+    parser.add_argument("--install", action="store_true", help="Create tables, functions and triggers")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute rollups from source tables")
+    parser.add_argument("--check", action="store_true", help="Compare with source tables; exit 1 on drift")
+    args = parser.parse_args()
+    if not (args.install or args.rebuild or args.check):
+        parser.error("choose at least one of --install, --rebuild, --check")
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Benchmark the dashboard analytics endpoint against a seeded database.
+
+Compares the previous implementation (eight sequential queries, including a
+correlated SUM per filing) with the current single-statement query, and
+measures end-to-end latency of GET /api/v1/analytics through the ASGI app
+(cache not connected, so every request hits the database).
+
+Seeded rows use the e-mail domain @bench.example.com and can be removed with
+--cleanup. Point DATABASE_URL at a scratch database — never production.
+
+Usage (from backend directory, with venv active):
+
+  python scripts/bench_analytics.py --seed-users 100000
+  python scripts/bench_analytics.py --iterations 200 --concurrency 8
+  python scripts/bench_analytics.py --burst 200     # concurrent loads of a cold key
+  python scripts/bench_analytics.py --cleanup
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+BENCH_DOMAIN = "bench.example.com"
+
+# The implementation this benchmark was written against, kept for comparison
+_LEGACY_QUERIES = [
+    "SELECT COUNT(DISTINCT u.id) FROM users u LEFT JOIN filings f ON f.user_id = u.id",
+    "SELECT COUNT(*) FROM admin_users WHERE is_active = true",
+    "SELECT COUNT(*) FROM documents WHERE status IN ('pending', 'missing', 'received')",
+    """
+    SELECT COUNT(*) FROM filings f
+    WHERE COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.filing_id = f.id), 0) = 0
+    """,
+    "SELECT COUNT(*) FROM filings WHERE status IN ('completed', 'filed', 'assessed')",
+    "SELECT COALESCE(SUM(amount), 0) FROM payments",
+    """
+    SELECT TO_CHAR(DATE_TRUNC('month', created_at), 'Mon') AS month, SUM(amount) AS revenue
+    FROM payments
+    WHERE created_at >= NOW() - INTERVAL '6 months'
+    GROUP BY DATE_TRUNC('month', created_at)
+    ORDER BY DATE_TRUNC('month', created_at)
+    """,
+    "SELECT COALESCE(status, 'documents_pending') AS status, COUNT(*) FROM filings GROUP BY status",
+    "SELECT id, name FROM admin_users WHERE is_active = true",
+]
+
+_SEED_SQL = [
+    f"""
+    INSERT INTO users (id, email, first_name, last_name, phone, password_hash,
+                       email_verified, is_active, created_at, updated_at)
+    SELECT gen_random_uuid(), 'bench' || g || '@{BENCH_DOMAIN}', 'Bench', 'User' || g,
+           '+1-416-555-' || LPAD((g % 10000)::text, 4, '0'), 'x', true, true,
+           NOW() - (g % 900 || ' days')::interval, NOW()
+    FROM generate_series(1, :n) g
+    """,
+    f"""
+    INSERT INTO filings (id, user_id, filing_year, status, total_fee, created_at, updated_at)
+    SELECT gen_random_uuid(), u.id, 2023 + (abs(hashtext(u.email)) % 3),
+           (ARRAY['documents_pending', 'under_review', 'cost_estimate_sent', 'awaiting_payment',
+                  'in_preparation', 'awaiting_approval', 'filed', 'completed'])[1 + abs(hashtext(u.email)) % 8],
+           500 + abs(hashtext(u.email)) % 1000, u.created_at, u.updated_at
+    FROM users u
+    WHERE u.email LIKE '%@{BENCH_DOMAIN}' AND abs(hashtext(u.email)) % 10 <> 0
+    """,
+    f"""
+    INSERT INTO payments (id, filing_id, amount, method, note, created_at)
+    SELECT gen_random_uuid(), f.id, 100 + abs(hashtext(f.id::text)) % 500,
+           (ARRAY['E-Transfer', 'Credit Card', 'Cash'])[1 + abs(hashtext(f.id::text)) % 3],
+           'bench', f.created_at + INTERVAL '3 days'
+    FROM filings f JOIN users u ON u.id = f.user_id
+    WHERE u.email LIKE '%@{BENCH_DOMAIN}' AND abs(hashtext(f.id::text)) % 3 <> 0
+    """,
+    f"""
+    INSERT INTO documents (id, filing_id, name, original_filename, file_type, file_size, file_path,
+                           encrypted, document_type, status, version, uploaded_at, created_at, updated_at)
+    SELECT gen_random_uuid(), f.id, 'T4 Slip ' || g, 't4_' || g || '.pdf', 'application/pdf', 0,
+           '/bench/t4.pdf', false, 'income',
+           (ARRAY['pending', 'received', 'approved', 'missing'])[1 + g % 4], 1,
+           f.created_at, f.created_at, f.created_at
+    FROM filings f JOIN users u ON u.id = f.user_id, generate_series(1, 3) g
+    WHERE u.email LIKE '%@{BENCH_DOMAIN}'
+    """,
+]
+
+_CLEANUP_SQL = [
+    f"DELETE FROM payments WHERE filing_id IN (SELECT f.id FROM filings f JOIN users u ON u.id = f.user_id WHERE u.email LIKE '%@{BENCH_DOMAIN}')",
+    f"DELETE FROM documents WHERE filing_id IN (SELECT f.id FROM filings f JOIN users u ON u.id = f.user_id WHERE u.email LIKE '%@{BENCH_DOMAIN}')",
+    f"DELETE FROM filings WHERE user_id IN (SELECT id FROM users WHERE email LIKE '%@{BENCH_DOMAIN}')",
+    f"DELETE FROM users WHERE email LIKE '%@{BENCH_DOMAIN}'",
+]
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    pct = lambda p: samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+    print(
+        f"  {label:<28} n={len(samples):<5} "
+        f"p50={pct(50):8.2f}ms  p95={pct(95):8.2f}ms  p99={pct(99):8.2f}ms  "
+        f"mean={statistics.fmean(samples):8.2f}ms"
+    )
+
+
+async def _timed(samples: list[float], coro_factory, iterations: int, concurrency: int) -> None:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            await coro_factory()
+            samples.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(iterations)))
+
+
+async def run_seed(engine, users: int) -> None:
+    for stmt in _SEED_SQL:
+        start = time.perf_counter()
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(stmt), {"n": users})
+            except Exception as exc:
+                print(f"  seed step skipped ({exc.__class__.__name__}: {str(exc).splitlines()[0]})")
+                continue
+        print(f"  seed step done in {time.perf_counter() - start:.1f}s")
+    async with engine.begin() as conn:
+        for table in ("users", "filings", "payments", "documents", "client_overview"):
+            await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def run_burst(requests: int) -> None:
+    """Fire ``requests`` concurrent dashboard loads at a cold cache key"""
+    import httpx
+
+    from app.core.auth import create_access_token
+    from app.core.database import AsyncSessionLocal, engine
+    from app.core.redis_cache import cache, invalidate_cache
+    from app.main import app
+
+    async with AsyncSessionLocal() as db:
+        admin_id = (await db.execute(
+            text("SELECT id FROM admin_users WHERE is_active ORDER BY created_at LIMIT 1")
+        )).scalar()
+    if admin_id is None:
+        raise SystemExit("No active admin_users row — create one to run the HTTP benchmark.")
+    token = create_access_token({"sub": str(admin_id)})
+
+    await cache.connect()
+    await invalidate_cache("analytics")
+    before = cache.recomputes
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def http():
+            start = time.perf_counter()
+            resp = await client.get(
+                f"{settings.API_V1_PREFIX}/analytics",
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            resp.raise_for_status()
+            return (time.perf_counter() - start) * 1000
+
+        samples = await asyncio.gather(*(http() for _ in range(requests)))
+
+    print(f"{requests} concurrent loads after expiry -> {cache.recomputes - before} recomputation(s)")
+    _report("GET /analytics burst", list(samples))
+    print(f"  cache: {cache.stats()['recompute']}")
+    await cache.disconnect()
+    await engine.dispose()
+
+
+async def run_bench(iterations: int, concurrency: int) -> None:
+    import httpx
+
+    from app.api.v1.analytics import _compute_analytics
+    from app.core.auth import create_access_token
+    from app.core.database import AsyncSessionLocal, engine
+    from app.main import app
+
+    async def legacy():
+        async with AsyncSessionLocal() as db:
+            for sql in _LEGACY_QUERIES:
+                (await db.execute(text(sql))).fetchall()
+
+    async def single_statement():
+        async with AsyncSessionLocal() as db:
+            await _compute_analytics.__wrapped__(db)
+
+    async with AsyncSessionLocal() as db:
+        admin_id = (await db.execute(
+            text("SELECT id FROM admin_users WHERE is_active ORDER BY created_at LIMIT 1")
+        )).scalar()
+        users = (await db.execute(text("SELECT COUNT(*) FROM users"))).scalar()
+    if admin_id is None:
+        raise SystemExit("No active admin_users row — create one to run the HTTP benchmark.")
+
+    token = create_access_token({"sub": str(admin_id)})
+    transport = httpx.ASGITransport(app=app)
+
+    print(f"Database has {users} users; {iterations} iterations, concurrency {concurrency}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def http():
+            resp = await client.get(
+                f"{settings.API_V1_PREFIX}/analytics",
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            resp.raise_for_status()
+
+        # Warm the pool and plan caches before measuring
+        await legacy()
+        await single_statement()
+        await http()
+
+        for label, factory in (
+            ("legacy (9 sequential)", legacy),
+            ("single statement", single_statement),
+            ("GET /analytics end-to-end", http),
+        ):
+            samples: list[float] = []
+            await _timed(samples, factory, iterations, concurrency)
+            _report(label, samples)
+
+    await engine.dispose()
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    from db_connect import create_script_engine
+
+    if args.seed_users or args.cleanup:
+        engine = create_script_engine(settings.DATABASE_URL)
+        try:
+            if args.cleanup:
+                async with engine.begin() as conn:
+                    for stmt in _CLEANUP_SQL:
+                        await conn.execute(text(stmt))
+                print("Benchmark rows removed.")
+            if args.seed_users:
+                print(f"Seeding {args.seed_users} users under @{BENCH_DOMAIN} ...")
+                await run_seed(engine, args.seed_users)
+        finally:
+            await engine.dispose()
+
+    if args.burst:
+        await run_burst(args.burst)
+    elif not args.cleanup:
+        await run_bench(args.iterations, args.concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark dashboard analytics latency.")
+    parser.add_argument("--seed-users", type=int, default=0, help="Insert this many synthetic users first")
+    parser.add_argument("--cleanup", action="store_true", help="Remove seeded rows and exit")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--burst", type=int, default=0, help="Concurrent loads of a cold key instead of the latency run")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Benchmark segment broadcasts against a seeded database.
+
+Seeds --recipients users, each with one filing in the status "bench_broadcast",
+so the segment {"status": "bench_broadcast"} selects exactly them. Then it:
+
+  1. enqueues notifications one recipient at a time, committing each, which is
+     the least that one POST /notifications per client costs (measured on
+     --sequential-sample recipients and extrapolated)
+  2. broadcasts to the whole segment with broadcast_notification (a single
+     INSERT ... SELECT)
+  3. drains the broadcast with the notification worker (file email backend, no
+     send rate limit, FCM not configured so push rows are skipped), printing
+     the progress report as it goes
+
+Seeded users use the e-mail domain @broadcast-bench.example.com and are
+removed at the end (or with --cleanup). Point DATABASE_URL at a scratch
+database — never production.
+
+Usage (from backend directory, with venv active):
+
+  python scripts/bench_broadcast.py
+  python scripts/bench_broadcast.py --recipients 50000 --worker-batch 500
+  python scripts/bench_broadcast.py --cleanup
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+BENCH_DOMAIN = "broadcast-bench.example.com"
+BENCH_STATUS = "bench_broadcast"
+
+_SEED_SQL = [
+    f"""
+    INSERT INTO users (id, email, first_name, last_name, password_hash, email_verified, is_active,
+                       created_at, updated_at)
+    SELECT gen_random_uuid(), 'client' || g || '@{BENCH_DOMAIN}', 'Broadcast', 'Client' || g, 'x', true, true,
+           NOW(), NOW()
+    FROM generate_series(1, :n) g
+    """,
+    f"""
+    INSERT INTO filings (id, user_id, filing_year, status, total_fee, created_at, updated_at)
+    SELECT gen_random_uuid(), u.id, 2025, '{BENCH_STATUS}', 800, NOW(), NOW()
+    FROM users u
+    WHERE u.email LIKE '%@{BENCH_DOMAIN}'
+    """,
+]
+
+_CLEANUP_SQL = [
+    f"""
+    DELETE FROM notification_broadcasts
+    WHERE id IN (SELECT DISTINCT o.broadcast_id FROM notification_outbox o
+                 JOIN users u ON u.id = o.user_id
+                 WHERE u.email LIKE '%@{BENCH_DOMAIN}' AND o.broadcast_id IS NOT NULL)
+    """,
+    # Cascades to filings, client_overview, notifications and their outbox rows
+    f"DELETE FROM users WHERE email LIKE '%@{BENCH_DOMAIN}'",
+]
+
+
+async def _cleanup(engine) -> None:
+    async with engine.begin() as conn:
+        for stmt in _CLEANUP_SQL:
+            await conn.execute(text(stmt))
+
+
+async def _sequential(args: argparse.Namespace, admin_id: str) -> None:
+    from app.core.database import AsyncSessionLocal
+    from app.services.notifications import build_email, build_push, enqueue_notification
+
+    async with AsyncSessionLocal() as db:
+        recipients = (await db.execute(
+            text("SELECT user_id::text, email, name FROM client_overview WHERE status = :s LIMIT :n"),
+            {"s": BENCH_STATUS, "n": args.sequential_sample},
+        )).fetchall()
+
+    start = time.perf_counter()
+    for user_id, email, name in recipients:
+        subject, html, plain = build_email(client_name=name, notif_type="general", title="Reminder",
+                                           message="Bench reminder")
+        push_title, push_body, push_data = build_push(notif_type="general", title="Reminder", message="Bench reminder")
+        async with AsyncSessionLocal() as db:
+            await enqueue_notification(
+                db, user_id=user_id, admin_id=admin_id, notif_type="general", title="Reminder",
+                message="Bench reminder",
+                email={"to": email, "subject": subject, "html": html, "plain": plain},
+                push={"title": push_title, "body": push_body, "data": push_data},
+            )
+            await db.commit()
+    elapsed = time.perf_counter() - start
+    per = elapsed / max(len(recipients), 1)
+    print(
+        f"  one enqueue per recipient        {len(recipients):>6} in {elapsed:7.2f}s  "
+        f"{len(recipients) / elapsed:8.0f}/s  -> about {per * args.recipients:.0f}s for {args.recipients}"
+    )
+
+
+async def _broadcast(admin_id: str) -> str:
+    from app.core.database import AsyncSessionLocal
+    from app.services.notifications import broadcast_notification, build_push
+
+    push_title, push_body, push_data = build_push(notif_type="general", title="Reminder", message="Bench reminder")
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        broadcast_id, recipients, _ = await broadcast_notification(
+            db,
+            admin_id=admin_id,
+            segment={"status": BENCH_STATUS},
+            notif_type="general",
+            title="Reminder",
+            message="Bench reminder",
+            email_params={"filing_year": 2025},
+            push={"title": push_title, "body": push_body, "data": push_data},
+        )
+        await db.commit()
+    elapsed = time.perf_counter() - start
+    print(f"  broadcast (one INSERT ... SELECT) {recipients:>6} in {elapsed:7.2f}s  {recipients / elapsed:8.0f}/s")
+    return broadcast_id
+
+
+async def _drain(broadcast_id: str) -> None:
+    from app.core.database import AsyncSessionLocal
+    from app.services.notification_worker import NotificationWorker
+    from app.services.notifications import get_broadcast
+
+    worker = NotificationWorker()
+    start = time.perf_counter()
+    drain = asyncio.create_task(worker.run(once=True))
+    while not drain.done():
+        await asyncio.sleep(1)
+        async with AsyncSessionLocal() as db:
+            t0 = time.perf_counter()
+            progress = await get_broadcast(db, broadcast_id)
+            report_ms = (time.perf_counter() - t0) * 1000
+        print(
+            f"    {time.perf_counter() - start:6.1f}s  progress {progress['progress']:6.1%}  "
+            f"{progress['channels']}  (report {report_ms:.0f}ms)"
+        )
+    await drain
+    elapsed = time.perf_counter() - start
+    rows = worker.sent + worker.failed + worker.retried
+    async with AsyncSessionLocal() as db:
+        progress = await get_broadcast(db, broadcast_id)
+    print(
+        f"  worker drain                     {progress['recipients'] * 2:>6} outbox rows in {elapsed:7.2f}s  "
+        f"{progress['recipients'] * 2 / elapsed:8.0f}/s  (emails sent {worker.sent}, "
+        f"complete={progress['complete']}, other outcomes {rows - worker.sent})"
+    )
+
+
+async def run_bench(args: argparse.Namespace) -> None:
+    from db_connect import create_script_engine
+
+    # Before the mailer and worker are imported
+    settings.EMAIL_BACKEND = "file"
+    settings.EMAIL_FILE_DIR = tempfile.mkdtemp(prefix="bench-broadcast-")
+    settings.SES_MAX_SEND_RATE = 0
+    settings.EMAIL_MAX_CONCURRENCY = args.concurrency
+    settings.NOTIFICATION_WORKER_CONCURRENCY = args.concurrency
+    settings.NOTIFICATION_WORKER_BATCH = args.worker_batch
+    settings.FCM_SERVICE_ACCOUNT_JSON = None
+
+    from app.core.database import engine
+
+    script_engine = create_script_engine(settings.DATABASE_URL)
+    try:
+        await _cleanup(script_engine)
+        start = time.perf_counter()
+        async with script_engine.begin() as conn:
+            for stmt in _SEED_SQL:
+                await conn.execute(text(stmt), {"n": args.recipients})
+            admin_id = (await conn.execute(text("SELECT id::text FROM admin_users ORDER BY created_at LIMIT 1"))).scalar()
+        print(f"seeded {args.recipients} recipients in {time.perf_counter() - start:.1f}s; "
+              f"worker batch {args.worker_batch}, concurrency {args.concurrency}")
+
+        await _sequential(args, admin_id)
+        # The sequential run's rows would otherwise be drained with the broadcast
+        async with script_engine.begin() as conn:
+            await conn.execute(text(f"""
+                DELETE FROM notifications WHERE user_id IN
+                    (SELECT id FROM users WHERE email LIKE '%@{BENCH_DOMAIN}')
+            """))
+        broadcast_id = await _broadcast(admin_id)
+        await _drain(broadcast_id)
+    finally:
+        if not args.keep:
+            await _cleanup(script_engine)
+        await script_engine.dispose()
+        await engine.dispose()
+
+
+async def cleanup() -> None:
+    from db_connect import create_script_engine
+
+    engine = create_script_engine(settings.DATABASE_URL)
+    try:
+        await _cleanup(engine)
+    finally:
+        await engine.dispose()
+    print("Bench recipients removed.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark segment broadcasts.")
+    parser.add_argument("--recipients", type=int, default=10_000)
+    parser.add_argument("--sequential-sample", type=int, default=500, help="Recipients enqueued one at a time")
+    parser.add_argument("--worker-batch", type=int, default=settings.NOTIFICATION_WORKER_BATCH)
+    parser.add_argument("--concurrency", type=int, default=settings.NOTIFICATION_WORKER_CONCURRENCY)
+    parser.add_argument("--keep", action="store_true", help="Leave the seeded recipients in place")
+    parser.add_argument("--cleanup", action="store_true", help="Remove bench recipients and exit")
+    args = parser.parse_args()
+    asyncio.run(cleanup() if args.cleanup else run_bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compare cache codecs on real payloads: bytes stored, encode and decode time.
+
+Payloads are the dashboard AnalyticsResponse and a page of ClientListResponse,
+both built from the database in DATABASE_URL exactly as the routes build them.
+The previous serializer (json.dumps(default=str), with a pickle fallback) is
+included as the baseline.
+
+Usage (from backend directory, with venv active):
+
+  python scripts/bench_cache_codecs.py
+  python scripts/bench_cache_codecs.py --page-size 100 --iterations 2000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from app.core.cache_codecs import CacheCodec, lz4_frame, msgpack, orjson, zstandard
+from app.core.config import settings
+
+_CODECS = [name for name, module in (("json", json), ("orjson", orjson), ("msgpack", msgpack)) if module]
+_COMPRESSIONS = ["none"] + [name for name, module in (("zstd", zstandard), ("lz4", lz4_frame)) if module]
+
+
+async def load_payloads(page_size: int) -> dict[str, object]:
+    from app.api.v1.analytics import _compute_analytics
+    from app.api.v1.clients import get_clients
+    from app.core.database import AsyncSessionLocal, engine
+
+    async with AsyncSessionLocal() as db:
+        analytics = await _compute_analytics.__wrapped__(db)
+        clients = await get_clients(
+            page=1, page_size=page_size, status_filter=None, year_filter=None, search=None,
+            email=None, assigned_admin_id=None, cursor=None, count="none", db=db, current_admin=None,
+        )
+    await engine.dispose()
+    return {
+        "AnalyticsResponse": analytics,
+        f"ClientListResponse ({page_size} rows)": clients.model_dump(),
+    }
+
+
+def _time_us(fn, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def bench(name: str, payload: object, iterations: int) -> None:
+    print(f"\n{name}")
+    print(f"  {'codec':<20} {'bytes':>8} {'encode µs':>10} {'decode µs':>10}")
+
+    legacy = json.dumps(payload, default=str).encode("utf-8")
+    encode_us = _time_us(lambda: json.dumps(payload, default=str).encode("utf-8"), iterations)
+    decode_us = _time_us(lambda: json.loads(legacy.decode("utf-8")), iterations)
+    print(f"  {'legacy json':<20} {len(legacy):>8} {encode_us:>10.1f} {decode_us:>10.1f}")
+
+    for codec_name in _CODECS:
+        for compression in _COMPRESSIONS:
+            codec = CacheCodec(codec_name, compression, settings.CACHE_COMPRESS_MIN_BYTES)
+            data = codec.encode(payload)
+            encode_us = _time_us(lambda: codec.encode(payload), iterations)
+            decode_us = _time_us(lambda: CacheCodec.decode(data), iterations)
+            label = f"{codec_name}+{compression}"
+            print(f"  {label:<20} {len(data):>8} {encode_us:>10.1f} {decode_us:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare cache codecs on real payloads.")
+    parser.add_argument("--page-size", type=int, default=100, help="Rows in the client-list payload")
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    payloads = asyncio.run(load_payloads(args.page_size))
+    print(f"Compression threshold: {settings.CACHE_COMPRESS_MIN_BYTES} bytes; median of {args.iterations} runs")
+    for name, payload in payloads.items():
+        bench(name, payload, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark API latency while a burst of logins runs on the same worker.
+
+Background traffic (GET /health by default, at a fixed request rate) is
+measured three ways:
+on its own, during a login burst with bcrypt on the event loop
+(BCRYPT_MAX_THREADS=0, the previous behaviour), and during the same burst with
+bcrypt in the thread pool. Requests go through the ASGI app in-process, so any
+time bcrypt holds the event loop shows up directly in the traffic percentiles.
+Latency counts from when each request was due, not from when it was sent.
+
+A bench admin login-bench@bench.example.com is created (or reset) first and
+can be removed with --cleanup. Point DATABASE_URL at a scratch database.
+
+Usage (from backend directory, with venv active):
+
+  python scripts/bench_login_burst.py
+  python scripts/bench_login_burst.py --logins 50 --login-concurrency 10 --threads 2
+  python scripts/bench_login_burst.py --path /api/v1/auth/me
+  python scripts/bench_login_burst.py --cleanup
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+BENCH_EMAIL = "login-bench@bench.example.com"
+BENCH_PASSWORD = "bench-login-password"
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    pct = lambda p: samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+    print(
+        f"  {label:<34} n={len(samples):<5} "
+        f"p50={pct(50):8.2f}ms  p99={pct(99):8.2f}ms  max={samples[-1]:8.2f}ms  "
+        f"mean={statistics.fmean(samples):8.2f}ms"
+    )
+
+
+async def _ensure_bench_admin(engine) -> str:
+    from app.core.auth import get_password_hash
+
+    async with engine.begin() as conn:
+        admin_id = (await conn.execute(
+            text("""
+                INSERT INTO admin_users (id, email, name, password_hash, role, permissions, is_active,
+                                         created_at, updated_at)
+                VALUES (gen_random_uuid(), :email, 'Login Bench', :hash, 'admin', '{}', true, NOW(), NOW())
+                ON CONFLICT (email) DO UPDATE SET password_hash = EXCLUDED.password_hash, is_active = true
+                RETURNING id
+            """),
+            {"email": BENCH_EMAIL, "hash": get_password_hash(BENCH_PASSWORD)},
+        )).scalar()
+    return str(admin_id)
+
+
+async def _traffic(client, path: str, headers: dict, rate: float, stop: asyncio.Event) -> list[float]:
+    """
+    Open-loop traffic: one request every 1/rate seconds, timed from when it was
+    due. A blocked event loop delays the requests instead of hiding them.
+    """
+    samples: list[float] = []
+    pending: list[asyncio.Task] = []
+
+    async def one(due: float):
+        resp = await client.get(path, headers=headers)
+        resp.raise_for_status()
+        samples.append((time.perf_counter() - due) * 1000)
+
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    i = 0
+    while not stop.is_set():
+        due = start + i * interval
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        pending.append(asyncio.create_task(one(due)))
+        i += 1
+    await asyncio.gather(*pending)
+    return samples
+
+
+async def _login_burst(client, logins: int, concurrency: int) -> list[float]:
+    sem = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            resp = await client.post(
+                f"{settings.API_V1_PREFIX}/auth/login",
+                json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD},
+            )
+            resp.raise_for_status()
+            samples.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(logins)))
+    return samples
+
+
+async def run_bench(args: argparse.Namespace) -> None:
+    import httpx
+
+    from app.core.auth import create_access_token, shutdown_password_pool
+    from app.core.database import engine
+    from app.main import app
+    from db_connect import create_script_engine
+
+    script_engine = create_script_engine(settings.DATABASE_URL)
+    try:
+        admin_id = await _ensure_bench_admin(script_engine)
+    finally:
+        await script_engine.dispose()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': admin_id})}"}
+
+    print(
+        f"bcrypt cost {settings.BCRYPT_ROUNDS}; {args.logins} logins at concurrency {args.login_concurrency}; "
+        f"background GET {args.path} at {args.rate:g}/s"
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        # Warm the connection pool and the principal lookup
+        await client.get(args.path, headers=headers)
+
+        stop = asyncio.Event()
+        traffic = asyncio.create_task(_traffic(client, args.path, headers, args.rate, stop))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        _report(f"GET {args.path} alone", await traffic)
+
+        for label, threads in (("bcrypt on the event loop", 0), (f"bcrypt in pool ({args.threads} threads)", args.threads)):
+            settings.BCRYPT_MAX_THREADS = threads
+            shutdown_password_pool()
+            stop = asyncio.Event()
+            traffic = asyncio.create_task(_traffic(client, args.path, headers, args.rate, stop))
+            logins = await _login_burst(client, args.logins, args.login_concurrency)
+            stop.set()
+            print(f"{label}:")
+            _report(f"GET {args.path} during burst", await traffic)
+            _report("POST /auth/login", logins)
+
+    shutdown_password_pool()
+    await engine.dispose()
+
+
+async def cleanup() -> None:
+    from db_connect import create_script_engine
+
+    engine = create_script_engine(settings.DATABASE_URL)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM admin_users WHERE email = :email"), {"email": BENCH_EMAIL})
+    finally:
+        await engine.dispose()
+    print("Bench admin removed.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark API latency during a login burst.")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--login-concurrency", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=settings.BCRYPT_MAX_THREADS or 1,
+                        help="BCRYPT_MAX_THREADS for the pooled run")
+    parser.add_argument("--rate", type=float, default=200, help="Background requests per second")
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    parser.add_argument("--path", default="/health", help="Background request path")
+    parser.add_argument("--cleanup", action="store_true", help="Remove the bench admin and exit")
+    args = parser.parse_args()
+    asyncio.run(cleanup() if args.cleanup else run_bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Benchmark email throughput of the shared mailer.
+
+Sends --emails messages to a local SES stand-in (started in-process, answering
+SendRawEmail after --latency-ms), three ways:
+
+  1. previous behaviour: a new boto3 SES client per email, called synchronously
+     from async code (measured on --legacy-sample emails and extrapolated)
+  2. app.core.mailer with the token bucket off
+  3. app.core.mailer paced at --rate messages/second
+
+Each run also reports the worst event-loop lag seen while it ran, which is how
+long any other request on the same worker would have stalled. Nothing leaves
+the machine, and no database or Redis is needed.
+
+Usage (from backend directory, with venv active):
+
+  python scripts/bench_mailer.py
+  python scripts/bench_mailer.py --emails 1000 --latency-ms 80 --concurrency 20
+  python scripts/bench_mailer.py --backend file      # runs 2 and 3 write .eml files instead
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from app.core.config import settings
+
+_SES_REPLY = (
+    '<SendRawEmailResponse xmlns="http://ses.amazonaws.com/doc/2010-12-01/">'
+    "<SendRawEmailResult><MessageId>{id}</MessageId></SendRawEmailResult>"
+    "<ResponseMetadata><RequestId>bench</RequestId></ResponseMetadata></SendRawEmailResponse>"
+)
+
+
+def _start_ses_stand_in(latency: float) -> ThreadingHTTPServer:
+    counter = iter(range(1, 10**9))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("content-length", 0)))
+            time.sleep(latency)
+            body = _SES_REPLY.format(id=f"bench-{next(counter)}").encode()
+            self.send_response(200)
+            self.send_header("content-type", "text/xml")
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _messages(n: int):
+    from app.core.mailer import EmailMessage
+
+    return [
+        EmailMessage(
+            to=f"bench-{i}@bench.example.com",
+            subject=f"Bench message {i}",
+            html=f"<html><body><p>Bench message {i}</p></body></html>",
+            plain=f"Bench message {i}",
+        )
+        for i in range(n)
+    ]
+
+
+async def _loop_lag(stop: asyncio.Event) -> float:
+    """Worst delay of a 10 ms timer while the run is going"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst * 1000
+
+
+def _report(label: str, sent: int, elapsed: float, lag_ms: float, latencies: list[float] | None = None) -> None:
+    line = f"  {label:<38} {sent:>5} emails in {elapsed:7.2f}s  {sent / elapsed:8.1f}/s  loop lag max {lag_ms:8.1f}ms"
+    if latencies:
+        latencies = sorted(latencies)
+        p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+        line += f"  queued-to-sent p50 {statistics.median(latencies):6.1f}ms p99 {p99:6.1f}ms"
+    print(line)
+
+
+async def _legacy(messages) -> float:
+    import boto3
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(_loop_lag(stop))
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    for message in messages:
+        # What the endpoints did before: a client per email, blocking the loop
+        client = boto3.client(
+            "ses",
+            region_name=settings.AWS_REGION,
+            endpoint_url=settings.SES_ENDPOINT_URL,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        )
+        client.send_raw_email(
+            Source=settings.SES_FROM_EMAIL,
+            Destinations=[message.to],
+            RawMessage={"Data": message.to_mime()},
+        )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    _report("new client per email, blocking", len(messages), elapsed, await lag)
+    return elapsed / len(messages)
+
+
+async def _mailer_run(label: str, messages) -> None:
+    from app.core.mailer import Mailer
+
+    mailer = Mailer()
+    latencies: list[float] = []
+
+    async def one(message):
+        t0 = time.perf_counter()
+        await mailer.send(message)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    # Warm the client so the run measures steady state
+    await mailer.send(messages[0])
+    stop = asyncio.Event()
+    lag = asyncio.create_task(_loop_lag(stop))
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    await asyncio.gather(*(one(m) for m in messages))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    _report(label, len(messages), elapsed, await lag, latencies)
+
+
+async def run_bench(args: argparse.Namespace) -> None:
+    server = _start_ses_stand_in(args.latency_ms / 1000)
+    settings.SES_ENDPOINT_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    settings.AWS_ACCESS_KEY_ID = settings.AWS_ACCESS_KEY_ID or "bench"
+    settings.AWS_SECRET_ACCESS_KEY = settings.AWS_SECRET_ACCESS_KEY or "bench"
+    settings.EMAIL_MAX_CONCURRENCY = args.concurrency
+    messages = _messages(args.emails)
+
+    print(
+        f"{args.emails} emails; SES stand-in latency {args.latency_ms:g}ms; "
+        f"mailer concurrency {args.concurrency}; backend {args.backend}"
+    )
+    per_email = await _legacy(messages[: args.legacy_sample])
+    print(f"  {'':<38} -> about {per_email * args.emails:.0f}s for all {args.emails}")
+
+    settings.EMAIL_BACKEND = args.backend
+    if args.backend == "file":
+        settings.EMAIL_FILE_DIR = tempfile.mkdtemp(prefix="bench-mail-")
+    settings.SES_MAX_SEND_RATE = 0
+    await _mailer_run("mailer, no rate limit", messages)
+    settings.SES_MAX_SEND_RATE = args.rate
+    await _mailer_run(f"mailer, limited to {args.rate:g}/s", messages)
+    server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark email throughput of the shared mailer.")
+    parser.add_argument("--emails", type=int, default=1000)
+    parser.add_argument("--legacy-sample", type=int, default=50, help="Emails sent the previous way")
+    parser.add_argument("--latency-ms", type=float, default=40, help="Stand-in SES response time")
+    parser.add_argument("--concurrency", type=int, default=settings.EMAIL_MAX_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=200, help="Token bucket rate for the last run")
+    parser.add_argument("--backend", choices=("ses", "file"), default="ses")
+    args = parser.parse_args()
+    asyncio.run(run_bench(args))
+
+
+if __name__ == "__main__":
+    main()
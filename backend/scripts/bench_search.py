@@ -0,0 +1,153 @@
+"""
+Benchmark global search (GET /api/v1/search) against a seeded database.
+
+Builds a query mix from the indexed rows themselves: full names, the first
+letters of a name (as typed), email local parts, phone fragments, document
+names, "year status" for filings and notification titles. It times, for each
+query:
+
+  • legacy — what the dashboard pages ran before, one ILIKE search each over
+    client_overview, documents and notifications
+  • GET /search end-to-end through the ASGI app
+
+and reports p50/p95/p99 over the mix and the slowest queries. Needs
+scripts/search_schema.py --install --rebuild first; seed data with
+bench_analytics.py --seed-users. Point DATABASE_URL at a scratch database —
+never production.
+
+Usage (from backend directory, with venv active):
+
+  python scripts/bench_search.py
+  python scripts/bench_search.py --queries 300 --iterations 3 --concurrency 8
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.utils import escape_like
+from bench_analytics import _report
+
+# The per-page searches global search replaces
+_LEGACY_QUERIES = [
+    "SELECT co.client_id FROM client_overview co WHERE co.name ILIKE :s OR co.email ILIKE :s "
+    "ORDER BY co.created_at DESC LIMIT 20",
+    "SELECT d.id FROM documents d WHERE d.name ILIKE :s OR d.original_filename ILIKE :s "
+    "ORDER BY d.created_at DESC LIMIT 20",
+    "SELECT n.id FROM notifications n WHERE n.title ILIKE :s ORDER BY n.created_at DESC LIMIT 20",
+]
+
+# (entity type, SQL expression producing a query from a search_index row s)
+_QUERY_SHAPES = [
+    ("client", "s.title"),
+    ("client", "left(s.title, 4)"),
+    ("client", "split_part(s.subtitle, '@', 1)"),
+    ("client", "right(regexp_replace(s.body, '[^0-9]', '', 'g'), 4)"),
+    ("filing", "split_part(s.title, ' — ', 2) || ' ' || split_part(lower(s.subtitle), ' ', 1)"),
+    ("filing", "split_part(s.title, ' ', 2) || ' ' || split_part(s.title, ' — ', 2)"),
+    ("document", "s.title"),
+    ("document", "s.subtitle"),
+    ("notification", "s.title"),
+]
+
+
+async def build_queries(db, count: int) -> list[str]:
+    per_shape = max(1, count // len(_QUERY_SHAPES))
+    queries: list[str] = []
+    for entity, expr in _QUERY_SHAPES:
+        rows = (await db.execute(text(f"""
+            SELECT {expr} AS q FROM search_index s TABLESAMPLE SYSTEM (1)
+            WHERE s.entity_type = :entity
+            LIMIT :n
+        """), {"entity": entity, "n": per_shape})).fetchall()
+        queries.extend(r.q for r in rows if r.q and len(r.q.strip()) >= 2)
+    random.Random(0).shuffle(queries)
+    return queries
+
+
+async def run_bench(count: int, iterations: int, concurrency: int) -> None:
+    import httpx
+
+    from app.core.auth import create_access_token
+    from app.core.database import AsyncSessionLocal, engine
+    from app.main import app
+
+    async with AsyncSessionLocal() as db:
+        admin_id = (await db.execute(
+            text("SELECT id FROM admin_users WHERE is_active ORDER BY created_at LIMIT 1")
+        )).scalar()
+        indexed = (await db.execute(text("SELECT COUNT(*) FROM search_index"))).scalar()
+        queries = await build_queries(db, count)
+    if admin_id is None:
+        raise SystemExit("No active admin_users row — create one to run the HTTP benchmark.")
+    if not queries:
+        raise SystemExit("search_index is empty — run scripts/search_schema.py --install --rebuild first.")
+
+    token = create_access_token({"sub": str(admin_id)})
+    transport = httpx.ASGITransport(app=app)
+    print(f"search_index has {indexed} rows; {len(queries)} queries x {iterations}, concurrency {concurrency}")
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def legacy(q: str):
+            async with AsyncSessionLocal() as db:
+                for sql in _LEGACY_QUERIES:
+                    (await db.execute(text(sql), {"s": f"%{escape_like(q)}%"})).fetchall()
+
+        async def http(q: str):
+            resp = await client.get(
+                f"{settings.API_V1_PREFIX}/search",
+                params={"q": q},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            resp.raise_for_status()
+
+        # Warm the pool and plan caches before measuring
+        for q in queries[:5]:
+            await legacy(q)
+            await http(q)
+
+        for label, factory in (("legacy (3 page searches)", legacy), ("GET /search end-to-end", http)):
+            samples: list[float] = []
+            timings: dict[str, float] = {}
+            sem = asyncio.Semaphore(concurrency)
+
+            async def one(q: str):
+                async with sem:
+                    start = time.perf_counter()
+                    await factory(q)
+                    ms = (time.perf_counter() - start) * 1000
+                    samples.append(ms)
+                    timings[q] = max(ms, timings.get(q, 0))
+
+            await asyncio.gather(*(one(q) for _ in range(iterations) for q in queries))
+            _report(label, samples)
+            for q, ms in sorted(timings.items(), key=lambda kv: kv[1], reverse=True)[:3]:
+                print(f"    slowest: {ms:8.2f}ms  {q!r}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark global search latency.")
+    parser.add_argument("--queries", type=int, default=180, help="Size of the query mix")
+    parser.add_argument("--iterations", type=int, default=3, help="Runs of the whole mix")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run_bench(args.queries, args.iterations, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
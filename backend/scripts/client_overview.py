@@ -0,0 +1,394 @@
+"""
+Maintain the `client_overview` read table used by /clients, /filings and /analytics.
+
+One row per filing (client_id = filing id), plus one row per user without any
+filing (client_id = user id), holding the user's name/email, the filing status,
+fee, paid amount, document count, T1 progress and assigned admin. Triggers on
+users, filings, payments, documents, t1_forms and filing_assignments keep it
+current in the same transaction as the write, so list endpoints read one
+indexed row instead of running per-row SUM/COUNT subqueries. Writes from the
+client API are covered as well.
+
+Payments and documents adjust paid_amount and document_count by the row's
+delta, so concurrent writes to one filing cannot overwrite each other's
+totals. Other changes recount the affected rows in place under a row lock.
+
+Usage (from backend directory, with venv active):
+
+  python scripts/client_overview.py --install     # create table, functions, triggers
+  python scripts/client_overview.py --rebuild     # backfill from source tables
+  python scripts/client_overview.py --check       # report rows that drifted
+  python scripts/client_overview.py --check --repair
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from db_connect import create_script_engine
+
+
+# Source query — the same shape the routes used to compute on every request.
+# Restrict with a WHERE clause on u.id to refresh a single user.
+_SOURCE_SQL = """
+    SELECT
+        COALESCE(f.id, u.id)                         AS client_id,
+        u.id                                         AS user_id,
+        f.id                                         AS filing_id,
+        u.first_name,
+        u.last_name,
+        u.first_name || ' ' || u.last_name           AS name,
+        u.email,
+        u.phone,
+        f.filing_year,
+        COALESCE(f.status, 'documents_pending')      AS status,
+        COALESCE(f.total_fee, 0)                     AS total_fee,
+        COALESCE((SELECT SUM(p.amount) FROM payments p WHERE p.filing_id = f.id), 0) AS paid_amount,
+        (SELECT COUNT(*) FROM documents d WHERE d.filing_id = f.id)                  AS document_count,
+        tf.id                                        AS t1_form_id,
+        tf.status                                    AS t1_status,
+        tf.completion_percentage,
+        fa.admin_id                                  AS assigned_admin_id,
+        -- The epoch stands in for a missing timestamp: the columns are NOT
+        -- NULL (the /clients keyset sorts on created_at) and, unlike NOW(), it
+        -- gives --check the same value as the trigger
+        COALESCE(f.created_at, u.created_at, TIMESTAMPTZ 'epoch') AS created_at,
+        COALESCE(f.updated_at, u.updated_at, f.created_at, u.created_at, TIMESTAMPTZ 'epoch') AS updated_at
+    FROM users u
+    LEFT JOIN filings f ON f.user_id = u.id
+    LEFT JOIN filing_assignments fa ON fa.filing_id = f.id
+    LEFT JOIN LATERAL (
+        SELECT t.id, t.status, t.completion_percentage
+        FROM t1_forms t
+        WHERE t.filing_id = f.id
+        ORDER BY t.updated_at DESC NULLS LAST
+        LIMIT 1
+    ) tf ON TRUE
+"""
+
+_COLUMNS = (
+    "client_id, user_id, filing_id, first_name, last_name, name, email, phone, "
+    "filing_year, status, total_fee, paid_amount, document_count, "
+    "t1_form_id, t1_status, completion_percentage, assigned_admin_id, created_at, updated_at"
+)
+
+# Every column but the key, for refreshing a row in place
+_UPSERT_SET = ", ".join(
+    f"{c.strip()} = EXCLUDED.{c.strip()}" for c in _COLUMNS.split(",") if c.strip() != "client_id"
+)
+
+DDL: list[str] = [
+    # Filing → admin assignment; lives beside the production filings table
+    """
+    CREATE TABLE IF NOT EXISTS filing_assignments (
+        filing_id   UUID PRIMARY KEY REFERENCES filings (id) ON DELETE CASCADE,
+        admin_id    UUID NOT NULL REFERENCES admin_users (id) ON DELETE CASCADE,
+        assigned_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_filing_assignments_admin ON filing_assignments (admin_id)",
+    """
+    CREATE TABLE IF NOT EXISTS client_overview (
+        client_id             UUID PRIMARY KEY,
+        user_id               UUID NOT NULL,
+        filing_id             UUID,
+        first_name            VARCHAR(255),
+        last_name             VARCHAR(255),
+        name                  TEXT,
+        email                 VARCHAR(255),
+        phone                 VARCHAR(50),
+        filing_year           INTEGER,
+        status                VARCHAR(50) NOT NULL DEFAULT 'documents_pending',
+        total_fee             NUMERIC(12, 2) NOT NULL DEFAULT 0,
+        paid_amount           NUMERIC(12, 2) NOT NULL DEFAULT 0,
+        document_count        INTEGER NOT NULL DEFAULT 0,
+        t1_form_id            UUID,
+        t1_status             VARCHAR(50),
+        completion_percentage INTEGER,
+        assigned_admin_id     UUID,
+        created_at            TIMESTAMPTZ NOT NULL,
+        updated_at            TIMESTAMPTZ NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_client_overview_created ON client_overview (created_at DESC, client_id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_client_overview_user ON client_overview (user_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_client_overview_filing ON client_overview (filing_id) WHERE filing_id IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_client_overview_status ON client_overview (status, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_client_overview_email ON client_overview (email)",
+    # Tables installed before assignments existed
+    "ALTER TABLE client_overview ADD COLUMN IF NOT EXISTS assigned_admin_id UUID",
+    # Covers the per-admin workload aggregation (index-only scan)
+    """
+    CREATE INDEX IF NOT EXISTS idx_client_overview_assigned
+    ON client_overview (assigned_admin_id, status) WHERE assigned_admin_id IS NOT NULL
+    """,
+    # The refresh functions aggregate child rows per filing
+    "CREATE INDEX IF NOT EXISTS idx_filings_user_id ON filings (user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_payments_filing_id ON payments (filing_id)",
+    "CREATE INDEX IF NOT EXISTS idx_documents_filing_id ON documents (filing_id)",
+    "CREATE INDEX IF NOT EXISTS idx_t1_forms_filing_id ON t1_forms (filing_id)",
+    # Full per-user refresh — used when a user or one of their filings changes.
+    # Rows are locked, then upserted in place: deleting and re-inserting would
+    # make a payment or document delta blocked on a deleted row skip it, and
+    # the re-inserted recount may predate that write. Only rows the source no
+    # longer produces (a filing moved or deleted, a first filing replacing the
+    # user's filing-less row) are deleted.
+    f"""
+    CREATE OR REPLACE FUNCTION client_overview_refresh_user(p_user_id UUID) RETURNS VOID AS $$
+    BEGIN
+        IF p_user_id IS NULL THEN
+            RETURN;
+        END IF;
+        PERFORM 1 FROM client_overview WHERE user_id = p_user_id FOR UPDATE;
+        INSERT INTO client_overview ({_COLUMNS})
+        {_SOURCE_SQL}
+        WHERE u.id = p_user_id
+        ON CONFLICT (client_id) DO UPDATE SET {_UPSERT_SET};
+        DELETE FROM client_overview co
+        WHERE co.user_id = p_user_id
+          AND co.client_id NOT IN (
+              SELECT COALESCE(f.id, u.id)
+              FROM users u LEFT JOIN filings f ON f.user_id = u.id
+              WHERE u.id = p_user_id
+          );
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # One filing's row — used for filing updates and T1 writes. The row lock is
+    # taken first so the recount, a later statement, sees every payment or
+    # document committed by a concurrent writer of the same row.
+    f"""
+    CREATE OR REPLACE FUNCTION client_overview_refresh_filing(p_filing_id UUID) RETURNS VOID AS $$
+    BEGIN
+        IF p_filing_id IS NULL THEN
+            RETURN;
+        END IF;
+        PERFORM 1 FROM client_overview WHERE filing_id = p_filing_id FOR UPDATE;
+        INSERT INTO client_overview ({_COLUMNS})
+        {_SOURCE_SQL}
+        WHERE f.id = p_filing_id
+        ON CONFLICT (client_id) DO UPDATE SET {_UPSERT_SET};
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION client_overview_user_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM client_overview_refresh_user(OLD.id);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND (TG_OP = 'INSERT' OR NEW.id <> OLD.id) THEN
+            PERFORM client_overview_refresh_user(NEW.id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION client_overview_filing_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        -- Same user: only this filing's row changes
+        IF TG_OP = 'UPDATE' AND NEW.id = OLD.id AND NEW.user_id = OLD.user_id THEN
+            PERFORM client_overview_refresh_filing(NEW.id);
+            RETURN NULL;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM client_overview_refresh_user(OLD.user_id);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND (TG_OP = 'INSERT' OR NEW.user_id <> OLD.user_id) THEN
+            PERFORM client_overview_refresh_user(NEW.user_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # Payments and documents apply deltas: "x = x + d" re-reads the row after
+    # waiting on a concurrent writer, where a SUM/COUNT recount would use a
+    # snapshot that misses the other transaction's row
+    """
+    CREATE OR REPLACE FUNCTION client_overview_payment_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.filing_id IS NOT NULL THEN
+            UPDATE client_overview SET paid_amount = paid_amount - COALESCE(OLD.amount, 0)
+            WHERE filing_id = OLD.filing_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.filing_id IS NOT NULL THEN
+            UPDATE client_overview SET paid_amount = paid_amount + COALESCE(NEW.amount, 0)
+            WHERE filing_id = NEW.filing_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION client_overview_document_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.filing_id IS NOT NULL THEN
+            UPDATE client_overview SET document_count = document_count - 1 WHERE filing_id = OLD.filing_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.filing_id IS NOT NULL THEN
+            UPDATE client_overview SET document_count = document_count + 1 WHERE filing_id = NEW.filing_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION client_overview_t1_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM client_overview_refresh_filing(OLD.filing_id);
+        END IF;
+        IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.filing_id IS DISTINCT FROM OLD.filing_id) THEN
+            PERFORM client_overview_refresh_filing(NEW.filing_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION client_overview_assignment_trigger() RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE client_overview SET assigned_admin_id = NULL WHERE filing_id = OLD.filing_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            UPDATE client_overview SET assigned_admin_id = NEW.admin_id WHERE filing_id = NEW.filing_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_client_overview_users ON users",
+    """
+    CREATE TRIGGER trg_client_overview_users
+    AFTER INSERT OR DELETE OR UPDATE OF id, first_name, last_name, email, phone, created_at, updated_at ON users
+    FOR EACH ROW EXECUTE FUNCTION client_overview_user_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_client_overview_filings ON filings",
+    """
+    CREATE TRIGGER trg_client_overview_filings
+    AFTER INSERT OR UPDATE OR DELETE ON filings
+    FOR EACH ROW EXECUTE FUNCTION client_overview_filing_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_client_overview_payments ON payments",
+    """
+    CREATE TRIGGER trg_client_overview_payments
+    AFTER INSERT OR DELETE OR UPDATE OF filing_id, amount ON payments
+    FOR EACH ROW EXECUTE FUNCTION client_overview_payment_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_client_overview_documents ON documents",
+    """
+    CREATE TRIGGER trg_client_overview_documents
+    AFTER INSERT OR DELETE OR UPDATE OF filing_id ON documents
+    FOR EACH ROW EXECUTE FUNCTION client_overview_document_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_client_overview_t1_forms ON t1_forms",
+    """
+    CREATE TRIGGER trg_client_overview_t1_forms
+    AFTER INSERT OR UPDATE OR DELETE ON t1_forms
+    FOR EACH ROW EXECUTE FUNCTION client_overview_t1_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_client_overview_assignments ON filing_assignments",
+    """
+    CREATE TRIGGER trg_client_overview_assignments
+    AFTER INSERT OR UPDATE OR DELETE ON filing_assignments
+    FOR EACH ROW EXECUTE FUNCTION client_overview_assignment_trigger()
+    """,
+    # Replaced by the per-table payment, document and T1 triggers
+    "DROP FUNCTION IF EXISTS client_overview_child_trigger()",
+]
+
+# Rows that differ between the table and a fresh computation (either side missing counts too)
+_CHECK_SQL = f"""
+    WITH expected AS ({_SOURCE_SQL})
+    SELECT COALESCE(e.client_id, co.client_id) AS client_id,
+           COALESCE(e.user_id, co.user_id)     AS user_id
+    FROM expected e
+    FULL OUTER JOIN client_overview co ON co.client_id = e.client_id
+    WHERE e.client_id IS NULL
+       OR co.client_id IS NULL
+       OR (e.user_id, e.filing_id, e.name, e.email, e.phone, e.filing_year, e.status,
+           e.total_fee, e.paid_amount, e.document_count, e.t1_form_id, e.t1_status,
+           e.completion_percentage, e.assigned_admin_id, e.created_at, e.updated_at)
+          IS DISTINCT FROM
+          (co.user_id, co.filing_id, co.name, co.email, co.phone, co.filing_year, co.status,
+           co.total_fee, co.paid_amount, co.document_count, co.t1_form_id, co.t1_status,
+           co.completion_percentage, co.assigned_admin_id, co.created_at, co.updated_at)
+"""
+
+
+async def install(conn) -> None:
+    for stmt in DDL:
+        await conn.execute(text(stmt))
+
+
+async def rebuild(conn) -> int:
+    await conn.execute(text("LOCK TABLE client_overview IN EXCLUSIVE MODE"))
+    await conn.execute(text("TRUNCATE client_overview"))
+    result = await conn.execute(text(f"INSERT INTO client_overview ({_COLUMNS}) {_SOURCE_SQL}"))
+    await conn.execute(text("ANALYZE client_overview"))
+    return result.rowcount
+
+
+async def check(conn, repair: bool) -> int:
+    rows = (await conn.execute(text(_CHECK_SQL))).fetchall()
+    for row in rows[:20]:
+        print(f"  drift: client_id={row.client_id} user_id={row.user_id}")
+    if len(rows) > 20:
+        print(f"  ... and {len(rows) - 20} more")
+    if repair and rows:
+        user_ids = sorted({str(r.user_id) for r in rows})
+        for uid in user_ids:
+            await conn.execute(text("SELECT client_overview_refresh_user(CAST(:uid AS uuid))"), {"uid": uid})
+        print(f"  repaired {len(user_ids)} user(s)")
+    return len(rows)
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    engine = create_script_engine(settings.DATABASE_URL)
+    try:
+        if args.install:
+            async with engine.begin() as conn:
+                await install(conn)
+            print("client_overview table, functions and triggers installed.")
+        if args.rebuild:
+            async with engine.begin() as conn:
+                count = await rebuild(conn)
+            print(f"client_overview rebuilt with {count} rows.")
+        if args.check:
+            async with engine.begin() as conn:
+                drift = await check(conn, args.repair)
+            print(f"client_overview check: {drift} drifted row(s).")
+            if drift and not args.repair:
+                return 1
+    finally:
+        await engine.dispose()
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the client_overview read table.")
+    parser.add_argument("--install", action="store_true", help="Create table, indexes, functions and triggers")
+    parser.add_argument("--rebuild", action="store_true", help="Truncate and backfill from source tables")
+    parser.add_argument("--check", action="store_true", help="Compare against source tables; exit 1 on drift")
+    parser.add_argument("--repair", action="store_true", help="With --check, refresh users whose rows drifted")
+    args = parser.parse_args()
+    if not (args.install or args.rebuild or args.check):
+        parser.error("choose at least one of --install, --rebuild, --check")
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Maintain the triggers behind the dashboard event feed (GET /api/v1/events).
+
+Every INSERT, UPDATE or DELETE statement on filings, payments, documents and
+notifications sends one NOTIFY dashboard_events carrying a small JSON change
+event:
+
+  {"type": "payments", "op": "insert", "count": 1, "filing_ids": ["..."]}
+
+Triggers are per statement, not per row, so a bulk write (a broadcast inserts
+thousands of notifications) is one event. The ids are the distinct filings
+(or users, for notifications) touched; past 100 they are null, meaning "many".
+One API worker relays the events to Redis and every worker streams them to
+its connected dashboards (app.services.events).
+
+Usage (from backend directory, with venv active):
+
+  python scripts/events_schema.py --install     # create the function and triggers
+  python scripts/events_schema.py --uninstall   # drop them
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.services.events import EVENTS_CHANNEL, MAX_EVENT_IDS
+from db_connect import create_script_engine
+
+# table -> (column identifying what changed, key it is reported under)
+TABLES: dict[str, tuple[str, str]] = {
+    "filings": ("id", "filing_ids"),
+    "payments": ("filing_id", "filing_ids"),
+    "documents": ("filing_id", "filing_ids"),
+    "notifications": ("user_id", "user_ids"),
+}
+
+# Transition tables allow one event per trigger, hence three triggers a table
+_EVENTS = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "UPDATE": "REFERENCING NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+}
+
+FUNCTION_DDL = f"""
+CREATE OR REPLACE FUNCTION notify_dashboard_change() RETURNS trigger AS $$
+DECLARE
+    rows_name text := CASE TG_OP WHEN 'DELETE' THEN 'old_rows' ELSE 'new_rows' END;
+    changed bigint;
+    keys jsonb;
+BEGIN
+    EXECUTE format('SELECT COUNT(*) FROM %I', rows_name) INTO changed;
+    IF changed = 0 THEN
+        RETURN NULL;
+    END IF;
+    EXECUTE format(
+        'SELECT jsonb_agg(k) FROM (SELECT DISTINCT %I::text AS k FROM %I WHERE %I IS NOT NULL LIMIT {MAX_EVENT_IDS + 1}) s',
+        TG_ARGV[0], rows_name, TG_ARGV[0]
+    ) INTO keys;
+    keys := COALESCE(keys, '[]');
+    PERFORM pg_notify('{EVENTS_CHANNEL}', jsonb_build_object(
+        'type', TG_TABLE_NAME,
+        'op', lower(TG_OP),
+        'count', changed,
+        TG_ARGV[1], CASE WHEN jsonb_array_length(keys) > {MAX_EVENT_IDS} THEN NULL ELSE keys END
+    )::text);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def _trigger_name(table: str, event: str) -> str:
+    return f"trg_{table}_dashboard_{event.lower()}"
+
+
+def install_ddl() -> list[str]:
+    ddl = [FUNCTION_DDL]
+    for table, (column, key) in TABLES.items():
+        for event, referencing in _EVENTS.items():
+            name = _trigger_name(table, event)
+            ddl.append(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+            ddl.append(f"""
+                CREATE TRIGGER {name}
+                AFTER {event} ON {table} {referencing}
+                FOR EACH STATEMENT EXECUTE FUNCTION notify_dashboard_change('{column}', '{key}')
+            """)
+    return ddl
+
+
+def uninstall_ddl() -> list[str]:
+    ddl = [
+        f"DROP TRIGGER IF EXISTS {_trigger_name(table, event)} ON {table}"
+        for table in TABLES
+        for event in _EVENTS
+    ]
+    ddl.append("DROP FUNCTION IF EXISTS notify_dashboard_change()")
+    return ddl
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    engine = create_script_engine(settings.DATABASE_URL)
+    try:
+        async with engine.begin() as conn:
+            for stmt in install_ddl() if args.install else uninstall_ddl():
+                await conn.execute(text(stmt))
+        print("Dashboard event triggers " + ("installed." if args.install else "removed."))
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the dashboard event triggers.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--install", action="store_true", help="Create the function and triggers")
+    group.add_argument("--uninstall", action="store_true", help="Drop the function and triggers")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
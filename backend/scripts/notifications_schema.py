@@ -0,0 +1,187 @@
+"""
+Maintain the tables behind notification delivery.
+
+  • notification_outbox — one row per channel (email, push) of every
+    notification, written in the same transaction as the `notifications` row.
+    The worker (python -m app.services.notification_worker) claims due rows
+    with FOR UPDATE SKIP LOCKED, delivers them, and retries failures with
+    backoff. A row left in `sending` by a crashed worker is claimed again once
+    its lease (locked_until) passes.
+  • notification_broadcasts — one row per segment broadcast; its outbox rows
+    carry broadcast_id so progress is a grouped count.
+  • digest rows: notification types listed in NOTIFICATION_DIGEST_TYPES are
+    queued with digest = true and held for the digest window, then sent
+    together with the user's other held rows as one email and one push.
+  • indexes on notifications for the admin listing (keyset by user, newest
+    first) and unread counts.
+  • a trigger on notification_device_tokens (written by the client app) that
+    NOTIFYs notification_device_tokens with the user id on every change, so
+    workers drop that user's cached push tokens.
+
+Usage (from backend directory, with venv active):
+
+  python scripts/notifications_schema.py --install   # create tables and indexes
+  python scripts/notifications_schema.py --status    # outbox rows per channel and status
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from db_connect import create_script_engine
+
+
+DDL: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS notification_broadcasts (
+        id              UUID PRIMARY KEY,
+        created_by_id   UUID,
+        type            VARCHAR(50) NOT NULL,
+        title           TEXT NOT NULL,
+        message         TEXT NOT NULL,
+        email_params    JSONB NOT NULL DEFAULT '{}',
+        segment         JSONB NOT NULL DEFAULT '{}',
+        recipients      INTEGER NOT NULL DEFAULT 0,
+        created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS notification_outbox (
+        id              BIGSERIAL PRIMARY KEY,
+        notification_id UUID REFERENCES notifications(id) ON DELETE CASCADE,
+        user_id         UUID NOT NULL,
+        channel         VARCHAR(10) NOT NULL,
+        payload         JSONB NOT NULL,
+        status          VARCHAR(10) NOT NULL DEFAULT 'pending',
+        attempts        INTEGER NOT NULL DEFAULT 0,
+        available_at    TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        locked_until    TIMESTAMPTZ,
+        last_error      TEXT,
+        created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        sent_at         TIMESTAMPTZ,
+        CONSTRAINT notification_outbox_channel_check CHECK (channel IN ('email', 'push')),
+        CONSTRAINT notification_outbox_status_check
+            CHECK (status IN ('pending', 'sending', 'sent', 'failed', 'skipped'))
+    )
+    """,
+    # Due work, oldest first; finished rows stay out of the index
+    """
+    CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+    ON notification_outbox (available_at) WHERE status = 'pending'
+    """,
+    # Leases of crashed workers
+    """
+    CREATE INDEX IF NOT EXISTS idx_notification_outbox_leased
+    ON notification_outbox (locked_until) WHERE status = 'sending'
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_notification_outbox_notification
+    ON notification_outbox (notification_id)
+    """,
+    # Outboxes installed before broadcasts existed
+    """
+    ALTER TABLE notification_outbox ADD COLUMN IF NOT EXISTS broadcast_id UUID
+        REFERENCES notification_broadcasts(id) ON DELETE SET NULL
+    """,
+    # Rows held for a digest (NOTIFICATION_DIGEST_WINDOW_SECONDS)
+    "ALTER TABLE notification_outbox ADD COLUMN IF NOT EXISTS digest BOOLEAN NOT NULL DEFAULT false",
+    """
+    CREATE INDEX IF NOT EXISTS idx_notification_outbox_digest
+    ON notification_outbox (user_id, channel) WHERE status = 'pending' AND digest
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_notification_outbox_broadcast
+    ON notification_outbox (broadcast_id, channel, status) WHERE broadcast_id IS NOT NULL
+    """,
+    # Token lookups are per user and only ever want active tokens
+    """
+    CREATE INDEX IF NOT EXISTS idx_notification_device_tokens_user_active
+    ON notification_device_tokens (user_id) WHERE is_active = true
+    """,
+    # Admin listing pages by keyset on (created_at, id) within one user;
+    # unread counts are recomputed from the partial index on a cache miss
+    """
+    CREATE INDEX IF NOT EXISTS idx_notifications_user_created
+    ON notifications (user_id, created_at DESC, id DESC)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_notifications_user_unread
+    ON notifications (user_id) WHERE is_read = false
+    """,
+    """
+    CREATE OR REPLACE FUNCTION notify_device_tokens_changed() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM pg_notify('notification_device_tokens', OLD.user_id::text);
+        END IF;
+        IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.user_id IS DISTINCT FROM OLD.user_id) THEN
+            PERFORM pg_notify('notification_device_tokens', NEW.user_id::text);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_notification_device_tokens_changed ON notification_device_tokens",
+    """
+    CREATE TRIGGER trg_notification_device_tokens_changed
+    AFTER INSERT OR UPDATE OR DELETE ON notification_device_tokens
+    FOR EACH ROW EXECUTE FUNCTION notify_device_tokens_changed()
+    """,
+]
+
+
+async def install(conn) -> None:
+    for stmt in DDL:
+        await conn.execute(text(stmt))
+
+
+async def status(conn) -> None:
+    rows = (await conn.execute(text("""
+        SELECT channel, status, COUNT(*) AS n, MIN(available_at) AS oldest
+        FROM notification_outbox
+        GROUP BY channel, status
+        ORDER BY channel, status
+    """))).fetchall()
+    if not rows:
+        print("  notification_outbox is empty")
+    for row in rows:
+        print(f"  {row.channel:<6} {row.status:<8} {row.n:>8}  oldest due {row.oldest:%Y-%m-%d %H:%M:%S}")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    engine = create_script_engine(settings.DATABASE_URL)
+    try:
+        if args.install:
+            async with engine.begin() as conn:
+                await install(conn)
+            print("Notification tables and indexes installed.")
+        if args.status:
+            async with engine.begin() as conn:
+                await status(conn)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the notification delivery tables.")
+    parser.add_argument("--install", action="store_true", help="Create tables and indexes")
+    parser.add_argument("--status", action="store_true", help="Show outbox rows per channel and status")
+    args = parser.parse_args()
+    if not (args.install or args.status):
+        parser.error("choose at least one of --install, --status")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
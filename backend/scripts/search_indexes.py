@@ -0,0 +1,188 @@
+"""
+Maintain the indexes behind admin search (clients, users, documents).
+
+Search is a substring match, ``column ILIKE '%term%'``, ranked by pg_trgm's
+``word_similarity`` (app.core.utils.text_search). Without an index every
+search reads the whole table; a trigram GIN index per searched column turns
+it into a bitmap index scan.
+
+  • users.full_name — a stored generated column (first name + last name), so
+    the name can be indexed instead of searching an expression
+  • GIN (gin_trgm_ops) on users(full_name, email), client_overview(name,
+    email) and documents(name, original_filename)
+
+Adding users.full_name is not online: ``ALTER TABLE ... ADD COLUMN ...
+GENERATED ... STORED`` rewrites the whole users table under an ACCESS
+EXCLUSIVE lock, so every read and write of users (logins included) waits
+until it finishes. Run the first --install in a maintenance window; on a
+database that already has the column it is a no-op. The indexes are then
+built CONCURRENTLY, without blocking writes. A build that failed leaves an
+invalid index behind; --install drops and rebuilds it. Terms shorter than
+three characters yield no trigrams and still scan.
+
+The API checks for pg_trgm and users.full_name once at startup. Without them
+search is a plain ILIKE in newest-first order, so restart the API after
+--install to get ranked results.
+
+--explain runs the search queries the routes run through EXPLAIN ANALYZE and
+fails (exit 1) when a search reads its table sequentially. On tables too small
+for the planner to bother with the index, it checks again with sequential
+scans disabled, which shows the index can serve the query.
+
+Usage (from backend directory, with venv active):
+
+  python scripts/search_indexes.py --install
+  python scripts/search_indexes.py --explain
+  python scripts/search_indexes.py --explain --term "smith"
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.utils import detect_search_support, text_search
+from db_connect import create_script_engine
+
+# Below this many rows a sequential scan is the planner's honest choice
+_SMALL_TABLE_ROWS = 10_000
+
+SETUP_DDL: list[str] = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE users ADD COLUMN IF NOT EXISTS full_name TEXT
+    GENERATED ALWAYS AS (btrim(COALESCE(first_name, '') || ' ' || COALESCE(last_name, ''))) STORED
+    """,
+]
+
+# index name -> (table, column)
+TRGM_INDEXES: dict[str, tuple[str, str]] = {
+    "idx_users_full_name_trgm": ("users", "full_name"),
+    "idx_users_email_trgm": ("users", "email"),
+    "idx_client_overview_name_trgm": ("client_overview", "name"),
+    "idx_client_overview_email_trgm": ("client_overview", "email"),
+    "idx_documents_name_trgm": ("documents", "name"),
+    "idx_documents_filename_trgm": ("documents", "original_filename"),
+}
+
+# name -> (table, alias, searched columns, selected columns); the same shapes
+# as get_clients, search_users and get_documents
+SEARCHES: dict[str, tuple[str, str, list[str], str]] = {
+    "clients": ("client_overview", "co", ["co.name", "co.email"], "co.client_id, co.created_at"),
+    "users": ("users", "u", ["u.full_name", "u.email"], "u.id, u.created_at"),
+    "documents": ("documents", "d", ["d.name", "d.original_filename"], "d.id, d.created_at"),
+}
+
+
+async def install(engine) -> None:
+    async with engine.connect() as conn:
+        if not (await detect_search_support(conn)).user_full_name:
+            rows = (await conn.execute(text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'users'"))).scalar()
+            print(f"  adding users.full_name: rewrites users (~{max(rows or 0, 0)} rows) under an exclusive lock")
+        for stmt in SETUP_DDL:
+            await conn.execute(text(stmt))
+        for name, (table, column) in TRGM_INDEXES.items():
+            valid = (await conn.execute(
+                text("SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :n"),
+                {"n": name},
+            )).scalar()
+            if valid is False:
+                print(f"  {name}: invalid (interrupted build), rebuilding")
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            await conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)"
+            ))
+            print(f"  {name} on {table} ({column})")
+
+
+def _plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans") or []:
+        yield from _plan_nodes(child)
+
+
+async def _explain(conn, sql: str, params: dict) -> tuple[dict, float]:
+    raw = (await conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"), params)).scalar()
+    plan = json.loads(raw) if isinstance(raw, str) else raw
+    return plan[0]["Plan"], plan[0]["Execution Time"]
+
+
+async def explain(engine, term: str) -> bool:
+    ok = True
+    async with engine.connect() as conn:
+        support = await detect_search_support(conn)
+        if not (support.word_similarity and support.user_full_name):
+            print("  pg_trgm or users.full_name is missing — run --install first")
+            return False
+        for name, (table, alias, columns, select) in SEARCHES.items():
+            search_sql, rank_sql, params = text_search(columns, term)
+            sql = f"""
+                SELECT {select} FROM {table} {alias}
+                WHERE {search_sql}
+                ORDER BY {rank_sql} DESC, {alias}.created_at DESC
+                LIMIT 20
+            """
+            rows = (await conn.execute(text(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = :t"
+            ), {"t": table})).scalar() or 0
+            plan, ms = await _explain(conn, sql, params)
+            nodes = list(_plan_nodes(plan))
+            seq = any(n["Node Type"] == "Seq Scan" and n.get("Relation Name") == table for n in nodes)
+            indexes = sorted({n["Index Name"] for n in nodes if n.get("Index Name")})
+            verdict = "ok"
+            if seq and rows < _SMALL_TABLE_ROWS:
+                # Small table: prove the index applies rather than the planner's choice
+                await conn.execute(text("SET enable_seqscan = off"))
+                plan, _ = await _explain(conn, sql, params)
+                await conn.execute(text("RESET enable_seqscan"))
+                nodes = list(_plan_nodes(plan))
+                seq = any(n["Node Type"] == "Seq Scan" and n.get("Relation Name") == table for n in nodes)
+                indexes = sorted({n["Index Name"] for n in nodes if n.get("Index Name")})
+                verdict = "ok (small table; index usable)"
+            if seq:
+                verdict = "FAIL: sequential scan"
+                ok = False
+            print(f"  {name:<10} {rows:>9} rows  {ms:8.2f} ms  {verdict}  indexes: {', '.join(indexes) or '-'}")
+    return ok
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    engine = create_script_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+    try:
+        if args.install:
+            await install(engine)
+            print("Search indexes installed.")
+        if args.explain:
+            print(f"Search plans for {args.term!r}:")
+            if not await explain(engine, args.term):
+                return 1
+    finally:
+        await engine.dispose()
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the admin search indexes.")
+    parser.add_argument("--install", action="store_true", help="Create the extension, column and indexes")
+    parser.add_argument("--explain", action="store_true", help="Check that searches use the indexes")
+    parser.add_argument("--term", default="smith", help="Search term for --explain")
+    args = parser.parse_args()
+    if not (args.install or args.explain):
+        parser.error("choose at least one of --install, --explain")
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
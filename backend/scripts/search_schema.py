@@ -0,0 +1,322 @@
+"""
+Maintain the `search_index` table behind global search (GET /api/v1/search).
+
+One row per searchable entity, with a weighted tsvector and the text shown in
+results:
+
+  • client        — user name (A), email and phone (B)
+  • filing        — filing year and status (A), client name and email (C)
+  • document      — name (A), original filename (B)
+  • notification  — title (A)
+
+Text is lower-cased and split on anything that is not a letter or digit, so
+"john.smith@example.com" indexes john, smith, example and com, and phone
+numbers are indexed both per group and as one run of digits. The route turns
+each word of the query into a prefix match. Each entity type has its own
+partial GIN index.
+
+Statement-level triggers on users, filings, documents and notifications keep
+the table current in the same transaction as the write. A bulk write, such as
+a broadcast inserting thousands of notifications, runs one INSERT ... SELECT
+from its transition table. Renaming a user refreshes their client row and the
+filing rows that carry the name. Updates that do not change the indexed text
+write nothing.
+
+Usage (from backend directory, with venv active):
+
+  python scripts/search_schema.py --install     # create table, functions, triggers
+  python scripts/search_schema.py --rebuild     # backfill from source tables
+  python scripts/search_schema.py --check       # report rows that drifted
+  python scripts/search_schema.py --check --repair
+  python scripts/search_schema.py --uninstall   # drop triggers, functions and table
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parents[1]
+_SCRIPTS = Path(__file__).resolve().parent
+for _p in (_SCRIPTS, _BACKEND):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from db_connect import create_script_engine
+
+_COLUMNS = "entity_type, entity_id, user_id, filing_id, title, subtitle, body, document, created_at"
+
+_NAME = "NULLIF(btrim(concat_ws(' ', u.first_name, u.last_name)), '')"
+
+# entity type -> (source table, key column, source query). Restrict with a
+# WHERE clause on the key column to refresh some rows.
+SOURCES: dict[str, tuple[str, str, str]] = {
+    "client": ("users", "u.id", f"""
+        SELECT 'client', u.id, u.id, CAST(NULL AS uuid),
+               COALESCE({_NAME}, u.email),
+               u.email,
+               concat_ws(' · ', {_NAME}, u.email, u.phone),
+               setweight(search_terms({_NAME}), 'A')
+                   || setweight(search_terms(u.email), 'B')
+                   || setweight(search_terms(u.phone)
+                                || to_tsvector('simple', regexp_replace(COALESCE(u.phone, ''), '[^0-9]+', '', 'g')), 'B'),
+               u.created_at
+        FROM users u
+    """),
+    "filing": ("filings", "f.id", f"""
+        SELECT 'filing', f.id, f.user_id, f.id,
+               concat_ws(' — ', COALESCE({_NAME}, u.email), f.filing_year),
+               initcap(replace(f.status, '_', ' ')),
+               concat_ws(' · ', COALESCE({_NAME}, u.email), f.filing_year, replace(f.status, '_', ' ')),
+               setweight(search_terms(concat_ws(' ', f.filing_year, f.status)), 'A')
+                   || setweight(search_terms(concat_ws(' ', {_NAME}, u.email)), 'C'),
+               f.created_at
+        FROM filings f
+        JOIN users u ON u.id = f.user_id
+    """),
+    "document": ("documents", "d.id", """
+        SELECT 'document', d.id, f.user_id, d.filing_id,
+               COALESCE(NULLIF(d.name, ''), d.original_filename, 'Untitled document'),
+               d.original_filename,
+               concat_ws(' · ', d.name, d.original_filename),
+               setweight(search_terms(d.name), 'A') || setweight(search_terms(d.original_filename), 'B'),
+               d.created_at
+        FROM documents d
+        LEFT JOIN filings f ON f.id = d.filing_id
+    """),
+    "notification": ("notifications", "n.id", """
+        SELECT 'notification', n.id, n.user_id, n.filing_id,
+               COALESCE(n.title, ''),
+               n.type,
+               COALESCE(n.title, ''),
+               setweight(search_terms(n.title), 'A'),
+               n.created_at
+        FROM notifications n
+    """),
+}
+
+# table -> entity type its rows are indexed as
+TABLES: dict[str, str] = {table: entity for entity, (table, _, _) in SOURCES.items()}
+
+_EVENTS = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "UPDATE": "REFERENCING NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def _refresh_function(entity: str) -> str:
+    table, key, source = SOURCES[entity]
+    return f"""
+    CREATE OR REPLACE FUNCTION search_index_refresh_{entity}(p_ids UUID[]) RETURNS VOID AS $$
+    BEGIN
+        IF COALESCE(cardinality(p_ids), 0) = 0 THEN
+            RETURN;
+        END IF;
+        DELETE FROM search_index s
+        WHERE s.entity_type = '{entity}' AND s.entity_id = ANY(p_ids)
+          AND NOT EXISTS (SELECT 1 FROM {table} x WHERE x.id = s.entity_id);
+        INSERT INTO search_index ({_COLUMNS})
+        {source}
+        WHERE {key} = ANY(p_ids)
+        ON CONFLICT (entity_type, entity_id) DO UPDATE SET
+            user_id    = EXCLUDED.user_id,
+            filing_id  = EXCLUDED.filing_id,
+            title      = EXCLUDED.title,
+            subtitle   = EXCLUDED.subtitle,
+            body       = EXCLUDED.body,
+            document   = EXCLUDED.document,
+            created_at = EXCLUDED.created_at
+        WHERE (search_index.user_id, search_index.filing_id, search_index.title, search_index.subtitle,
+               search_index.body, search_index.document, search_index.created_at)
+              IS DISTINCT FROM
+              (EXCLUDED.user_id, EXCLUDED.filing_id, EXCLUDED.title, EXCLUDED.subtitle,
+               EXCLUDED.body, EXCLUDED.document, EXCLUDED.created_at);
+    END;
+    $$ LANGUAGE plpgsql
+    """
+
+
+_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION search_index_trigger() RETURNS TRIGGER AS $$
+DECLARE
+    ids UUID[];
+BEGIN
+    EXECUTE format('SELECT array_agg(id) FROM %I',
+                   CASE TG_OP WHEN 'DELETE' THEN 'old_rows' ELSE 'new_rows' END) INTO ids;
+    EXECUTE format('SELECT search_index_refresh_%s($1)', TG_ARGV[0]) USING ids;
+    IF TG_TABLE_NAME = 'users' AND TG_OP = 'UPDATE' THEN
+        -- Filing rows carry the client's name
+        PERFORM search_index_refresh_filing(ARRAY(SELECT f.id FROM filings f WHERE f.user_id = ANY(ids)));
+    ELSIF TG_TABLE_NAME = 'filings' AND TG_OP = 'UPDATE' THEN
+        -- Documents of a filing moved to another user
+        PERFORM search_index_refresh_document(ARRAY(
+            SELECT d.id
+            FROM new_rows n
+            JOIN documents d ON d.filing_id = n.id
+            JOIN search_index s ON s.entity_type = 'document' AND s.entity_id = d.id
+            WHERE s.user_id IS DISTINCT FROM n.user_id
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def _trigger_name(table: str, event: str) -> str:
+    return f"trg_{table}_search_index_{event.lower()}"
+
+
+def install_ddl() -> list[str]:
+    ddl = [
+        """
+        CREATE TABLE IF NOT EXISTS search_index (
+            entity_type VARCHAR(20) NOT NULL,
+            entity_id   UUID NOT NULL,
+            user_id     UUID,
+            filing_id   UUID,
+            title       TEXT NOT NULL,
+            subtitle    TEXT,
+            body        TEXT NOT NULL,
+            document    TSVECTOR NOT NULL,
+            created_at  TIMESTAMPTZ,
+            PRIMARY KEY (entity_type, entity_id)
+        )
+        """,
+        # Letters and digits only, lower-cased; the route splits queries the same way
+        """
+        CREATE OR REPLACE FUNCTION search_terms(value TEXT) RETURNS TSVECTOR AS $$
+            SELECT to_tsvector('simple', regexp_replace(lower(COALESCE(value, '')), '[^[:alnum:]]+', ' ', 'g'))
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        """,
+    ]
+    for entity in SOURCES:
+        ddl.append(
+            f"CREATE INDEX IF NOT EXISTS idx_search_index_{entity} ON search_index "
+            f"USING gin (document) WHERE entity_type = '{entity}'"
+        )
+        ddl.append(_refresh_function(entity))
+    ddl.append(_TRIGGER_FUNCTION)
+    for table, entity in TABLES.items():
+        for event, referencing in _EVENTS.items():
+            name = _trigger_name(table, event)
+            ddl.append(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+            ddl.append(f"""
+                CREATE TRIGGER {name}
+                AFTER {event} ON {table} {referencing}
+                FOR EACH STATEMENT EXECUTE FUNCTION search_index_trigger('{entity}')
+            """)
+    return ddl
+
+
+def uninstall_ddl() -> list[str]:
+    ddl = [
+        f"DROP TRIGGER IF EXISTS {_trigger_name(table, event)} ON {table}"
+        for table in TABLES
+        for event in _EVENTS
+    ]
+    ddl.append("DROP FUNCTION IF EXISTS search_index_trigger()")
+    ddl.extend(f"DROP FUNCTION IF EXISTS search_index_refresh_{entity}(UUID[])" for entity in SOURCES)
+    ddl.append("DROP TABLE IF EXISTS search_index")
+    ddl.append("DROP FUNCTION IF EXISTS search_terms(TEXT)")
+    return ddl
+
+
+# Rows missing, orphaned or stale, per entity type
+def _check_sql(entity: str) -> str:
+    _, _, source = SOURCES[entity]
+    return f"""
+        WITH expected ({_COLUMNS}) AS ({source})
+        SELECT COALESCE(e.entity_id, s.entity_id) AS entity_id
+        FROM expected e
+        FULL OUTER JOIN (SELECT * FROM search_index WHERE entity_type = '{entity}') s
+            ON s.entity_id = e.entity_id
+        WHERE e.entity_id IS NULL
+           OR s.entity_id IS NULL
+           OR (e.user_id, e.filing_id, e.title, e.subtitle, e.body, e.document, e.created_at)
+              IS DISTINCT FROM
+              (s.user_id, s.filing_id, s.title, s.subtitle, s.body, s.document, s.created_at)
+    """
+
+
+async def install(conn) -> None:
+    for stmt in install_ddl():
+        await conn.execute(text(stmt))
+
+
+async def rebuild(conn) -> dict[str, int]:
+    await conn.execute(text("LOCK TABLE search_index IN EXCLUSIVE MODE"))
+    await conn.execute(text("TRUNCATE search_index"))
+    counts = {}
+    for entity, (_, _, source) in SOURCES.items():
+        result = await conn.execute(text(f"INSERT INTO search_index ({_COLUMNS}) {source}"))
+        counts[entity] = result.rowcount
+    await conn.execute(text("ANALYZE search_index"))
+    return counts
+
+
+async def check(conn, repair: bool) -> int:
+    drift = 0
+    for entity in SOURCES:
+        ids = [str(r.entity_id) for r in (await conn.execute(text(_check_sql(entity)))).fetchall()]
+        drift += len(ids)
+        for entity_id in ids[:20]:
+            print(f"  drift: {entity} {entity_id}")
+        if len(ids) > 20:
+            print(f"  ... and {len(ids) - 20} more {entity} row(s)")
+        if repair and ids:
+            await conn.execute(
+                text(f"SELECT search_index_refresh_{entity}(CAST(:ids AS uuid[]))"), {"ids": ids}
+            )
+            print(f"  repaired {len(ids)} {entity} row(s)")
+    return drift
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    engine = create_script_engine(settings.DATABASE_URL)
+    try:
+        if args.uninstall:
+            async with engine.begin() as conn:
+                for stmt in uninstall_ddl():
+                    await conn.execute(text(stmt))
+            print("search_index table, functions and triggers removed.")
+            return 0
+        if args.install:
+            async with engine.begin() as conn:
+                await install(conn)
+            print("search_index table, functions and triggers installed.")
+        if args.rebuild:
+            async with engine.begin() as conn:
+                counts = await rebuild(conn)
+            print("search_index rebuilt: " + ", ".join(f"{n} {entity}" for entity, n in counts.items()))
+        if args.check:
+            async with engine.begin() as conn:
+                drift = await check(conn, args.repair)
+            print(f"search_index check: {drift} drifted row(s).")
+            if drift and not args.repair:
+                return 1
+    finally:
+        await engine.dispose()
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the global search index.")
+    parser.add_argument("--install", action="store_true", help="Create table, indexes, functions and triggers")
+    parser.add_argument("--rebuild", action="store_true", help="Truncate and backfill from source tables")
+    parser.add_argument("--check", action="store_true", help="Compare against source tables; exit 1 on drift")
+    parser.add_argument("--repair", action="store_true", help="With --check, refresh the rows that drifted")
+    parser.add_argument("--uninstall", action="store_true", help="Drop triggers, functions and table")
+    args = parser.parse_args()
+    if not (args.install or args.rebuild or args.check or args.uninstall):
+        parser.error("choose at least one of --install, --rebuild, --check, --uninstall")
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
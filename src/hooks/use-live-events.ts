@@ -0,0 +1,103 @@
+import { useEffect, useRef } from 'react';
+import { apiService } from '@/services/api';
+
+export type LiveEventType = 'filings' | 'payments' | 'documents' | 'notifications' | 'resync';
+
+export interface LiveEvent {
+  type: LiveEventType;
+  op?: 'insert' | 'update' | 'delete';
+  count?: number;
+  // null when too many changed to list
+  filing_ids?: string[] | null;
+  user_ids?: string[] | null;
+}
+
+/**
+ * Subscribe to the backend's change feed (GET /events) instead of polling.
+ *
+ * `onChange` runs at most once per `debounceMs` with the events of `types`
+ * received since its last call. A `resync` event among them (sent after a
+ * reconnect, or when this tab fell behind) means refetch everything.
+ */
+export function useLiveEvents(
+  types: LiveEventType[],
+  onChange: (events: LiveEvent[]) => void,
+  debounceMs = 1000,
+) {
+  const onChangeRef = useRef(onChange);
+  onChangeRef.current = onChange;
+  const typesKey = types.join(',');
+
+  useEffect(() => {
+    const wanted = new Set(typesKey.split(','));
+    let source: EventSource | null = null;
+    let pending: LiveEvent[] = [];
+    let flushTimer: ReturnType<typeof setTimeout> | undefined;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let retryDelay = 1000;
+    let opened = false;
+    let stopped = false;
+
+    const queue = (event: LiveEvent) => {
+      pending.push(event);
+      if (flushTimer) return;
+      flushTimer = setTimeout(() => {
+        const batch = pending;
+        pending = [];
+        flushTimer = undefined;
+        onChangeRef.current(batch);
+      }, debounceMs);
+    };
+
+    const reconnect = () => {
+      retryTimer = setTimeout(async () => {
+        await apiService.refreshToken().catch(() => undefined);
+        if (!stopped) connect();
+      }, retryDelay);
+      retryDelay = Math.min(retryDelay * 2, 30000);
+    };
+
+    const connect = async () => {
+      let url: string | null;
+      try {
+        url = await apiService.eventsUrl();
+      } catch {
+        if (!stopped) reconnect();
+        return;
+      }
+      if (!url || stopped) return;
+      source = new EventSource(url);
+      source.addEventListener('ready', () => {
+        retryDelay = 1000;
+        // The page fetched on mount; a later ready is a reconnect
+        if (opened) queue({ type: 'resync' });
+        opened = true;
+      });
+      source.onmessage = (message) => {
+        let event: LiveEvent;
+        try {
+          event = JSON.parse(message.data);
+        } catch {
+          return;
+        }
+        if (event.type === 'resync' || wanted.has(event.type)) queue(event);
+      };
+      source.onerror = () => {
+        // The ticket in the URL is spent, so the browser's own retry would be
+        // refused: close, and reopen with a new ticket (and refreshed token)
+        if (stopped || !source) return;
+        source.close();
+        source = null;
+        reconnect();
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      source?.close();
+      clearTimeout(flushTimer);
+      clearTimeout(retryTimer);
+    };
+  }, [typesKey, debounceMs]);
+}
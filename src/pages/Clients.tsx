@@ -37,6 +37,7 @@ import { Plus, Download, Trash2, Edit, Loader2, RefreshCw } from 'lucide-react';
 import { useAuth } from '@/contexts/AuthContext';
 import { useToast } from '@/hooks/use-toast';
 import { api } from '@/services/api';
+import { useLiveEvents } from '@/hooks/use-live-events';
 
 export default function Clients() {
   const navigate = useNavigate();
@@ -104,6 +105,9 @@ export default function Clients() {
     fetchClients();
   }, [fetchClients]);
 
+  // Refetch when filings or payments change instead of polling
+  useLiveEvents(['filings', 'payments'], () => fetchClients());
+
   const filteredClients = clients;
 
   const columns = [
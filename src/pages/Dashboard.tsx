@@ -10,6 +10,7 @@ import { StatusBadge } from '@/components/ui/status-badge';
 import { Button } from '@/components/ui/button';
 import { useNavigate } from 'react-router-dom';
 import { useTour } from '@/components/tour';
+import { useLiveEvents } from '@/hooks/use-live-events';
 import { dashboardTourSteps } from '@/config/tourSteps';
 
 const COLORS = ['hsl(200, 98%, 39%)', 'hsl(213, 93%, 67%)', 'hsl(215, 20%, 65%)', 'hsl(215, 16%, 46%)', 'hsl(120, 40%, 50%)'];
@@ -22,8 +23,9 @@ export default function Dashboard() {
   const [recentClients, setRecentClients] = useState<any[]>([]);
   const [isLoading, setIsLoading] = useState(true);
 
-  const fetchDashboardData = useCallback(async () => {
-    setIsLoading(true);
+  // Background refreshes (silent) keep the current data on screen
+  const fetchDashboardData = useCallback(async (silent = false) => {
+    if (!silent) setIsLoading(true);
     try {
       const [analyticsData, clientsData] = await Promise.all([
         apiService.getAnalytics(),
@@ -45,6 +47,9 @@ export default function Dashboard() {
 
   useEffect(() => { fetchDashboardData(); }, [fetchDashboardData]);
 
+  // Stats and recent clients only move when filings, payments or documents do
+  useLiveEvents(['filings', 'payments', 'documents'], () => fetchDashboardData(true));
+
   // Initialize tour steps when component mounts
   useEffect(() => {
     setSteps(dashboardTourSteps);
@@ -14,6 +14,7 @@
  *  /audit-logs           → admin audit log
  *  /admin-users          → admin user management
  *  /admin-users/{id}     → single admin user
+ *  /search              → global search across clients, filings, documents, notifications
  */
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || '/api/v1';
@@ -196,6 +197,17 @@ class ApiService {
     return response;
   }
 
+  // Dashboard change feed (GET /events). EventSource cannot send headers,
+  // so the stream is opened with a short-lived single-use ticket rather than
+  // the access token; every connection needs a new one.
+  async eventsUrl(): Promise<string | null> {
+    if (!localStorage.getItem('taxease_access_token')) return null;
+    const { ticket } = await this.request<{ ticket: string; expires_in: number }>('/events/ticket', {
+      method: 'POST',
+    });
+    return `${this.baseUrl}/events?ticket=${encodeURIComponent(ticket)}`;
+  }
+
   // ─── Clients / Filings ────────────────────────────────────────────────────
   //
   // Local backend exposes /clients — each record = one client / tax return.
@@ -207,9 +219,13 @@ class ApiService {
     year?: number;
     status?: string;
     search?: string;
+    cursor?: string;
+    count?: 'exact' | 'estimate' | 'none';
   }) {
     const q = new URLSearchParams();
     if (params?.page) q.append('page', String(params.page));
+    if (params?.cursor) q.append('cursor', params.cursor);
+    if (params?.count) q.append('count', params.count);
     if (params?.page_size) q.append('page_size', String(params.page_size));
     if (params?.year) q.append('year', String(params.year));
     if (params?.status && params.status !== 'all') q.append('status', params.status);
@@ -217,7 +233,8 @@ class ApiService {
     const qs = q.toString();
     const result = await this.request<{
       clients?: any[]; filings?: any[];
-      total: number; page: number; page_size: number; total_pages: number;
+      total: number | null; page: number; page_size: number; total_pages: number | null;
+      next_cursor?: string | null;
     }>(`/clients${qs ? `?${qs}` : ''}`);
     return {
       filings: result.clients || result.filings || [],
@@ -225,6 +242,7 @@ class ApiService {
       page: result.page || 1,
       page_size: result.page_size || 20,
       total_pages: result.total_pages || 1,
+      next_cursor: result.next_cursor ?? null,
     };
   }
 
@@ -252,6 +270,8 @@ class ApiService {
     status?: string;
     year?: number;
     search?: string;
+    cursor?: string;
+    count?: 'exact' | 'estimate' | 'none';
   }) {
     return this.getFilings(params);
   }
@@ -720,13 +740,33 @@ class ApiService {
     return res?.requested || [];
   }
 
-  async getClientNotifications(clientId: string, unreadOnly = false) {
+  async getClientNotifications(clientId: string, unreadOnly = false, cursor?: string) {
     const q = new URLSearchParams();
     q.append('client_id', clientId);
     if (unreadOnly) q.append('unread_only', 'true');
+    if (cursor) q.append('cursor', cursor);
     return this.request<any>(`/notifications?${q.toString()}`);
   }
 
+  async markAllNotificationsRead(clientId: string) {
+    return this.request<any>(
+      `/notifications/read-all?client_id=${encodeURIComponent(clientId)}`,
+      { method: 'POST' }
+    );
+  }
+
+  // ─── Global search (/search) ─────────────────────────────────────────────
+
+  // Results grouped by type (client, filing, document, notification); each
+  // result's `snippet` is escaped HTML with the matched words in <mark>.
+  async globalSearch(query: string, options: { types?: string[]; limit?: number } = {}) {
+    const q = new URLSearchParams();
+    q.append('q', query);
+    (options.types || []).forEach((t) => q.append('types', t));
+    if (options.limit) q.append('limit', String(options.limit));
+    return this.request<any>(`/search?${q.toString()}`);
+  }
+
   // ─── Chat — not implemented in local backend ──────────────────────────────
 
   async getChatMessages(clientId: string) {